@@ -0,0 +1,39 @@
+"""Benchmarks for decoding, search and rendering, using pytest-benchmark.
+
+Run from the repository root, saving the results so they can be compared
+across commits:
+
+    pytest benchmarks --benchmark-autosave
+    pytest-benchmark compare
+
+The synthetic DataPoint responses come from the stand-in server in tests/.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "tests"))
+
+from datapoint_server import (  # noqa: E402
+    ISSUE_TIME,
+    make_location_forecast,
+    make_site_rep,
+    make_sitelist,
+)
+
+SITELIST_SIZES = {"6k": 6_000, "60k": 60_000}
+
+
+@pytest.fixture(scope="session", params=list(SITELIST_SIZES))
+def sitelist(request: pytest.FixtureRequest) -> bytes:
+    return make_sitelist(SITELIST_SIZES[request.param])
+
+
+@pytest.fixture(scope="session", params=["3hourly", "hourly"])
+def forecast_content(request: pytest.FixtureRequest) -> bytes:
+    periods_per_day = 8 if request.param == "3hourly" else 24
+    location = make_location_forecast(310069, periods_per_day=periods_per_day)
+    return json.dumps(make_site_rep(ISSUE_TIME, location)).encode()
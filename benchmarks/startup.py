@@ -0,0 +1,200 @@
+"""Startup time benchmark for the weather-uk app, with a regression budget.
+
+Measures how long it takes to import the app (using `python -X importtime`)
+and from a cold start to the first frame, and exits with an error if the
+median of either is over budget:
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 10 --import-budget 25 --show-imports 15
+
+The import budget is for the app's own share of the import time, leaving out
+Textual and everything imported by it.
+
+The first frame is measured headless, with empty config and cache
+directories, so it shows the welcome screen without making any requests.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+
+APP_MODULE = "weather_uk.app.app"
+
+# Importing Textual is most of the import time, and depends on its version
+# rather than this app, so the import budget is for the app's own share
+FRAMEWORK_PACKAGE = "textual"
+
+# Budgets in milliseconds, with headroom for slower machines
+IMPORT_BUDGET_MS = 40.0
+FIRST_FRAME_BUDGET_MS = 1500.0
+
+FIRST_FRAME_SCRIPT = """
+import asyncio
+
+from weather_uk.app.app import WeatherUkApp
+
+
+async def main() -> None:
+    app = WeatherUkApp()
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        print("ready", flush=True)
+
+
+asyncio.run(main())
+"""
+
+
+def run_python(
+    args: list[str], env: dict[str, str]
+) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *args],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def make_env(home: Path) -> dict[str, str]:
+    return {
+        **os.environ,
+        "PYTHONPATH": str(SRC_PATH),
+        "XDG_CONFIG_HOME": str(home / "config"),
+        "XDG_CACHE_HOME": str(home / "cache"),
+    }
+
+
+@dataclass
+class ImportTime:
+    module: str
+    cumulative_ms: float
+    children: list["ImportTime"] = field(default_factory=list)
+
+    def walk(self) -> Iterator["ImportTime"]:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    @property
+    def framework_ms(self) -> float:
+        """Time spent importing the framework, and everything it imports."""
+        if self.module.split(".")[0] == FRAMEWORK_PACKAGE:
+            return self.cumulative_ms
+        return sum(child.framework_ms for child in self.children)
+
+    @property
+    def own_ms(self) -> float:
+        return self.cumulative_ms - self.framework_ms
+
+
+def parse_importtime(stderr: str) -> list[ImportTime]:
+    """Top level imports, with the imports made by each nested inside it."""
+    # Each import is reported after the imports it made, indented one level less
+    children: dict[int, list[ImportTime]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        node = ImportTime(
+            module.strip(), int(cumulative) / 1000, children.pop(depth + 1, [])
+        )
+        children.setdefault(depth, []).append(node)
+    return children.get(0, [])
+
+
+def measure_import(env: dict[str, str]) -> ImportTime:
+    result = run_python(["-X", "importtime", "-c", f"import {APP_MODULE}"], env)
+    imports = parse_importtime(result.stderr)
+    return next(node for node in imports if node.module == APP_MODULE)
+
+
+def measure_first_frame(env: dict[str, str]) -> float:
+    start = time.perf_counter()
+    with subprocess.Popen(
+        [sys.executable, "-c", FIRST_FRAME_SCRIPT],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    ) as proc:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            if line.strip() == "ready":
+                elapsed = time.perf_counter() - start
+                break
+        else:
+            raise RuntimeError("the app exited before the first frame")
+    return elapsed * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument(
+        "--first-frame-budget", type=float, default=FIRST_FRAME_BUDGET_MS
+    )
+    parser.add_argument(
+        "--show-imports",
+        type=int,
+        default=10,
+        metavar="N",
+        help="show the N slowest imports from the last run",
+    )
+    args = parser.parse_args()
+
+    import_times: list[float] = []
+    own_import_times: list[float] = []
+    first_frame_times: list[float] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = make_env(Path(tmp))
+        for _ in range(args.runs):
+            app_import = measure_import(env)
+            import_times.append(app_import.cumulative_ms)
+            own_import_times.append(app_import.own_ms)
+            first_frame_times.append(measure_first_frame(env))
+
+    if args.show_imports:
+        print(f"Slowest imports (cumulative ms, from {APP_MODULE}):")
+        slowest = sorted(app_import.walk(), key=lambda node: -node.cumulative_ms)
+        for node in slowest[: args.show_imports]:
+            print(f"  {node.cumulative_ms:8.1f}  {node.module}")
+        print()
+
+    print(
+        f"Import including {FRAMEWORK_PACKAGE}: "
+        f"median {statistics.median(import_times):.1f} ms, "
+        f"min {min(import_times):.1f} ms"
+    )
+
+    status = 0
+    for name, times, budget in (
+        (f"Import excluding {FRAMEWORK_PACKAGE}", own_import_times, args.import_budget),
+        ("First frame", first_frame_times, args.first_frame_budget),
+    ):
+        median = statistics.median(times)
+        over_budget = median > budget
+        print(
+            f"{name}: median {median:.1f} ms, min {min(times):.1f} ms "
+            f"(budget {budget:.0f} ms){' OVER BUDGET' if over_budget else ''}"
+        )
+        if over_budget:
+            status = 1
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
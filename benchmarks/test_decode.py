@@ -0,0 +1,53 @@
+import json
+
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from weather_uk.domain import serialisers
+
+
+def test_numbers_stored_as_text_decoder(
+    benchmark: BenchmarkFixture, sitelist: bytes
+) -> None:
+    benchmark(json.loads, sitelist, cls=serialisers.NumbersStoredAsTextDecoder)
+
+
+def test_loads_sitelist(benchmark: BenchmarkFixture, sitelist: bytes) -> None:
+    benchmark(serialisers.loads, sitelist)
+
+
+def test_decode_met_office_locations(
+    benchmark: BenchmarkFixture, sitelist: bytes
+) -> None:
+    json_data = serialisers.loads(sitelist)
+
+    locations = benchmark(serialisers.decode_met_office_locations, json_data)
+
+    assert locations
+
+
+def test_iter_met_office_locations(
+    benchmark: BenchmarkFixture, sitelist: bytes
+) -> None:
+    chunks = [sitelist[i : i + 16 * 1024] for i in range(0, len(sitelist), 16 * 1024)]
+
+    benchmark(lambda: list(serialisers.iter_met_office_locations(chunks)))
+
+
+def test_decode_met_office_forecast(
+    benchmark: BenchmarkFixture, forecast_content: bytes
+) -> None:
+    json_data = serialisers.loads(forecast_content)
+
+    forecast = benchmark(serialisers.decode_met_office_forecast, json_data)
+
+    assert forecast
+
+
+def test_decode_met_office_forecast_series(
+    benchmark: BenchmarkFixture, forecast_content: bytes
+) -> None:
+    json_data = serialisers.loads(forecast_content)
+
+    series = benchmark(serialisers.decode_met_office_forecast_series, json_data)
+
+    assert len(series)
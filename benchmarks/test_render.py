@@ -0,0 +1,131 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from datapoint_server import (
+    ISSUE_TIME,
+    make_location_forecast,
+    make_site_rep,
+    make_sitelist,
+)
+from fake_weather_api import FakeWeatherAPIClient
+from pytest_benchmark.fixture import BenchmarkFixture
+from textual.app import App, ComposeResult
+from textual.pilot import Pilot
+
+from weather_uk import config
+from weather_uk.app.app import WeatherUkApp
+from weather_uk.app.widgets.forecast_grid import ForecastGrid
+from weather_uk.app.widgets.locations import LocationSearch
+from weather_uk.domain import serialisers
+from weather_uk.domain import weather_api_client as weather_api_client_module
+
+# Rounds are slow, as each starts a headless app
+ROUNDS = 5
+TIMEOUT = 30.0
+
+
+class ForecastGridApp(App):
+    def compose(self) -> ComposeResult:
+        yield ForecastGrid()
+
+
+async def wait_for(pilot: Pilot, condition: Callable[[], object]) -> None:
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("App didn't finish loading")
+        await pilot.pause(0.01)
+
+
+@pytest.fixture
+def weather_app(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> Callable[[bytes, bytes], WeatherUkApp]:
+    """Starts the app with an API client serving the given sitelist and
+    forecast, and with its config and caches in a temporary directory.
+    """
+
+    def make_app(sitelist: bytes, forecast_content: bytes) -> WeatherUkApp:
+        api_client = FakeWeatherAPIClient(
+            forecast=serialisers.decode_met_office_forecast(
+                serialisers.loads(forecast_content)
+            ),
+            locations=serialisers.decode_met_office_locations(
+                serialisers.loads(sitelist)
+            ),
+        )
+        monkeypatch.setattr(
+            weather_api_client_module,
+            "MetOfficeAPIClient",
+            lambda *args, **kwargs: api_client,
+        )
+        return WeatherUkApp()
+
+    user_config = config.UserConfig("0123-4567-89ab-cdef")
+    monkeypatch.setattr(config, "load_config", lambda: user_config)
+    monkeypatch.setattr(config, "add_recent_location", lambda location_id: user_config)
+    monkeypatch.setattr(config, "SITELIST_CACHE_FILEPATH", tmp_path / "sitelist")
+    monkeypatch.setattr(config, "FORECAST_CACHE_PATH", tmp_path / "forecasts")
+    monkeypatch.setattr(config, "USAGE_FILEPATH", tmp_path / "usage.json")
+    return make_app
+
+
+def test_forecast_grid_show_forecast(
+    benchmark: BenchmarkFixture, forecast_content: bytes
+) -> None:
+    forecast = serialisers.decode_met_office_forecast(
+        serialisers.loads(forecast_content)
+    )
+
+    async def show_forecast() -> None:
+        app = ForecastGridApp()
+        async with app.run_test(size=(200, 50)) as pilot:
+            app.query_one(ForecastGrid).show_forecast(forecast)
+            await pilot.pause()
+
+    benchmark.pedantic(lambda: asyncio.run(show_forecast()), rounds=ROUNDS)
+
+
+def test_locations_screen_load(
+    benchmark: BenchmarkFixture,
+    weather_app: Callable[[bytes, bytes], WeatherUkApp],
+    sitelist: bytes,
+) -> None:
+    forecast_content = make_site_rep(ISSUE_TIME, make_location_forecast(310069))
+
+    async def load_locations_screen() -> None:
+        app = weather_app(sitelist, json.dumps(forecast_content).encode())
+        async with app.run_test(size=(120, 40)) as pilot:
+            await wait_for(
+                pilot,
+                lambda: app.screen.query(LocationSearch)
+                and app.screen.query_one(LocationSearch)._location_index is not None,
+            )
+
+    benchmark.pedantic(lambda: asyncio.run(load_locations_screen()), rounds=ROUNDS)
+
+
+def test_forecast_screen_load(
+    benchmark: BenchmarkFixture,
+    weather_app: Callable[[bytes, bytes], WeatherUkApp],
+    forecast_content: bytes,
+) -> None:
+    sitelist = make_sitelist(10)
+
+    async def load_forecast_screen() -> None:
+        app = weather_app(sitelist, forecast_content)
+        async with app.run_test(size=(200, 50)) as pilot:
+            await pilot.pause()
+            app.show_forecast(310069)
+            await wait_for(
+                pilot,
+                lambda: app.screen.query(ForecastGrid)
+                and app.screen.query_one(ForecastGrid).virtual_size.width
+                > app.screen.query_one(ForecastGrid).label_width,
+            )
+
+    benchmark.pedantic(lambda: asyncio.run(load_forecast_screen()), rounds=ROUNDS)
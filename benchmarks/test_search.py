@@ -0,0 +1,21 @@
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from weather_uk.domain import serialisers
+from weather_uk.domain.search import LocationIndex
+
+
+def test_build_location_index(benchmark: BenchmarkFixture, sitelist: bytes) -> None:
+    locations = serialisers.decode_met_office_locations(serialisers.loads(sitelist))
+
+    benchmark(LocationIndex, locations)
+
+
+def test_search_location_index(benchmark: BenchmarkFixture, sitelist: bytes) -> None:
+    locations = serialisers.decode_met_office_locations(serialisers.loads(sitelist))
+    index = LocationIndex(locations)
+
+    def search() -> None:
+        for query in ("s", "site 30", "site 3012", "sit 301"):
+            index.search(query, limit=30)
+
+    benchmark(search)
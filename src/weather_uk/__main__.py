@@ -1,4 +1,4 @@
-from weather_uk.app import app
+from weather_uk import cli
 
 if __name__ == "__main__":
-    app.run()
+    cli.run()
@@ -1,37 +1,135 @@
+from typing import TYPE_CHECKING
+
+from textual import work
 from textual.app import App
+from textual.binding import Binding
+from textual.screen import Screen
+from textual.timer import Timer
 
 from weather_uk import config
-from weather_uk.app.screens.forecast import ForecastScreen
-from weather_uk.app.screens.locations import LocationsScreen
-from weather_uk.app.screens.welcome import WelcomeScreen
-from weather_uk.domain.weather_api_client import (
-    AbstractWeatherAPIClient,
-    MetOfficeAPIClient,
-)
+
+if TYPE_CHECKING:
+    from weather_uk.domain.weather_api_client import AbstractWeatherAPIClient
+
+# Screens and their dependencies (e.g. requests and textual-autocomplete) are
+# only imported when a screen is first shown, so starting the app doesn't wait
+# for screens that may never be needed
+
+
+def welcome_screen() -> Screen:
+    from weather_uk.app.screens.welcome import WelcomeScreen
+
+    return WelcomeScreen()
+
+
+def locations_screen() -> Screen:
+    from weather_uk.app.screens.locations import LocationsScreen
+
+    return LocationsScreen()
+
+
+def forecast_screen() -> Screen:
+    from weather_uk.app.screens.forecast import ForecastScreen
+
+    return ForecastScreen()
+
+
+def dashboard_screen() -> Screen:
+    from weather_uk.app.screens.dashboard import DashboardScreen
+
+    return DashboardScreen()
+
+
+def performance_screen() -> Screen:
+    from weather_uk.app.screens.performance import PerformanceScreen
+
+    return PerformanceScreen()
 
 
 class WeatherUkApp(App):
     CSS_PATH = "weather-uk.css"
     SCREENS = {
-        "welcome": WelcomeScreen,
-        "locations": LocationsScreen,
-        "forecast": ForecastScreen,
+        "welcome": welcome_screen,
+        "locations": locations_screen,
+        "forecast": forecast_screen,
+        "dashboard": dashboard_screen,
+        "performance": performance_screen,
     }
     BINDINGS = [
         ("q", "quit", "Quit"),
+        Binding("f2", "show_dashboard", "Dashboard"),
+        Binding("f12", "show_performance", "Performance", show=False),
     ]
     ENABLE_COMMAND_PALETTE = False
 
     def on_mount(self) -> None:
+        from weather_uk.domain.cache import ForecastCache, LocationsCache
+        from weather_uk.domain.prefetch import ForecastPrefetcher
+        from weather_uk.domain.scheduler import RequestScheduler
+        from weather_uk.domain.weather_api_client import MetOfficeAPIClient
+
         self._user_config: config.UserConfig = config.load_config()
-        self._weather_api: AbstractWeatherAPIClient = MetOfficeAPIClient()
+        self._locations_cache = LocationsCache(config.SITELIST_CACHE_FILEPATH)
+        self._forecast_cache = ForecastCache(config.FORECAST_CACHE_PATH)
+        self._weather_api: "AbstractWeatherAPIClient" = MetOfficeAPIClient(
+            locations_cache=self._locations_cache,
+            forecast_cache=self._forecast_cache,
+            scheduler=RequestScheduler(usage_filepath=config.USAGE_FILEPATH),
+        )
+        self._prefetcher = ForecastPrefetcher(self._weather_api, self._forecast_cache)
         self._location_id: int | None = None
+        self._prefetch_timer: Timer | None = None
 
         if not self._user_config.api_key:
             self.push_screen("welcome")
         else:
             self._weather_api.api_key = self._user_config.api_key
             self.push_screen("locations")
+            self.prefetch_forecasts()
+
+    def action_show_performance(self) -> None:
+        # The overlay closes itself with the same key
+        self.push_screen("performance")
+
+    def action_show_dashboard(self) -> None:
+        if not self._user_config.api_key:
+            return
+        self._show_screen("dashboard")
+
+    def show_forecast(self, location_id: int) -> None:
+        self._location_id = location_id
+        self._user_config = config.add_recent_location(location_id)
+        # The forecast screen reloads for the new location when it is resumed
+        self._show_screen("forecast")
+
+    def _show_screen(self, name: str) -> None:
+        # An installed screen can only be in the stack once, so go back to it
+        # if it is already open, e.g. the forecast from the dashboard
+        screen = self.get_screen(name)
+        if screen not in self.screen_stack:
+            self.push_screen(screen)
+            return
+        while self.screen is not screen:
+            self.pop_screen()
+
+    def toggle_favourite(self, location_id: int) -> None:
+        self._user_config = config.toggle_favourite(location_id)
+        # Warm the cache for a new favourite before it is next opened
+        self.prefetch_forecasts()
+
+    @work(thread=True, exclusive=True, group="prefetch")
+    def prefetch_forecasts(self) -> None:
+        delay = self._prefetcher.prefetch(
+            self._user_config.favourites + self._user_config.recent_locations
+        )
+        if delay is not None:
+            # Prefetch again when the next forecast is expected to be issued
+            self.call_from_thread(self._schedule_prefetch, delay)
+
+    def _schedule_prefetch(self, delay: float) -> None:
+        if self._prefetch_timer is not None:
+            self._prefetch_timer.stop()
+        self._prefetch_timer = self.set_timer(delay, self.prefetch_forecasts)
 
 
 def run() -> None:
@@ -0,0 +1,231 @@
+import datetime
+import time
+from contextlib import closing
+from typing import Callable, ClassVar
+
+from rich.text import Text
+from textual import work
+from textual.app import ComposeResult
+from textual.containers import Container
+from textual.message import Message
+from textual.screen import Screen
+from textual.timer import Timer
+from textual.widgets import DataTable, Footer, Label
+from textual.worker import get_current_worker
+
+from weather_uk.app.styling import Cell, CellStyles
+from weather_uk.data import models
+from weather_uk.domain.cache import ForecastCache
+from weather_uk.domain.forecast import iter_forecasts
+
+
+class DashboardScreen(Screen):
+    """A summary row for each favourite location, to keep an eye on several
+    sites at once.
+
+    The forecasts are fetched a few at a time and each row is updated as its
+    forecast arrives. The next refresh is when the first of them is due to be
+    reissued, so the dashboard can be left open without polling DataPoint.
+    """
+
+    BINDINGS = [
+        ("escape", "app.pop_screen", "Back"),
+        ("r", "refresh", "Refresh"),
+    ]
+    MAX_PARALLEL_REQUESTS: int = 4
+    # Don't refresh more often than this, e.g. while a new forecast is late
+    MIN_INTERVAL: float = ForecastCache.RECHECK_INTERVAL
+    RETRY_INTERVAL: float = 15 * 60
+
+    WEATHER_COLUMNS: ClassVar[
+        tuple[tuple[str, Callable[[CellStyles, models.Weather], Cell]], ...]
+    ] = (
+        ("Weather", CellStyles.weather_type),
+        ("Precip", CellStyles.chance_of_precip),
+        ("Temp °C", CellStyles.temp),
+        ("Feels °C", CellStyles.feels_like_temp),
+        ("Wind", CellStyles.wind_direction),
+        ("mph", CellStyles.wind_speed),
+        ("Gust", CellStyles.wind_gust),
+        ("UV", CellStyles.uv_index),
+    )
+
+    class LocationNamesLoaded(Message):
+        def __init__(self, location_names: dict[int, str]) -> None:
+            super().__init__()
+            self.location_names: dict[int, str] = location_names
+
+    class ForecastLoaded(Message):
+        def __init__(
+            self, location_id: int, forecast: list[models.ForecastDay] | Exception
+        ) -> None:
+            super().__init__()
+            self.location_id: int = location_id
+            self.forecast: list[models.ForecastDay] | Exception = forecast
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._location_ids: list[int] = []
+        self._refresh_timer: Timer | None = None
+
+    def compose(self) -> ComposeResult:
+        user_config = self.app._user_config  # type: ignore[attr-defined]
+        self._cell_styles = CellStyles.from_config(user_config.theme)
+        with Container(classes="center-box"):
+            yield Label("Dashboard")
+            yield Label(
+                "Add favourites (press f on a forecast) to see them here",
+                id="no-favourites",
+            )
+            yield DataTable(cursor_type="row", zebra_stripes=True)
+        yield Footer()
+
+    def on_mount(self) -> None:
+        table = self.query_one(DataTable)
+        table.add_column("Location", key="location")
+        table.add_column("Time (UTC)", key="time")
+        for label, format_cell in self.WEATHER_COLUMNS:
+            table.add_column(label, key=format_cell.__name__)
+        table.add_column("Updated", key="updated")
+        table.focus()
+
+    def on_screen_resume(self) -> None:
+        user_config = self.app._user_config  # type: ignore[attr-defined]
+        if user_config.favourites != self._location_ids:
+            self._location_ids = list(user_config.favourites)
+            table = self.query_one(DataTable)
+            table.clear()
+            for location_id in self._location_ids:
+                table.add_row(
+                    str(location_id),
+                    *[""] * (len(table.columns) - 1),
+                    key=str(location_id),
+                )
+        self.query_one("#no-favourites").display = not self._location_ids
+        self.query_one(DataTable).display = bool(self._location_ids)
+
+        self.refresh_forecasts()
+
+    def on_screen_suspend(self) -> None:
+        # Stop refreshing once the user has navigated away
+        self.workers.cancel_node(self)
+        if self._refresh_timer is not None:
+            self._refresh_timer.stop()
+            self._refresh_timer = None
+
+    def action_refresh(self) -> None:
+        self.refresh_forecasts()
+
+    @work(thread=True, exclusive=True)
+    def refresh_forecasts(self) -> None:
+        weather_api = self.app._weather_api  # type: ignore[attr-defined]
+        forecast_cache = self.app._forecast_cache  # type: ignore[attr-defined]
+        locations_cache = self.app._locations_cache  # type: ignore[attr-defined]
+        location_ids = list(self._location_ids)
+        if not location_ids:
+            return
+        worker = get_current_worker()
+
+        # Names are only known once the sitelist has been cached
+        cached_locations = locations_cache.load()
+        if cached_locations is not None:
+            self.post_message(
+                self.LocationNamesLoaded(
+                    {
+                        location.id: str(location)
+                        for location in cached_locations.locations
+                        if location.id in location_ids
+                    }
+                )
+            )
+
+        with closing(
+            iter_forecasts(weather_api, location_ids, self.MAX_PARALLEL_REQUESTS)
+        ) as forecasts:
+            for location_id, forecast in forecasts:
+                if worker.is_cancelled:
+                    return
+                self.post_message(self.ForecastLoaded(location_id, forecast))
+
+        expires = forecast_cache.next_expiry(
+            location_ids, models.Resolution.THREE_HOURLY
+        )
+        if expires is None:
+            delay = self.RETRY_INTERVAL
+        else:
+            delay = max(self.MIN_INTERVAL, expires.timestamp() - time.time())
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._schedule_refresh, delay)
+
+    def _schedule_refresh(self, delay: float) -> None:
+        if self._refresh_timer is not None:
+            self._refresh_timer.stop()
+        self._refresh_timer = self.set_timer(delay, self.refresh_forecasts)
+
+    def on_dashboard_screen_location_names_loaded(
+        self, event: LocationNamesLoaded
+    ) -> None:
+        table = self.query_one(DataTable)
+        for location_id, name in event.location_names.items():
+            if str(location_id) in table.rows:
+                table.update_cell(str(location_id), "location", name, update_width=True)
+
+    def on_dashboard_screen_forecast_loaded(self, event: ForecastLoaded) -> None:
+        table = self.query_one(DataTable)
+        row_key = str(event.location_id)
+        if row_key not in table.rows:
+            return
+
+        updated = datetime.datetime.now().strftime("%H:%M")
+        period = (
+            None
+            if isinstance(event.forecast, Exception)
+            else current_period(
+                event.forecast, datetime.datetime.now(datetime.timezone.utc)
+            )
+        )
+        if period is None:
+            # Keep showing the last forecast, if there was one
+            table.update_cell(
+                row_key,
+                "updated",
+                Text(f"Failed {updated}", style="red"),
+                update_width=True,
+            )
+            return
+
+        start, weather = period
+        table.update_cell(
+            row_key, "time", start.strftime("%a %H:%M"), update_width=True
+        )
+        for _, format_cell in self.WEATHER_COLUMNS:
+            text, style = format_cell(self._cell_styles, weather)
+            table.update_cell(
+                row_key,
+                format_cell.__name__,
+                Text(text, style=style or ""),
+                update_width=True,
+            )
+        table.update_cell(row_key, "updated", updated, update_width=True)
+
+    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        assert event.row_key.value is not None
+        self.app.show_forecast(int(event.row_key.value))  # type: ignore[attr-defined]
+
+
+def current_period(
+    forecast: list[models.ForecastDay], now: datetime.datetime
+) -> tuple[datetime.datetime, models.Weather] | None:
+    """The period of the forecast under way at `now` (a UTC datetime), or the
+    first period if the forecast starts later.
+    """
+    current: tuple[datetime.datetime, models.Weather] | None = None
+    for day in forecast:
+        for hour in day.hours:
+            start = datetime.datetime.combine(
+                day.date, hour.time, tzinfo=datetime.timezone.utc
+            )
+            if current is not None and start > now:
+                return current
+            current = (start, hour.weather)
+    return current
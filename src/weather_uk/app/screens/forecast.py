@@ -1,48 +1,177 @@
+import datetime
+
 import requests
+from textual import work
 from textual.app import ComposeResult
-from textual.containers import Horizontal, HorizontalScroll
+from textual.message import Message
 from textual.screen import Screen
-from textual.widgets import Footer, Tabs
+from textual.timer import Timer
+from textual.widgets import Footer, Tab, Tabs
+from textual.worker import get_current_worker
 
-from weather_uk.app.widgets.forecast_day import ForecastDayView
-from weather_uk.app.widgets.forecast_labels import ForecastLabels
+from weather_uk.app.styling import CellStyles
+from weather_uk.app.widgets.forecast_grid import ForecastGrid
 from weather_uk.data import models
 from weather_uk.domain.forecast import get_forecast
+from weather_uk.domain.refresh import ForecastRefresher
+from weather_uk.domain.resilience import CircuitOpenError
+from weather_uk.domain.scheduler import QuotaExceededError
 
 
 class ForecastScreen(Screen):
-    def compose(self) -> ComposeResult:
-        forecast = self.get_forecast()
+    """The forecast for a location, kept up to date while it is on display.
+
+    Each newly issued forecast is fetched once, and only the periods that have
+    changed are redrawn.
+    """
+
+    BINDINGS = [
+        ("f", "toggle_favourite", "Favourite"),
+    ]
+
+    class ForecastLoaded(Message):
+        def __init__(self, forecast: list[models.ForecastDay]) -> None:
+            super().__init__()
+            self.forecast: list[models.ForecastDay] = forecast
 
-        yield Tabs(*[f"{day.date.strftime('%A')}" for day in forecast])
+    class ForecastUpdated(Message):
+        def __init__(self, forecast: list[models.ForecastDay]) -> None:
+            super().__init__()
+            self.forecast: list[models.ForecastDay] = forecast
 
-        with Horizontal():
-            yield ForecastLabels()
-            with HorizontalScroll():
-                for day in forecast:
-                    yield ForecastDayView(
-                        day,
-                        id=f"{day.date.strftime('%A')}",
-                    )
+    def __init__(self) -> None:
+        super().__init__()
+        self._days: list[datetime.date] = []
+        # The location of the forecast on display, once it has loaded
+        self._location_id: int | None = None
+        self._refresher: ForecastRefresher | None = None
+        self._refresh_timer: Timer | None = None
 
+    def compose(self) -> ComposeResult:
+        user_config = self.app._user_config  # type: ignore[attr-defined]
+        yield Tabs()
+        yield ForecastGrid(cell_styles=CellStyles.from_config(user_config.theme))
         yield Footer()
 
     def on_mount(self) -> None:
         self.query_one(Tabs).focus()
 
+    def on_screen_resume(self) -> None:
+        location_id = self.app._location_id  # type: ignore[attr-defined]
+        if location_id == self._location_id and self._days:
+            # e.g. after the performance overlay, keep the forecast and scroll
+            # position, and carry on refreshing it
+            assert self._refresher is not None
+            self._schedule_refresh(self._refresher.delay())
+            return
+
+        # Clear any forecast from a previous visit while the new one loads
+        self._location_id = None
+        self._refresher = None
+        self.query_one(Tabs).clear()
+        self._days = []
+        grid = self.query_one(ForecastGrid)
+        grid.clear()
+        grid.loading = True
+
+        self.load_forecast()
+
+    def on_screen_suspend(self) -> None:
+        # Don't update the forecast once the user has navigated away
+        self.workers.cancel_node(self)
+        if self._refresh_timer is not None:
+            self._refresh_timer.stop()
+            self._refresh_timer = None
+
+    @work(thread=True, exclusive=True)
+    def load_forecast(self) -> None:
+        forecast = self.get_forecast()
+        if not get_current_worker().is_cancelled:
+            self.post_message(self.ForecastLoaded(forecast))
+
+    def on_forecast_screen_forecast_loaded(self, event: ForecastLoaded) -> None:
+        forecast = event.forecast
+
+        grid = self.query_one(ForecastGrid)
+        grid.show_forecast(forecast)
+        grid.loading = False
+        self._update_tabs(forecast)
+
+        self._location_id = self.app._location_id  # type: ignore[attr-defined]
+        self._refresher = ForecastRefresher(
+            self.app._weather_api,  # type: ignore[attr-defined]
+            self.app._forecast_cache,  # type: ignore[attr-defined]
+            self._location_id,
+        )
+        self._schedule_refresh(self._refresher.delay())
+
+    def on_forecast_screen_forecast_updated(self, event: ForecastUpdated) -> None:
+        self.query_one(ForecastGrid).update_forecast(event.forecast)
+        self._update_tabs(event.forecast)
+
+    def _update_tabs(self, forecast: list[models.ForecastDay]) -> None:
+        # Days drop off the start of the forecast and are added to the end, so
+        # only those tabs change
+        days = [day.date for day in forecast]
+        tabs = self.query_one(Tabs)
+        for date in set(self._days) - set(days):
+            tabs.remove_tab(f"day-{date.isoformat()}")
+        for date in days:
+            if date not in self._days:
+                tabs.add_tab(Tab(date.strftime("%A"), id=f"day-{date.isoformat()}"))
+        self._days = days
+
+    def _schedule_refresh(self, delay: float) -> None:
+        if self._refresh_timer is not None:
+            self._refresh_timer.stop()
+        self._refresh_timer = self.set_timer(delay, self.check_for_new_forecast)
+
+    @work(thread=True, exclusive=True, group="refresh")
+    def check_for_new_forecast(self) -> None:
+        refresher = self._refresher
+        if refresher is None:
+            return
+        try:
+            forecast = refresher.check()
+        except (
+            requests.exceptions.RequestException,
+            CircuitOpenError,
+            QuotaExceededError,
+        ):
+            delay = refresher.RETRY_INTERVAL
+        else:
+            if forecast is not None and not get_current_worker().is_cancelled:
+                self.post_message(self.ForecastUpdated(forecast))
+            delay = refresher.delay()
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self._schedule_refresh, delay)
+
     def get_forecast(self) -> list[models.ForecastDay]:
         weather_api = self.app._weather_api  # type: ignore[attr-defined]
         location_id = self.app._location_id  # type: ignore[attr-defined]
         forecast: list[models.ForecastDay] = []
         try:
             forecast = get_forecast(weather_api, location_id)
-        # TODO: Handle requests exceptions
-        except requests.exceptions.HTTPError:
-            pass
+        except (
+            requests.exceptions.RequestException,
+            CircuitOpenError,
+            QuotaExceededError,
+        ) as err:
+            self.notify(str(err), title="Couldn't load forecast", severity="error")
 
         return forecast
 
+    def action_toggle_favourite(self) -> None:
+        location_id = self.app._location_id  # type: ignore[attr-defined]
+        self.app.toggle_favourite(location_id)  # type: ignore[attr-defined]
+        user_config = self.app._user_config  # type: ignore[attr-defined]
+        if location_id in user_config.favourites:
+            self.notify("Added to favourites")
+        else:
+            self.notify("Removed from favourites")
+
     def on_tabs_tab_activated(self, event: Tabs.TabActivated) -> None:
-        day = str(event.tab.label)
-        forecast_day = self.query_one(f"#{day}", ForecastDayView)
-        self.query_one(HorizontalScroll).scroll_to_widget(forecast_day)
+        assert event.tab.id is not None
+        date = datetime.date.fromisoformat(event.tab.id.removeprefix("day-"))
+        if date in self._days:
+            self.query_one(ForecastGrid).scroll_to_day(self._days.index(date))
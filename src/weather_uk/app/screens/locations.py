@@ -4,6 +4,7 @@ from textual.screen import Screen
 from textual.widgets import Footer, Input, Markdown
 
 from weather_uk.app.widgets.locations import LocationSearch
+from weather_uk.app.widgets.saved_locations import SavedLocations
 
 
 class LocationsScreen(Screen):
@@ -11,7 +12,19 @@ class LocationsScreen(Screen):
         with Container(classes="center-box"):
             yield Markdown("# Find a forecast")
             yield LocationSearch()
+            yield SavedLocations()
         yield Footer()
 
     def on_mount(self) -> None:
         self.query_one(Input).focus()
+
+    def on_screen_resume(self) -> None:
+        user_config = self.app._user_config  # type: ignore[attr-defined]
+        self.query_one(SavedLocations).show_locations(
+            user_config.favourites, user_config.recent_locations
+        )
+
+    def on_location_search_locations_loaded(
+        self, event: LocationSearch.LocationsLoaded
+    ) -> None:
+        self.query_one(SavedLocations).add_location_names(event.locations)
@@ -0,0 +1,71 @@
+from rich.table import Table
+from textual.app import ComposeResult
+from textual.containers import Container
+from textual.screen import ModalScreen
+from textual.widgets import Footer, Label, Static
+
+from weather_uk import config
+from weather_uk.domain import instrumentation
+
+
+class PerformanceScreen(ModalScreen):
+    """Debug overlay showing the timings and counters recorded so far, over
+    whichever screen is open.
+    """
+
+    BINDINGS = [
+        ("escape,f12", "app.pop_screen", "Close"),
+        ("e", "export_traces", "Export traces"),
+        ("r", "reset", "Reset"),
+    ]
+    REFRESH_INTERVAL: float = 1.0
+
+    def compose(self) -> ComposeResult:
+        with Container(classes="center-box"):
+            yield Label("Performance")
+            yield Static(id="span-stats")
+            yield Static(id="counters")
+        yield Footer()
+
+    def on_mount(self) -> None:
+        self.refresh_stats()
+        self.set_interval(self.REFRESH_INTERVAL, self.refresh_stats)
+
+    def refresh_stats(self) -> None:
+        recorder = instrumentation.recorder
+
+        spans = Table(expand=True)
+        spans.add_column("Span")
+        for heading in ("Count", "Last ms", "Mean ms", "Max ms", "Total ms"):
+            spans.add_column(heading, justify="right")
+        for stats in recorder.stats():
+            spans.add_row(
+                stats.name,
+                str(stats.count),
+                f"{stats.last_ms:.1f}",
+                f"{stats.mean_ms:.1f}",
+                f"{stats.max_ms:.1f}",
+                f"{stats.total_ms:.1f}",
+            )
+        self.query_one("#span-stats", Static).update(spans)
+
+        counters = Table(expand=True)
+        counters.add_column("Counter")
+        counters.add_column("Count", justify="right")
+        for name, count in sorted(recorder.counters.items()):
+            counters.add_row(name, str(count))
+        self.query_one("#counters", Static).update(counters)
+
+    def action_export_traces(self) -> None:
+        try:
+            json_filepath, otlp_filepath = instrumentation.export_traces(
+                config.TRACES_PATH
+            )
+        except OSError as err:
+            self.notify(f"Couldn't export traces: {err}", severity="error")
+            return
+        self.notify(f"Exported {json_filepath} and {otlp_filepath}")
+
+    def action_reset(self) -> None:
+        instrumentation.recorder.reset()
+        self.refresh_stats()
@@ -1,13 +1,26 @@
 import requests
+from textual import work
 from textual.app import ComposeResult
 from textual.containers import Container
+from textual.message import Message
 from textual.screen import Screen
 from textual.widgets import Footer, Input, Label, Markdown
+from textual.worker import get_current_worker
 
+from weather_uk import config
 from weather_uk.domain.authentication import check_valid_authentication
+from weather_uk.domain.resilience import CircuitOpenError
+from weather_uk.domain.scheduler import QuotaExceededError
 
 
 class WelcomeScreen(Screen):
+    class AuthenticationChecked(Message):
+        def __init__(self, api_key: str, error: Exception | None = None) -> None:
+            super().__init__()
+            self.api_key: str = api_key
+            # The error if the check failed, otherwise None
+            self.error: Exception | None = error
+
     def compose(self) -> ComposeResult:
         with Container(classes="center-box"):
             yield Markdown(WELCOME_MD)
@@ -20,29 +33,71 @@ class WelcomeScreen(Screen):
     def on_mount(self) -> None:
         self.query_one(Input).focus()
 
+    def on_screen_suspend(self) -> None:
+        self.workers.cancel_node(self)
+
     def on_input_submitted(self, event: Input.Submitted) -> None:
         api_key = event.input.value.strip()
+
+        auth_msg = self.query_one("#auth-status", Label)
+        auth_msg.styles.color = None
+        auth_msg.update(CHECKING_MSG)
+        self.check_authentication(api_key)
+
+    @work(thread=True, exclusive=True)
+    def check_authentication(self, api_key: str) -> None:
         weather_api = self.app._weather_api  # type: ignore[attr-defined]
         weather_api.api_key = api_key
 
-        auth_msg = self.query_one("#auth-status", Label)
+        error: Exception | None = None
         try:
             check_valid_authentication(weather_api)
-        except requests.exceptions.HTTPError as http_err:
-            status_code = http_err.response.status_code
-            if status_code == 403:
-                auth_msg.styles.color = ERROR_COLOUR
-                auth_msg.update(INVALID_KEY_MSG)
-
-        # TODO: Handle other requests exceptions
-        else:
-            self.app._user_config = config.update_config(api_key)  # type: ignore[attr-defined]
-            auth_msg.styles.color = SUCCESS_COLOUR
-            auth_msg.update(SUCCESS_MSG)
-            auth_msg.call_after_refresh(self.app.push_screen, "locations")
+        except (
+            requests.exceptions.RequestException,
+            CircuitOpenError,
+            QuotaExceededError,
+        ) as err:
+            error = err
+
+        if not get_current_worker().is_cancelled:
+            self.post_message(self.AuthenticationChecked(api_key, error))
+
+    def on_welcome_screen_authentication_checked(
+        self, event: AuthenticationChecked
+    ) -> None:
+        auth_msg = self.query_one("#auth-status", Label)
+        if event.error is not None:
+            auth_msg.styles.color = ERROR_COLOUR
+            auth_msg.update(auth_error_message(event.error))
+            return
+
+        self.app._user_config = config.update_config(  # type: ignore[attr-defined]
+            event.api_key
+        )
+        auth_msg.styles.color = SUCCESS_COLOUR
+        auth_msg.update(SUCCESS_MSG)
+        auth_msg.call_after_refresh(self.app.push_screen, "locations")
+        self.app.prefetch_forecasts()  # type: ignore[attr-defined]
+
+
+def auth_error_message(error: Exception) -> str:
+    if (
+        isinstance(error, requests.exceptions.HTTPError)
+        and error.response is not None
+        and error.response.status_code == 403
+    ):
+        return INVALID_KEY_MSG
+    if isinstance(error, QuotaExceededError):
+        return f"Error: {error}. Please try again tomorrow."
+    return CHECK_FAILED_MSG
 
 
 INVALID_KEY_MSG = "Error: Sorry, we couldn't validate your API key. Please try again."
+CHECK_FAILED_MSG = (
+    "Error: Sorry, we couldn't reach the Met Office to check your API key. "
+    "Please try again later."
+)
+CHECKING_MSG = "Checking your API key..."
 SUCCESS_MSG = "Success! Loading..."
 
 SUCCESS_COLOUR = "#4EBF71"
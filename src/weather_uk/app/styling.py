@@ -0,0 +1,211 @@
+"""Text and styles for the forecast cells, looked up rather than built.
+
+Every value a cell can show (UV bands, chances of precipitation, compass
+points, weather types...) is formatted and styled once in `CellStyles`, so
+rendering a cell is a table lookup, with no string building or markup parsing.
+The colours can be changed in the `[theme]` section of the config file, e.g.
+
+    [theme]
+    uv_extreme = bold white on magenta
+    likely_precip = black on sky_blue1
+    likely_precip_chance = 40
+"""
+
+from dataclasses import dataclass, fields
+from typing import Mapping, Optional
+
+from rich.errors import StyleSyntaxError
+from rich.style import Style
+
+from weather_uk.data import models
+from weather_uk.data.models.forecast_series import COMPASS_POINTS, WEATHER_TYPES
+
+Cell = tuple[str, Style | None]
+
+WIND_ARROWS: dict[str, str] = {
+    "N": "↓",
+    "E": "←",
+    "S": "↑",
+    "W": "→",
+    "NE": "↙",
+    "NW": "↘",
+    "SE": "↖",
+    "SW": "↗",
+}
+
+# Shown for values not given at every resolution, e.g. UV index at night
+MISSING_CELL: Cell = ("-", None)
+# Beyond this the UV index is always "extreme"
+MAX_UV_INDEX = 11
+# Precomputed text for the values DataPoint can return
+TEMPERATURE_RANGE = range(-60, 61)
+PERCENT_RANGE = range(0, 101)
+SPEED_RANGE = range(0, 201)
+
+
+@dataclass
+class CellTheme:
+    """Colours for the forecast cells, as Rich style definitions."""
+
+    uv_none: str = "white on grey30"
+    uv_low: str = "black on green4"
+    uv_moderate: str = "black on gold1"
+    uv_high: str = "black on dark_orange"
+    uv_very_high: str = "white on red3"
+    uv_extreme: str = "white on purple3"
+    likely_precip: str = "dark_blue on light_cyan1"
+    likely_precip_chance: int = 30
+
+    @classmethod
+    def from_config(cls, theme: Mapping[str, str]) -> "CellTheme":
+        """Build a theme from the `[theme]` config section, keeping the
+        default for any value that is missing or invalid.
+        """
+        cell_theme = cls()
+        for theme_field in fields(cls):
+            value = theme.get(theme_field.name)
+            if value is None:
+                continue
+            if theme_field.type is int:
+                try:
+                    setattr(cell_theme, theme_field.name, int(value))
+                except ValueError:
+                    pass
+            elif _is_valid_style(value):
+                setattr(cell_theme, theme_field.name, value)
+        return cell_theme
+
+
+class CellStyles:
+    """Lookup tables of the text and style for each forecast cell value."""
+
+    def __init__(self, theme: Optional[CellTheme] = None) -> None:
+        theme = theme if theme is not None else CellTheme()
+        self.theme: CellTheme = theme
+
+        uv_none = Style.parse(theme.uv_none)
+        uv_bands = (
+            (2, Style.parse(theme.uv_low)),
+            (5, Style.parse(theme.uv_moderate)),
+            (7, Style.parse(theme.uv_high)),
+            (10, Style.parse(theme.uv_very_high)),
+            (MAX_UV_INDEX, Style.parse(theme.uv_extreme)),
+        )
+        self.uv_index_cells: tuple[Cell, ...] = tuple(
+            (
+                f" {uv_index} ",
+                (
+                    uv_none
+                    if uv_index == 0
+                    else next(style for top, style in uv_bands if uv_index <= top)
+                ),
+            )
+            for uv_index in range(MAX_UV_INDEX + 1)
+        )
+
+        likely_precip = Style.parse(theme.likely_precip)
+        self.precip_cells: tuple[Cell, ...] = tuple(
+            (
+                f"{chance}%",
+                likely_precip if chance >= theme.likely_precip_chance else None,
+            )
+            for chance in PERCENT_RANGE
+        )
+
+        self.wind_direction_cells: dict[str, Cell] = {
+            direction: (f"{_wind_arrow(direction)} {direction}", None)
+            for direction in COMPASS_POINTS
+        }
+        self.weather_type_cells: tuple[Cell, ...] = tuple(
+            (str(weather_type), None) for weather_type in WEATHER_TYPES
+        )
+        self.degrees_cells: dict[float, Cell] = {
+            temp: (f"{temp}°", None) for temp in TEMPERATURE_RANGE
+        }
+        self.percent_cells: tuple[Cell, ...] = tuple(
+            (f"{percent}%", None) for percent in PERCENT_RANGE
+        )
+        self.number_cells: tuple[Cell, ...] = tuple(
+            (str(number), None) for number in SPEED_RANGE
+        )
+
+    @classmethod
+    def from_config(cls, theme: Mapping[str, str]) -> "CellStyles":
+        return cls(CellTheme.from_config(theme))
+
+    def weather_type(self, weather: models.Weather) -> Cell:
+        if weather.weather_type is None:
+            return MISSING_CELL
+        return self.weather_type_cells[weather.weather_type.value]
+
+    def chance_of_precip(self, weather: models.Weather) -> Cell:
+        chance = weather.precipitation_probability
+        if chance is None:
+            return MISSING_CELL
+        if chance in PERCENT_RANGE:
+            return self.precip_cells[int(chance)]
+        return f"{chance}%", None
+
+    def temp(self, weather: models.Weather) -> Cell:
+        return self._degrees(weather.temp_celsius)
+
+    def feels_like_temp(self, weather: models.Weather) -> Cell:
+        return self._degrees(weather.feels_like_temp_celsius)
+
+    def wind_direction(self, weather: models.Weather) -> Cell:
+        direction = weather.wind_direction
+        if direction is None:
+            return MISSING_CELL
+        return self.wind_direction_cells.get(direction) or (direction, None)
+
+    def wind_speed(self, weather: models.Weather) -> Cell:
+        return self._number(weather.wind_speed_mph)
+
+    def wind_gust(self, weather: models.Weather) -> Cell:
+        return self._number(weather.wind_gust_mph)
+
+    def visibility(self, weather: models.Weather) -> Cell:
+        if weather.visibility is None:
+            return MISSING_CELL
+        return weather.visibility, None
+
+    def humidity(self, weather: models.Weather) -> Cell:
+        humidity = weather.humidity_percent
+        if humidity in PERCENT_RANGE:
+            return self.percent_cells[int(humidity)]
+        return f"{humidity}%", None
+
+    def uv_index(self, weather: models.Weather) -> Cell:
+        if weather.max_uv_index is None:
+            return MISSING_CELL
+        uv_index = max(0, min(weather.max_uv_index, MAX_UV_INDEX))
+        if uv_index == weather.max_uv_index:
+            return self.uv_index_cells[uv_index]
+        _, style = self.uv_index_cells[uv_index]
+        return f" {weather.max_uv_index} ", style
+
+    def _degrees(self, temp: float | None) -> Cell:
+        if temp is None:
+            return MISSING_CELL
+        return self.degrees_cells.get(temp) or (f"{temp}°", None)
+
+    def _number(self, number: float | None) -> Cell:
+        if number is None:
+            return MISSING_CELL
+        if number in SPEED_RANGE:
+            return self.number_cells[int(number)]
+        return f"{number}", None
+
+
+def _wind_arrow(direction: str) -> str:
+    # Intermediate directions (e.g. NNE) share the arrow of the nearest
+    # ordinal direction
+    return WIND_ARROWS.get(direction) or WIND_ARROWS[direction[-2:]]
+
+
+def _is_valid_style(definition: str) -> bool:
+    try:
+        Style.parse(definition)
+    except StyleSyntaxError:
+        return False
+    return True
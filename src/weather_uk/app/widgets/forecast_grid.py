@@ -0,0 +1,290 @@
+import datetime
+from typing import Any, Callable, ClassVar, Optional
+
+from rich.segment import Segment
+from rich.style import Style
+from textual.geometry import Region, Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+from weather_uk.app.styling import Cell, CellStyles
+from weather_uk.data import models
+from weather_uk.domain import instrumentation
+
+
+class ForecastGrid(ScrollView):
+    """The forecast for every hour of every day in one scrolling grid.
+
+    Only the columns in view are rendered, with the formatted cells cached as
+    they are first shown, and the row labels and day and time headings stay in
+    place while the hours scroll beneath them.
+    """
+
+    COMPONENT_CLASSES: ClassVar[set[str]] = {
+        "forecast-grid--header",
+        "forecast-grid--label",
+        "forecast-grid--even-row",
+        "forecast-grid--odd-row",
+    }
+
+    DEFAULT_CSS = """
+    ForecastGrid {
+        overflow-y: hidden;
+    }
+    ForecastGrid > .forecast-grid--header {
+        text-style: bold;
+        color: $text;
+        background: $primary;
+    }
+    ForecastGrid > .forecast-grid--label {
+        text-style: bold;
+        background: $panel;
+    }
+    ForecastGrid > .forecast-grid--even-row {
+        background: $surface;
+    }
+    ForecastGrid > .forecast-grid--odd-row {
+        background: $panel-lighten-1 60%;
+    }
+    """
+
+    ROWS: ClassVar[
+        tuple[tuple[str, Callable[[CellStyles, models.Weather], Cell]], ...]
+    ] = (
+        ("Weather type", CellStyles.weather_type),
+        ("Chance of precip", CellStyles.chance_of_precip),
+        ("Temperature (°C)", CellStyles.temp),
+        ("Feels like temp (°C)", CellStyles.feels_like_temp),
+        ("Wind direction", CellStyles.wind_direction),
+        ("Wind speed (mph)", CellStyles.wind_speed),
+        ("Wind gust (mph)", CellStyles.wind_gust),
+        ("Visibility", CellStyles.visibility),
+        ("Humidity", CellStyles.humidity),
+        ("UV", CellStyles.uv_index),
+    )
+    # The day and time headings
+    HEADER_HEIGHT: ClassVar[int] = 2
+    MIN_COLUMN_WIDTH: ClassVar[int] = 11
+
+    def __init__(
+        self,
+        *args: Any,
+        cell_styles: Optional[CellStyles] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.cell_styles: CellStyles = (
+            cell_styles if cell_styles is not None else CellStyles()
+        )
+        self.label_width: int = max(len(label) for label, _ in self.ROWS) + 2
+        self.column_width: int = self.MIN_COLUMN_WIDTH
+        self._days: list[models.ForecastDay] = []
+        # The day index and hour of each column
+        self._columns: list[tuple[int, models.ForecastHour]] = []
+        self._day_columns: list[int] = []
+        # Formatted cells by row and column, with the time headings as row -1
+        self._cells: dict[tuple[int, int], list[Segment]] = {}
+
+    def show_forecast(self, forecast: list[models.ForecastDay]) -> None:
+        # Only sets up the columns, as the cells are rendered when painted
+        with instrumentation.span("layout.forecast_grid", days=len(forecast)):
+            self._set_forecast(forecast)
+            self._cells.clear()
+            self.scroll_to(x=0, animate=False)
+            self.refresh()
+
+    def update_forecast(self, forecast: list[models.ForecastDay]) -> int:
+        """Show a newer issue of the forecast in place, keeping the formatted
+        cells of the periods that haven't changed, and the same period in view.
+        Returns how many periods are new or have changed.
+        """
+        with instrumentation.span("layout.forecast_grid_update", days=len(forecast)):
+            old_columns: dict[
+                tuple[datetime.date, datetime.time], tuple[int, models.Weather]
+            ] = {
+                (self._days[day_index].date, hour.time): (column, hour.weather)
+                for column, (day_index, hour) in enumerate(self._columns)
+            }
+            old_cells = self._cells
+            old_column_width = self.column_width
+            scroll_x = int(self.scroll_offset.x)
+            first_column = scroll_x // old_column_width
+            first_key = (
+                self._column_key(first_column)
+                if first_column < len(self._columns)
+                else None
+            )
+
+            self._set_forecast(forecast)
+            self._cells = {}
+            changed = 0
+            new_first_column: int | None = None
+            for column, (day_index, hour) in enumerate(self._columns):
+                key = (forecast[day_index].date, hour.time)
+                if key == first_key:
+                    new_first_column = column
+                old = old_columns.get(key)
+                if old is None or old[1] != hour.weather:
+                    changed += 1
+                # The cells are padded to the column width
+                elif self.column_width == old_column_width:
+                    old_column = old[0]
+                    for row in range(-1, len(self.ROWS)):
+                        cell = old_cells.get((row, old_column))
+                        if cell is not None:
+                            self._cells[(row, column)] = cell
+
+            if new_first_column is None:
+                self.scroll_to(x=0, animate=False)
+            else:
+                self.scroll_to(
+                    x=new_first_column * self.column_width
+                    + scroll_x % old_column_width,
+                    animate=False,
+                )
+            self.refresh()
+            return changed
+
+    def _set_forecast(self, forecast: list[models.ForecastDay]) -> None:
+        self._days = forecast
+        self._columns = [
+            (day_index, hour)
+            for day_index, day in enumerate(forecast)
+            for hour in day.hours
+        ]
+        self._day_columns = []
+        for column, (day_index, _) in enumerate(self._columns):
+            if day_index == len(self._day_columns):
+                self._day_columns.append(column)
+
+        # Every column is the same width, so the columns in view can be found
+        # without measuring the ones before them
+        weather_types = {
+            hour.weather.weather_type
+            for _, hour in self._columns
+            if hour.weather.weather_type is not None
+        }
+        self.column_width = max(
+            [self.MIN_COLUMN_WIDTH]
+            + [len(str(weather_type)) + 2 for weather_type in weather_types]
+        )
+        self.virtual_size = Size(
+            self.label_width + len(self._columns) * self.column_width,
+            self.HEADER_HEIGHT + len(self.ROWS),
+        )
+
+    def _column_key(self, column: int) -> tuple[datetime.date, datetime.time]:
+        day_index, hour = self._columns[column]
+        return self._days[day_index].date, hour.time
+
+    def clear(self) -> None:
+        self.show_forecast([])
+
+    def scroll_to_day(self, day_index: int, animate: bool = False) -> None:
+        """Jump to the first hour of a day, without rendering the hours
+        skipped over.
+        """
+        if 0 <= day_index < len(self._day_columns):
+            x = self._day_columns[day_index] * self.column_width
+            self.scroll_to(x=x, animate=animate)
+
+    def notify_style_update(self) -> None:
+        # The cached cells include the row styles
+        super().notify_style_update()
+        self._cells.clear()
+
+    def render_lines(self, crop: Region) -> list[Strip]:
+        # Each paint of the grid, rather than each of its lines
+        with instrumentation.span("render.forecast_grid", lines=crop.height):
+            return super().render_lines(crop)
+
+    def render_line(self, y: int) -> Strip:
+        width = self.size.width
+        label_width = min(self.label_width, width)
+        scroll_x = int(self.scroll_offset.x)
+        data_width = width - label_width
+        first_column = scroll_x // self.column_width
+        last_column = min(
+            len(self._columns), (scroll_x + data_width) // self.column_width + 1
+        )
+
+        if y < self.HEADER_HEIGHT:
+            style = self.get_component_rich_style("forecast-grid--header")
+            label = Segment(" " * label_width, style)
+            if y == 0:
+                cells = self._render_day_headings(
+                    first_column, last_column, scroll_x, style
+                )
+            else:
+                cells = [
+                    segment
+                    for column in range(first_column, last_column)
+                    for segment in self._time_heading(column, style)
+                ]
+        elif y - self.HEADER_HEIGHT < len(self.ROWS):
+            row = y - self.HEADER_HEIGHT
+            label_text = f" {self.ROWS[row][0]}".ljust(label_width)
+            label = Segment(
+                label_text[:label_width],
+                self.get_component_rich_style("forecast-grid--label"),
+            )
+            cells = [
+                segment
+                for column in range(first_column, last_column)
+                for segment in self._cell(row, column)
+            ]
+        else:
+            return Strip.blank(width, self.rich_style)
+
+        offset = scroll_x - first_column * self.column_width
+        data = Strip(cells).crop_extend(offset, offset + data_width, self.rich_style)
+        return Strip.join([Strip([label]), data])
+
+    def _render_day_headings(
+        self, first_column: int, last_column: int, scroll_x: int, style: Style
+    ) -> list[Segment]:
+        segments: list[Segment] = []
+        # Keep the name of the day in view until the next day is reached, by
+        # indenting it past the part of the first column scrolled out of view
+        indent = scroll_x - first_column * self.column_width
+        column = first_column
+        while column < last_column:
+            day_index = self._columns[column][0]
+            if day_index + 1 < len(self._day_columns):
+                end = min(self._day_columns[day_index + 1], last_column)
+            else:
+                end = last_column
+            heading_width = (end - column) * self.column_width
+            name = self._days[day_index].date.strftime("%A")
+            heading = f"{' ' * indent} {name}".ljust(heading_width)
+            segments.append(Segment(heading[:heading_width], style))
+            indent = 0
+            column = end
+        return segments
+
+    def _time_heading(self, column: int, style: Style) -> list[Segment]:
+        key = (-1, column)
+        cell = self._cells.get(key)
+        if cell is None:
+            time = self._columns[column][1].time.strftime("%H:%M")
+            cell = self._cells[key] = [Segment(time.center(self.column_width), style)]
+        return cell
+
+    def _cell(self, row: int, column: int) -> list[Segment]:
+        key = (row, column)
+        cell = self._cells.get(key)
+        if cell is None:
+            _, format_cell = self.ROWS[row]
+            text, style = format_cell(
+                self.cell_styles, self._columns[column][1].weather
+            )
+            row_style = self.get_component_rich_style(
+                "forecast-grid--even-row" if row % 2 == 0 else "forecast-grid--odd-row"
+            )
+            padding = self.column_width - len(text)
+            cell = self._cells[key] = [
+                Segment(" " * (padding // 2), row_style),
+                Segment(text, row_style + style if style else row_style),
+                Segment(" " * (padding - padding // 2), row_style),
+            ]
+        return cell
@@ -1,37 +1,137 @@
+import time
+from typing import Any
+
 import requests
+from textual import work
 from textual.app import ComposeResult
+from textual.message import Message
 from textual.widgets import Input, Static
-from textual_autocomplete import AutoComplete, Dropdown, DropdownItem
+from textual.worker import get_current_worker
+from textual_autocomplete import AutoComplete, Dropdown, DropdownItem, InputState
 
-from weather_uk.domain.locations import get_locations_list
+from weather_uk.data import models
+from weather_uk.domain import instrumentation
+from weather_uk.domain.locations import get_location_index, iter_locations_list
+from weather_uk.domain.resilience import CircuitOpenError
+from weather_uk.domain.scheduler import QuotaExceededError
+from weather_uk.domain.search import LocationIndex
 
 
 class LocationSearch(Static):
+    # Send locations to the dropdown in batches as the sitelist streams in
+    BATCH_SIZE: int = 500
+    BATCH_INTERVAL: float = 0.1
+
+    MAX_MATCHES: int = 30
+
+    class LocationsLoaded(Message):
+        def __init__(self, locations: list[models.Location]) -> None:
+            super().__init__()
+            self.locations: list[models.Location] = locations
+
+    class IndexLoaded(Message):
+        def __init__(self, index: LocationIndex) -> None:
+            super().__init__()
+            self.index: LocationIndex = index
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._locations: list[models.Location] = []
+        self._location_index: LocationIndex | None = None
+
     def compose(self) -> ComposeResult:
         yield AutoComplete(
             Input(placeholder="Search for a location"),
-            Dropdown(items=self.get_location_items()),
+            Dropdown(items=self.get_location_items),
         )
 
     def on_mount(self) -> None:
         self.query_one(Input).focus()
+        self.load_locations()
 
-    def get_location_items(self) -> list[DropdownItem]:
-        weather_api = self.app._weather_api  # type: ignore[attr-defined]
-        locations_data = []
-        try:
-            locations_data = get_locations_list(weather_api)
+    def get_location_items(self, input_state: InputState) -> list[DropdownItem]:
+        with instrumentation.span(
+            "search.get_location_items",
+            indexed=self._location_index is not None,
+            query_length=len(input_state.value),
+        ):
+            return self._get_location_items(input_state)
 
-        # TODO: Handle requests exceptions
-        except requests.exceptions.HTTPError:
-            pass
+    def _get_location_items(self, input_state: InputState) -> list[DropdownItem]:
+        if self._location_index is not None:
+            matches = self._location_index.search(
+                input_state.value, limit=self.MAX_MATCHES
+            )
+        else:
+            # Search the locations received so far until the index is ready
+            value = input_state.value.lower()
+            matches = [
+                location
+                for location in self._locations
+                if value in str(location).lower()
+            ]
+            matches.sort(
+                key=lambda location: not location.name.lower().startswith(value)
+            )
 
         return [
             DropdownItem(main=str(location), right_meta=str(location.id))
-            for location in locations_data
+            for location in matches[: self.MAX_MATCHES]
         ]
 
+    @work(thread=True, exclusive=True)
+    def load_locations(self) -> None:
+        weather_api = self.app._weather_api  # type: ignore[attr-defined]
+        locations_cache = self.app._locations_cache  # type: ignore[attr-defined]
+        worker = get_current_worker()
+        locations: list[models.Location] = []
+        batch: list[models.Location] = []
+        last_sent: float = time.monotonic()
+        try:
+            for location in iter_locations_list(weather_api):
+                if worker.is_cancelled:
+                    return
+                locations.append(location)
+                batch.append(location)
+                now = time.monotonic()
+                if (
+                    len(batch) >= self.BATCH_SIZE
+                    or now - last_sent >= self.BATCH_INTERVAL
+                ):
+                    self.post_message(self.LocationsLoaded(batch))
+                    batch = []
+                    last_sent = now
+        except (
+            requests.exceptions.RequestException,
+            CircuitOpenError,
+            QuotaExceededError,
+        ) as err:
+            self.notify(str(err), title="Couldn't load locations", severity="error")
+
+        if batch:
+            self.post_message(self.LocationsLoaded(batch))
+
+        if locations and not worker.is_cancelled:
+            index = get_location_index(locations, locations_cache)
+            self.post_message(self.IndexLoaded(index))
+
+    def on_location_search_locations_loaded(self, event: LocationsLoaded) -> None:
+        self._locations.extend(event.locations)
+        self.refresh_matches()
+
+    def on_location_search_index_loaded(self, event: IndexLoaded) -> None:
+        self._location_index = event.index
+        self.refresh_matches()
+
+    def refresh_matches(self) -> None:
+        # Update the matches if the user has already started typing
+        autocomplete = self.query_one(AutoComplete)
+        search_input = autocomplete.input
+        if search_input.value:
+            autocomplete.dropdown.sync_state(
+                search_input.value, search_input.cursor_position
+            )
+
     def on_auto_complete_selected(self, event: AutoComplete.Selected) -> None:
         location_id: int = int(str(event.item.right_meta))
-        self.app._location_id = location_id  # type: ignore[attr-defined]
-        self.app.push_screen("forecast")
+        self.app.show_forecast(location_id)  # type: ignore[attr-defined]
@@ -0,0 +1,58 @@
+from typing import Any
+
+from textual.widgets import OptionList
+from textual.widgets.option_list import Option, Separator
+
+from weather_uk.data import models
+
+
+class SavedLocations(OptionList):
+    """The user's favourite and recent locations, for quick access."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._location_names: dict[int, str] = {}
+        self._favourites: list[int] = []
+        self._recent_locations: list[int] = []
+
+    def show_locations(
+        self, favourites: list[int], recent_locations: list[int]
+    ) -> None:
+        self._favourites = favourites
+        self._recent_locations = [
+            location_id
+            for location_id in recent_locations
+            if location_id not in favourites
+        ]
+        self.refresh_options()
+
+    def add_location_names(self, locations: list[models.Location]) -> None:
+        self._location_names.update(
+            (location.id, str(location)) for location in locations
+        )
+        self.refresh_options()
+
+    def refresh_options(self) -> None:
+        highlighted = self.highlighted
+        self.clear_options()
+        for location_id in self._favourites:
+            self.add_option(
+                Option(f"★ {self._location_name(location_id)}", str(location_id))
+            )
+        if self._favourites and self._recent_locations:
+            self.add_option(Separator())
+        for location_id in self._recent_locations:
+            self.add_option(
+                Option(f"  {self._location_name(location_id)}", str(location_id))
+            )
+        self.display = self.option_count > 0
+        if highlighted is not None and highlighted < self.option_count:
+            self.highlighted = highlighted
+
+    def on_option_list_option_selected(self, event: OptionList.OptionSelected) -> None:
+        assert event.option.id is not None
+        self.app.show_forecast(int(event.option.id))  # type: ignore[attr-defined]
+
+    def _location_name(self, location_id: int) -> str:
+        # Names are only known once the sitelist has loaded
+        return self._location_names.get(location_id, str(location_id))
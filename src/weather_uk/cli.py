@@ -0,0 +1,306 @@
+"""Command line entry point.
+
+Running `weather-uk` with no command starts the TUI. The `forecast` command
+prints forecasts without starting the TUI (or importing Textual), e.g. for
+cron jobs and monitoring:
+
+    weather-uk forecast --id 310069 --format csv
+    weather-uk forecast --ids-file sites.txt --format json
+    weather-uk forecast --id 3772 --resolution hourly  # observations
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import sys
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Sequence, TextIO
+
+from weather_uk import config
+from weather_uk.data import models
+from weather_uk.domain.cache import ForecastCache
+from weather_uk.domain.scheduler import RequestScheduler
+from weather_uk.domain.weather_api_client import (
+    ForecastsNotFoundError,
+    MetOfficeAPIClient,
+)
+
+FORMATS = ("json", "csv", "table")
+
+FIELDS: tuple[str, ...] = (
+    "location_id",
+    "time",
+    "weather_type",
+    "precipitation_probability",
+    "temp_celsius",
+    "feels_like_temp_celsius",
+    "wind_direction",
+    "wind_speed_mph",
+    "wind_gust_mph",
+    "visibility",
+    "humidity_percent",
+    "max_uv_index",
+)
+
+# Column headings and widths for the table format
+TABLE_COLUMNS: tuple[tuple[str, int], ...] = (
+    ("Location", 8),
+    ("Time (UTC)", 16),
+    ("Weather", 26),
+    ("Precip", 6),
+    ("Temp", 4),
+    ("Feels", 5),
+    ("Wind", 4),
+    ("Speed", 5),
+    ("Gust", 4),
+    ("Vis", 3),
+    ("Humidity", 8),
+    ("UV", 2),
+)
+
+
+def run() -> None:
+    sys.exit(main())
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        # Only import Textual when starting the TUI
+        from weather_uk.app import app
+
+        app.run()
+        return 0
+
+    location_ids: list[int] = list(args.ids)
+    if args.ids_file is not None:
+        try:
+            location_ids.extend(read_location_ids(args.ids_file))
+        except OSError as err:
+            parser.error(f"can't read {args.ids_file}: {err.strerror}")
+        except ValueError as err:
+            parser.error(str(err))
+    if not location_ids:
+        parser.error("no location IDs given, use --id or --ids-file")
+
+    api_key: str = args.api_key or config.load_config().api_key
+    if not api_key:
+        print("No API key, enter one in the app or use --api-key", file=sys.stderr)
+        return 2
+
+    # Share the app's forecast cache and fair use allowance
+    api_client = MetOfficeAPIClient(
+        api_key,
+        forecast_cache=ForecastCache(config.FORECAST_CACHE_PATH),
+        scheduler=RequestScheduler(usage_filepath=config.USAGE_FILEPATH),
+    )
+    return print_forecasts(
+        api_client,
+        location_ids,
+        args.format,
+        sys.stdout,
+        models.Resolution(args.resolution),
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="weather-uk",
+        description="Check UK weather forecasts from your terminal.",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    forecast_parser = subparsers.add_parser(
+        "forecast", help="print forecasts without starting the app"
+    )
+    forecast_parser.add_argument(
+        "--id",
+        dest="ids",
+        type=int,
+        action="append",
+        default=[],
+        metavar="LOCATION_ID",
+        help="DataPoint location ID, can be given more than once",
+    )
+    forecast_parser.add_argument(
+        "--ids-file",
+        type=Path,
+        help="file of location IDs, one per line ('-' for stdin)",
+    )
+    forecast_parser.add_argument("--format", choices=FORMATS, default="table")
+    forecast_parser.add_argument(
+        "--resolution",
+        choices=[resolution.value for resolution in models.Resolution],
+        default=models.Resolution.THREE_HOURLY.value,
+        help="forecast resolution, or 'hourly' for the latest observations",
+    )
+    forecast_parser.add_argument(
+        "--api-key", help="DataPoint API key, instead of the one saved by the app"
+    )
+    return parser
+
+
+def read_location_ids(filepath: Path) -> Iterator[int]:
+    """Read location IDs one per line, skipping blank lines and # comments.
+    Raises ValueError for a line that isn't a location ID.
+    """
+    if str(filepath) == "-":
+        lines: Iterable[str] = sys.stdin
+    else:
+        lines = filepath.read_text().splitlines()
+
+    for line_number, line in enumerate(lines, start=1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        try:
+            yield int(line)
+        except ValueError:
+            raise ValueError(
+                f"{filepath}, line {line_number}: {line!r} isn't a location ID"
+            ) from None
+
+
+def print_forecasts(
+    api_client: MetOfficeAPIClient,
+    location_ids: list[int],
+    output_format: str,
+    out: TextIO,
+    resolution: models.Resolution = models.Resolution.THREE_HOURLY,
+) -> int:
+    """Print the forecasts as each arrives, in the order of `location_ids`.
+    Returns the exit status, which is 1 if any forecast couldn't be fetched.
+    """
+    writers: dict[str, type[ForecastWriter]] = {
+        "json": JSONForecastWriter,
+        "csv": CSVForecastWriter,
+        "table": TableForecastWriter,
+    }
+    writer = writers[output_format](out)
+
+    status = 0
+    for location_id, forecast in _fetch_forecasts(api_client, location_ids, resolution):
+        if isinstance(forecast, Exception):
+            print(f"{location_id}: {forecast}", file=sys.stderr)
+            status = 1
+        else:
+            writer.write(location_id, forecast)
+            out.flush()
+
+    return status
+
+
+def forecast_rows(
+    location_id: int, forecast: list[models.ForecastDay]
+) -> Iterator[dict[str, Any]]:
+    for day in forecast:
+        for hour in day.hours:
+            weather = hour.weather
+            time = datetime.datetime.combine(
+                day.date, hour.time, tzinfo=datetime.timezone.utc
+            )
+            yield {
+                "location_id": location_id,
+                "time": time.isoformat(),
+                "weather_type": (
+                    None if weather.weather_type is None else str(weather.weather_type)
+                ),
+                "precipitation_probability": weather.precipitation_probability,
+                "temp_celsius": weather.temp_celsius,
+                "feels_like_temp_celsius": weather.feels_like_temp_celsius,
+                "wind_direction": weather.wind_direction,
+                "wind_speed_mph": weather.wind_speed_mph,
+                "wind_gust_mph": weather.wind_gust_mph,
+                "visibility": weather.visibility,
+                "humidity_percent": weather.humidity_percent,
+                "max_uv_index": weather.max_uv_index,
+            }
+
+
+class ForecastWriter(ABC):
+    def __init__(self, out: TextIO) -> None:
+        self.out: TextIO = out
+
+    @abstractmethod
+    def write(self, location_id: int, forecast: list[models.ForecastDay]) -> None:
+        raise NotImplementedError
+
+
+class JSONForecastWriter(ForecastWriter):
+    """Writes one JSON object per line, so each location can be read as it
+    arrives.
+    """
+
+    def write(self, location_id: int, forecast: list[models.ForecastDay]) -> None:
+        rows = list(forecast_rows(location_id, forecast))
+        for row in rows:
+            del row["location_id"]
+        self.out.write(json.dumps({"location_id": location_id, "forecast": rows}))
+        self.out.write("\n")
+
+
+class CSVForecastWriter(ForecastWriter):
+    def __init__(self, out: TextIO) -> None:
+        super().__init__(out)
+        self._writer = csv.DictWriter(out, fieldnames=FIELDS)
+        self._writer.writeheader()
+
+    def write(self, location_id: int, forecast: list[models.ForecastDay]) -> None:
+        self._writer.writerows(forecast_rows(location_id, forecast))
+
+
+class TableForecastWriter(ForecastWriter):
+    def __init__(self, out: TextIO) -> None:
+        super().__init__(out)
+        self._write_line(heading for heading, _ in TABLE_COLUMNS)
+
+    def write(self, location_id: int, forecast: list[models.ForecastDay]) -> None:
+        for row in forecast_rows(location_id, forecast):
+            row["time"] = row["time"][:16].replace("T", " ")
+            for field in ("precipitation_probability", "humidity_percent"):
+                if row[field] is not None:
+                    row[field] = f"{row[field]}%"
+            self._write_line(
+                "-" if row[field] is None else row[field] for field in FIELDS
+            )
+
+    def _write_line(self, values: Iterable[Any]) -> None:
+        cells = (
+            f"{value!s:<{width}}" for value, (_, width) in zip(values, TABLE_COLUMNS)
+        )
+        self.out.write("  ".join(cells).rstrip() + "\n")
+
+
+def _fetch_forecasts(
+    api_client: MetOfficeAPIClient,
+    location_ids: list[int],
+    resolution: models.Resolution,
+) -> Iterator[tuple[int, list[models.ForecastDay] | Exception]]:
+    if len(location_ids) > api_client.BULK_FORECASTS_THRESHOLD:
+        # Fetched in one bulk request, so nothing arrives until it all has
+        bulk_err: Exception = LookupError("No forecast for this location")
+        try:
+            forecasts = api_client.get_forecasts(location_ids, resolution)
+        except ForecastsNotFoundError as err:
+            forecasts = err.forecasts
+        except Exception as err:
+            forecasts = {}
+            bulk_err = err
+        for location_id in location_ids:
+            yield location_id, forecasts.get(location_id, bulk_err)
+        return
+
+    def get_forecast(location_id: int) -> list[models.ForecastDay] | Exception:
+        try:
+            return api_client.get_forecast(location_id, resolution)
+        except Exception as err:
+            return err
+
+    max_workers = min(len(location_ids), api_client.MAX_PARALLEL_REQUESTS)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        yield from zip(location_ids, executor.map(get_forecast, location_ids))
@@ -1,17 +1,30 @@
 import configparser
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import platformdirs
 
 APPNAME = "weather-uk"
 USER_CONFIG_PATH = platformdirs.user_config_path(APPNAME)
+USER_CACHE_PATH = platformdirs.user_cache_path(APPNAME)
+USER_LOG_PATH = platformdirs.user_log_path(APPNAME)
 CONFIG_FILEPATH = Path(USER_CONFIG_PATH / "weather-uk.cfg")
+SITELIST_CACHE_FILEPATH = Path(USER_CACHE_PATH / "sitelist.snapshot")
+FORECAST_CACHE_PATH = Path(USER_CACHE_PATH / "forecasts")
+USAGE_FILEPATH = Path(USER_CACHE_PATH / "usage.json")
+TRACES_PATH = Path(USER_LOG_PATH / "traces")
+
+MAX_RECENT_LOCATIONS = 10
 
 
 @dataclass
 class UserConfig:
     api_key: str
+    favourites: list[int] = field(default_factory=list)
+    # Most recent first
+    recent_locations: list[int] = field(default_factory=list)
+    # Colours for the forecast, see `weather_uk.app.styling`
+    theme: dict[str, str] = field(default_factory=dict)
 
 
 def ensure_config_file_exists(filepath: Path) -> None:
@@ -27,7 +40,11 @@ def load_config(filepath: Path = CONFIG_FILEPATH) -> UserConfig:
     config.read(filepath)
 
     api_key = config["weather_api"]["api_key"]
-    return UserConfig(api_key)
+    locations = config["locations"] if "locations" in config else {}
+    favourites = _parse_location_ids(locations.get("favourites", ""))
+    recent_locations = _parse_location_ids(locations.get("recent", ""))
+    theme = dict(config["theme"]) if "theme" in config else {}
+    return UserConfig(api_key, favourites, recent_locations, theme)
 
 
 def update_config(
@@ -46,3 +63,60 @@ def update_config(
         config.write(configfile)
 
     return load_config(filepath)
+
+
+def toggle_favourite(
+    location_id: int,
+    filepath: Path = CONFIG_FILEPATH,
+) -> UserConfig:
+    favourites = load_config(filepath).favourites
+    if location_id in favourites:
+        favourites.remove(location_id)
+    else:
+        favourites.append(location_id)
+
+    return _update_locations(filepath, favourites=favourites)
+
+
+def add_recent_location(
+    location_id: int,
+    filepath: Path = CONFIG_FILEPATH,
+) -> UserConfig:
+    recent_locations = load_config(filepath).recent_locations
+    if location_id in recent_locations:
+        recent_locations.remove(location_id)
+    recent_locations.insert(0, location_id)
+
+    return _update_locations(
+        filepath, recent_locations=recent_locations[:MAX_RECENT_LOCATIONS]
+    )
+
+
+def _update_locations(
+    filepath: Path,
+    favourites: list[int] | None = None,
+    recent_locations: list[int] | None = None,
+) -> UserConfig:
+    config = configparser.ConfigParser()
+    config.read(filepath)
+
+    if "locations" not in config:
+        config["locations"] = {}
+
+    if favourites is not None:
+        config["locations"]["favourites"] = _format_location_ids(favourites)
+    if recent_locations is not None:
+        config["locations"]["recent"] = _format_location_ids(recent_locations)
+
+    with open(filepath, "w") as configfile:
+        config.write(configfile)
+
+    return load_config(filepath)
+
+
+def _parse_location_ids(value: str) -> list[int]:
+    return [int(location_id) for location_id in value.split(",") if location_id]
+
+
+def _format_location_ids(location_ids: list[int]) -> str:
+    return ",".join(str(location_id) for location_id in location_ids)
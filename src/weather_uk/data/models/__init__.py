@@ -1,11 +1,18 @@
 from weather_uk.data.models.forecast import ForecastDay, ForecastHour
+from weather_uk.data.models.forecast_series import ForecastRow, ForecastSeries
 from weather_uk.data.models.location import Location
+from weather_uk.data.models.location_table import LocationTable
+from weather_uk.data.models.resolution import Resolution
 from weather_uk.data.models.weather import Weather, WeatherType
 
 __all__ = [
     "ForecastDay",
     "ForecastHour",
+    "ForecastRow",
+    "ForecastSeries",
     "Location",
+    "LocationTable",
+    "Resolution",
     "Weather",
     "WeatherType",
 ]
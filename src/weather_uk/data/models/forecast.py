@@ -6,13 +6,13 @@ from dataclasses import dataclass
 from weather_uk.data import models
 
 
-@dataclass(order=True)
+@dataclass(order=True, slots=True)
 class ForecastDay:
     date: datetime.date
     hours: list[ForecastHour]
 
 
-@dataclass()
+@dataclass(slots=True)
 class ForecastHour:
     time: datetime.time
     weather: models.Weather
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import datetime
+from array import array
+from typing import Iterable, Iterator
+
+from weather_uk.data.models.forecast import ForecastDay, ForecastHour
+from weather_uk.data.models.weather import Weather, WeatherType
+
+COMPASS_POINTS: tuple[str, ...] = (
+    "N",
+    "NNE",
+    "NE",
+    "ENE",
+    "E",
+    "ESE",
+    "SE",
+    "SSE",
+    "S",
+    "SSW",
+    "SW",
+    "WSW",
+    "W",
+    "WNW",
+    "NW",
+    "NNW",
+)
+
+VISIBILITY_CODES: tuple[str, ...] = ("UN", "VP", "PO", "MO", "GO", "VG", "EX")
+
+WEATHER_TYPES: tuple[WeatherType, ...] = tuple(WeatherType)
+
+# Stored in place of the values that aren't given for every resolution (see
+# `Weather`), one for each array type
+MISSING_UNSIGNED_BYTE: int = 0xFF
+MISSING_SIGNED_BYTE: int = -0x80
+MISSING_UNSIGNED_SHORT: int = 0xFFFF
+
+_COMPASS_INDEX: dict[str, int] = {point: i for i, point in enumerate(COMPASS_POINTS)}
+_VISIBILITY_INDEX: dict[str, int] = {code: i for i, code in enumerate(VISIBILITY_CODES)}
+
+
+class ForecastSeries:
+    """Forecast for a site stored as one typed array per field, rather than an
+    object per period, so many forecasts can be held compactly in memory and
+    each field can be read as a whole column.
+
+    Times are stored as UTC timestamps, and the weather type, wind direction
+    and visibility as codes indexing `WEATHER_TYPES`, `COMPASS_POINTS` and
+    `VISIBILITY_CODES`. The temperature and humidity are stored in tenths, as
+    observations are given to one decimal place. Values that weren't given are
+    stored as the `MISSING_*` value for the array type, and read from a
+    `ForecastRow` as None.
+    """
+
+    __slots__ = (
+        "timestamps",
+        "weather_type",
+        "precipitation_probability",
+        "temp_celsius",
+        "feels_like_temp_celsius",
+        "wind_direction",
+        "wind_speed_mph",
+        "wind_gust_mph",
+        "visibility",
+        "humidity_percent",
+        "max_uv_index",
+    )
+
+    def __init__(self) -> None:
+        self.timestamps: array[int] = array("q")
+        self.weather_type: array[int] = array("B")
+        self.precipitation_probability: array[int] = array("B")
+        self.temp_celsius: array[int] = array("h")
+        self.feels_like_temp_celsius: array[int] = array("b")
+        self.wind_direction: array[int] = array("B")
+        self.wind_speed_mph: array[int] = array("H")
+        self.wind_gust_mph: array[int] = array("H")
+        self.visibility: array[int] = array("B")
+        self.humidity_percent: array[int] = array("h")
+        self.max_uv_index: array[int] = array("B")
+
+    @classmethod
+    def from_forecast_days(cls, forecast_days: Iterable[ForecastDay]) -> ForecastSeries:
+        series = cls()
+        for day in forecast_days:
+            for hour in day.hours:
+                timestamp = datetime.datetime.combine(
+                    day.date, hour.time, tzinfo=datetime.timezone.utc
+                ).timestamp()
+                series.append_weather(int(timestamp), hour.weather)
+        return series
+
+    def append(
+        self,
+        timestamp: int,
+        weather_type: int | None,
+        precipitation_probability: int | None,
+        temp_celsius: float,
+        feels_like_temp_celsius: int | None,
+        wind_direction: str | None,
+        wind_speed_mph: int | None,
+        wind_gust_mph: int | None,
+        visibility: str | None,
+        humidity_percent: float,
+        max_uv_index: int | None,
+    ) -> None:
+        self.timestamps.append(timestamp)
+        self.weather_type.append(
+            MISSING_UNSIGNED_BYTE if weather_type is None else weather_type
+        )
+        self.precipitation_probability.append(
+            MISSING_UNSIGNED_BYTE
+            if precipitation_probability is None
+            else precipitation_probability
+        )
+        self.temp_celsius.append(round(temp_celsius * 10))
+        self.feels_like_temp_celsius.append(
+            MISSING_SIGNED_BYTE
+            if feels_like_temp_celsius is None
+            else feels_like_temp_celsius
+        )
+        self.wind_direction.append(
+            MISSING_UNSIGNED_BYTE
+            if wind_direction is None
+            else _COMPASS_INDEX[wind_direction]
+        )
+        self.wind_speed_mph.append(
+            MISSING_UNSIGNED_SHORT if wind_speed_mph is None else wind_speed_mph
+        )
+        self.wind_gust_mph.append(
+            MISSING_UNSIGNED_SHORT if wind_gust_mph is None else wind_gust_mph
+        )
+        self.visibility.append(
+            MISSING_UNSIGNED_BYTE
+            if visibility is None
+            else _VISIBILITY_INDEX[visibility]
+        )
+        self.humidity_percent.append(round(humidity_percent * 10))
+        self.max_uv_index.append(
+            MISSING_UNSIGNED_BYTE if max_uv_index is None else max_uv_index
+        )
+
+    def append_weather(self, timestamp: int, weather: Weather) -> None:
+        self.append(
+            timestamp,
+            None if weather.weather_type is None else weather.weather_type.value,
+            _optional_int(weather.precipitation_probability),
+            weather.temp_celsius,
+            _optional_int(weather.feels_like_temp_celsius),
+            weather.wind_direction,
+            _optional_int(weather.wind_speed_mph),
+            _optional_int(weather.wind_gust_mph),
+            weather.visibility,
+            weather.humidity_percent,
+            weather.max_uv_index,
+        )
+
+    def to_forecast_days(self) -> list[ForecastDay]:
+        forecast: list[ForecastDay] = []
+        for row in self:
+            time = row.time
+            if not forecast or forecast[-1].date != time.date():
+                forecast.append(ForecastDay(date=time.date(), hours=[]))
+            forecast[-1].hours.append(
+                ForecastHour(time.time().replace(tzinfo=None), row.weather)
+            )
+        return forecast
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index: int) -> ForecastRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("forecast series index out of range")
+        return ForecastRow(self, index)
+
+    def __iter__(self) -> Iterator[ForecastRow]:
+        for index in range(len(self)):
+            yield ForecastRow(self, index)
+
+
+class ForecastRow:
+    """View of a single period in a `ForecastSeries`."""
+
+    __slots__ = ("_series", "_index")
+
+    def __init__(self, series: ForecastSeries, index: int) -> None:
+        self._series: ForecastSeries = series
+        self._index: int = index
+
+    @property
+    def time(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(
+            self._series.timestamps[self._index], tz=datetime.timezone.utc
+        )
+
+    @property
+    def weather_type(self) -> WeatherType | None:
+        value = self._series.weather_type[self._index]
+        return None if value == MISSING_UNSIGNED_BYTE else WEATHER_TYPES[value]
+
+    @property
+    def precipitation_probability(self) -> int | None:
+        value = self._series.precipitation_probability[self._index]
+        return None if value == MISSING_UNSIGNED_BYTE else value
+
+    @property
+    def temp_celsius(self) -> float:
+        return from_tenths(self._series.temp_celsius[self._index])
+
+    @property
+    def feels_like_temp_celsius(self) -> int | None:
+        value = self._series.feels_like_temp_celsius[self._index]
+        return None if value == MISSING_SIGNED_BYTE else value
+
+    @property
+    def wind_direction(self) -> str | None:
+        value = self._series.wind_direction[self._index]
+        return None if value == MISSING_UNSIGNED_BYTE else COMPASS_POINTS[value]
+
+    @property
+    def wind_speed_mph(self) -> int | None:
+        value = self._series.wind_speed_mph[self._index]
+        return None if value == MISSING_UNSIGNED_SHORT else value
+
+    @property
+    def wind_gust_mph(self) -> int | None:
+        value = self._series.wind_gust_mph[self._index]
+        return None if value == MISSING_UNSIGNED_SHORT else value
+
+    @property
+    def visibility(self) -> str | None:
+        value = self._series.visibility[self._index]
+        return None if value == MISSING_UNSIGNED_BYTE else VISIBILITY_CODES[value]
+
+    @property
+    def humidity_percent(self) -> float:
+        return from_tenths(self._series.humidity_percent[self._index])
+
+    @property
+    def max_uv_index(self) -> int | None:
+        value = self._series.max_uv_index[self._index]
+        return None if value == MISSING_UNSIGNED_BYTE else value
+
+    @property
+    def weather(self) -> Weather:
+        return Weather(
+            weather_type=self.weather_type,
+            precipitation_probability=self.precipitation_probability,
+            temp_celsius=self.temp_celsius,
+            feels_like_temp_celsius=self.feels_like_temp_celsius,
+            wind_direction=self.wind_direction,
+            wind_speed_mph=self.wind_speed_mph,
+            wind_gust_mph=self.wind_gust_mph,
+            visibility=self.visibility,
+            humidity_percent=self.humidity_percent,
+            max_uv_index=self.max_uv_index,
+        )
+
+
+def from_tenths(value: int) -> float:
+    """Value stored in tenths, as a whole number if it is one."""
+    whole, tenths = divmod(value, 10)
+    return whole if not tenths else value / 10
+
+
+def _optional_int(value: float | None) -> int | None:
+    return None if value is None else round(value)
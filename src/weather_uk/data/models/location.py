@@ -6,6 +6,11 @@ class Location:
     id: int
     name: str
     region: str | None
+    # Sites are identified by their id, name and region, so the coordinates
+    # aren't compared
+    latitude: float | None = dataclasses.field(default=None, compare=False)
+    longitude: float | None = dataclasses.field(default=None, compare=False)
+    elevation: float | None = dataclasses.field(default=None, compare=False)
 
     def __str__(self) -> str:
         if self.region:
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Iterator, Sequence, overload
+
+from weather_uk.data.models.location import Location
+
+# Stored in place of the region of a site without one
+NO_REGION: int = 0xFFFF
+
+
+class LocationTable(Sequence[Location]):
+    """Sites stored as a few arrays, rather than an object per site, with each
+    `Location` only built when it is read.
+
+    The names of all the sites are concatenated into one string, sliced by
+    `name_offsets`, and each site's region is an index into `regions`. Missing
+    coordinates are stored as NaN.
+    """
+
+    __slots__ = (
+        "ids",
+        "names",
+        "name_offsets",
+        "region_index",
+        "regions",
+        "coordinates",
+    )
+
+    def __init__(
+        self,
+        ids: array[int],
+        names: str,
+        name_offsets: array[int],
+        region_index: array[int],
+        regions: list[str],
+        coordinates: array[float],
+    ) -> None:
+        self.ids: array[int] = ids
+        self.names: str = names
+        self.name_offsets: array[int] = name_offsets
+        self.region_index: array[int] = region_index
+        self.regions: list[str] = regions
+        # The latitude, longitude and elevation of each site in turn
+        self.coordinates: array[float] = coordinates
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @overload
+    def __getitem__(self, index: int) -> Location: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Location]: ...
+
+    def __getitem__(self, index: int | slice) -> Location | list[Location]:
+        if isinstance(index, slice):
+            return [self._location(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("location index out of range")
+        return self._location(index)
+
+    def __iter__(self) -> Iterator[Location]:
+        return map(self._location, range(len(self)))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            location == other_location for location, other_location in zip(self, other)
+        )
+
+    def name(self, index: int) -> str:
+        return self.names[self.name_offsets[index] : self.name_offsets[index + 1]]
+
+    def _location(self, index: int) -> Location:
+        region = self.region_index[index]
+        return Location(
+            self.ids[index],
+            self.name(index),
+            None if region == NO_REGION else self.regions[region],
+            latitude=_optional_coordinate(self.coordinates[3 * index]),
+            longitude=_optional_coordinate(self.coordinates[3 * index + 1]),
+            elevation=_optional_coordinate(self.coordinates[3 * index + 2]),
+        )
+
+
+def _optional_coordinate(value: float) -> float | None:
+    return None if math.isnan(value) else value
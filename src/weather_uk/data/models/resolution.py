@@ -0,0 +1,20 @@
+from enum import Enum
+
+
+class Resolution(str, Enum):
+    """DataPoint site-specific data resolutions, by their `res` query value.
+
+    Forecasts are given every 3 hours or as a day and a night period, and
+    observations every hour.
+    """
+
+    THREE_HOURLY = "3hourly"
+    DAILY = "daily"
+    HOURLY = "hourly"
+
+    def __str__(self) -> str:
+        return self.value
+
+    @property
+    def is_observations(self) -> bool:
+        return self is Resolution.HOURLY
@@ -4,18 +4,25 @@ from dataclasses import dataclass
 from enum import Enum
 
 
-@dataclass
+@dataclass(slots=True)
 class Weather:
-    weather_type: WeatherType
-    precipitation_probability: float
+    """Weather for one period. Observations don't include the chance of
+    precipitation, feels like temperature or UV index, or a gust unless there
+    was one, and daily forecasts have no UV index at night, so these are None
+    when not given. Some stations don't report the weather type, wind or
+    visibility either.
+    """
+
+    weather_type: WeatherType | None
+    precipitation_probability: float | None
     temp_celsius: float
-    feels_like_temp_celsius: float
-    wind_direction: str
-    wind_speed_mph: float
-    wind_gust_mph: float
-    visibility: str
+    feels_like_temp_celsius: float | None
+    wind_direction: str | None
+    wind_speed_mph: float | None
+    wind_gust_mph: float | None
+    visibility: str | None
     humidity_percent: float
-    max_uv_index: int
+    max_uv_index: int | None
 
 
 class WeatherType(Enum):
@@ -0,0 +1,401 @@
+"""Summary statistics for forecasts, computed column-wise over `ForecastSeries`.
+
+Uses NumPy when it is installed, so many locations can be summarised in one
+batched pass, with a pure Python fallback giving the same results.
+
+All times are UTC, as issued by DataPoint. Values missing from a series (e.g.
+the UV index at night in a daily forecast) are left out of every statistic.
+"""
+
+import datetime
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+
+from weather_uk.data import models
+from weather_uk.data.models.forecast_series import (
+    MISSING_UNSIGNED_BYTE,
+    MISSING_UNSIGNED_SHORT,
+    from_tenths,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+# A period is dry if rain is this unlikely, and rainy if at least this likely
+DRY_PRECIPITATION_PROBABILITY: int = 20
+RAIN_PRECIPITATION_PROBABILITY: int = 50
+# Moderate UV, when sun protection is advised
+MIN_UV_EXPOSURE_INDEX: int = 3
+
+DEFAULT_PERIOD: datetime.timedelta = datetime.timedelta(hours=3)
+_SECONDS_PER_DAY: int = 24 * 60 * 60
+
+
+@dataclass
+class DailyTemperature:
+    date: datetime.date
+    min_celsius: float
+    max_celsius: float
+    mean_celsius: float
+
+
+@dataclass
+class TimeWindow:
+    start: datetime.datetime
+    end: datetime.datetime
+
+
+@dataclass
+class ForecastSummary:
+    daily_temperatures: list[DailyTemperature]
+    longest_dry_window: TimeWindow | None
+    peak_gust_mph: int | None
+    peak_gust_time: datetime.datetime | None
+    uv_exposure: TimeWindow | None
+    first_rain: datetime.datetime | None
+
+
+def summarise_forecast(series: models.ForecastSeries) -> ForecastSummary:
+    return _summarise_python(series)
+
+
+def summarise_forecasts(
+    series_by_location: Mapping[int, models.ForecastSeries],
+) -> dict[int, ForecastSummary]:
+    """Summarise the forecasts for many locations at once."""
+    if np is None:
+        return {
+            location_id: _summarise_python(series)
+            for location_id, series in series_by_location.items()
+        }
+    return _summarise_numpy(series_by_location)
+
+
+def rank_driest(
+    series_by_location: Mapping[int, models.ForecastSeries],
+    date: datetime.date,
+    start_hour: int = 12,
+    end_hour: int = 18,
+) -> list[tuple[int, float]]:
+    """Rank locations by the mean chance of precipitation for the periods
+    starting between `start_hour` and `end_hour` on `date`, driest first.
+
+    Returns (location ID, mean chance) pairs, leaving out locations with no
+    forecast for those hours.
+    """
+    if np is None:
+        return _rank_driest_python(series_by_location, date, start_hour, end_hour)
+    return _rank_driest_numpy(series_by_location, date, start_hour, end_hour)
+
+
+def _timestamp_to_datetime(timestamp: int) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+
+
+def _day_number(date: datetime.date) -> int:
+    start_of_day = datetime.datetime.combine(
+        date, datetime.time(), tzinfo=datetime.timezone.utc
+    )
+    return int(start_of_day.timestamp()) // _SECONDS_PER_DAY
+
+
+def _period_seconds(series: models.ForecastSeries) -> int:
+    if len(series) < 2:
+        return int(DEFAULT_PERIOD.total_seconds())
+    return series.timestamps[1] - series.timestamps[0]
+
+
+def _window(series: models.ForecastSeries, start: int, end: int) -> TimeWindow:
+    """Window covering the periods from index `start` up to `end`."""
+    return TimeWindow(
+        _timestamp_to_datetime(series.timestamps[start]),
+        _timestamp_to_datetime(series.timestamps[end - 1] + _period_seconds(series)),
+    )
+
+
+def _summarise_python(series: models.ForecastSeries) -> ForecastSummary:
+    daily_temperatures: list[DailyTemperature] = []
+    day_temps: list[int] = []
+    day: int | None = None
+    for timestamp, temp in zip(series.timestamps, series.temp_celsius):
+        if timestamp // _SECONDS_PER_DAY != day:
+            if day_temps:
+                daily_temperatures.append(_daily_temperature(day, day_temps))
+            day = timestamp // _SECONDS_PER_DAY
+            day_temps = []
+        day_temps.append(temp)
+    if day_temps:
+        daily_temperatures.append(_daily_temperature(day, day_temps))
+
+    longest_dry: tuple[int, int] | None = None
+    uv_exposure: tuple[int, int] | None = None
+    dry_start: int | None = None
+    uv_start: int | None = None
+    # Walk one past the end, so the last run is closed
+    for idx in range(len(series) + 1):
+        in_range = idx < len(series)
+        is_dry = (
+            in_range
+            and series.precipitation_probability[idx] <= DRY_PRECIPITATION_PROBABILITY
+        )
+        if is_dry and dry_start is None:
+            dry_start = idx
+        elif not is_dry and dry_start is not None:
+            if longest_dry is None or idx - dry_start > longest_dry[1] - longest_dry[0]:
+                longest_dry = (dry_start, idx)
+            dry_start = None
+
+        is_uv = (
+            in_range
+            and series.max_uv_index[idx] != MISSING_UNSIGNED_BYTE
+            and series.max_uv_index[idx] >= MIN_UV_EXPOSURE_INDEX
+        )
+        if uv_exposure is None:
+            if is_uv and uv_start is None:
+                uv_start = idx
+            elif not is_uv and uv_start is not None:
+                uv_exposure = (uv_start, idx)
+
+    peak_gust_mph: int | None = None
+    peak_gust_time: datetime.datetime | None = None
+    gusts = [gust for gust in series.wind_gust_mph if gust != MISSING_UNSIGNED_SHORT]
+    if gusts:
+        peak_gust_mph = max(gusts)
+        peak_idx = series.wind_gust_mph.index(peak_gust_mph)
+        peak_gust_time = _timestamp_to_datetime(series.timestamps[peak_idx])
+
+    first_rain: datetime.datetime | None = None
+    for timestamp, chance in zip(series.timestamps, series.precipitation_probability):
+        if chance != MISSING_UNSIGNED_BYTE and chance >= RAIN_PRECIPITATION_PROBABILITY:
+            first_rain = _timestamp_to_datetime(timestamp)
+            break
+
+    return ForecastSummary(
+        daily_temperatures=daily_temperatures,
+        longest_dry_window=(
+            _window(series, *longest_dry) if longest_dry is not None else None
+        ),
+        peak_gust_mph=peak_gust_mph,
+        peak_gust_time=peak_gust_time,
+        uv_exposure=_window(series, *uv_exposure) if uv_exposure is not None else None,
+        first_rain=first_rain,
+    )
+
+
+def _daily_temperature(day: Optional[int], temps: list[int]) -> DailyTemperature:
+    # The temperatures are in tenths, as stored in the series
+    assert day is not None
+    return DailyTemperature(
+        date=_timestamp_to_datetime(day * _SECONDS_PER_DAY).date(),
+        min_celsius=from_tenths(min(temps)),
+        max_celsius=from_tenths(max(temps)),
+        mean_celsius=sum(temps) / len(temps) / 10,
+    )
+
+
+def _rank_driest_python(
+    series_by_location: Mapping[int, models.ForecastSeries],
+    date: datetime.date,
+    start_hour: int,
+    end_hour: int,
+) -> list[tuple[int, float]]:
+    day = _day_number(date)
+    ranking: list[tuple[int, float]] = []
+    for location_id, series in series_by_location.items():
+        chances = [
+            chance
+            for timestamp, chance in zip(
+                series.timestamps, series.precipitation_probability
+            )
+            if timestamp // _SECONDS_PER_DAY == day
+            and start_hour * 3600 <= timestamp % _SECONDS_PER_DAY < end_hour * 3600
+            and chance != MISSING_UNSIGNED_BYTE
+        ]
+        if chances:
+            ranking.append((location_id, sum(chances) / len(chances)))
+    ranking.sort(key=lambda item: (item[1], item[0]))
+    return ranking
+
+
+class _Columns:
+    """Columns of many series concatenated end to end, with the series each
+    period belongs to, so every series can be reduced in one NumPy call.
+    """
+
+    def __init__(self, series: list[models.ForecastSeries]) -> None:
+        self.lengths: Any = np.array([len(s) for s in series], dtype=np.intp)
+        self.starts: Any = np.concatenate(([0], np.cumsum(self.lengths)[:-1]))
+        self.owner: Any = np.repeat(np.arange(len(series)), self.lengths)
+
+    def column(self, series: list[models.ForecastSeries], field: str) -> Any:
+        arrays = [getattr(s, field) for s in series]
+        return np.concatenate(
+            [np.frombuffer(arr, dtype=arr.typecode) for arr in arrays]
+        )
+
+    def first_where(self, mask: Any) -> Any:
+        """Index of the first period in each series where `mask` is set, or -1."""
+        first = np.full(len(self.lengths), -1, dtype=np.intp)
+        idx = np.flatnonzero(mask)
+        owners, first_idx = np.unique(self.owner[idx], return_index=True)
+        first[owners] = idx[first_idx]
+        return first
+
+    def runs(self, mask: Any) -> tuple[Any, Any, Any]:
+        """Start, length and owning series of every run of set periods."""
+        is_start = mask.copy()
+        is_start[1:] &= ~mask[:-1] | (self.owner[1:] != self.owner[:-1])
+        is_end = mask.copy()
+        is_end[:-1] &= ~mask[1:] | (self.owner[1:] != self.owner[:-1])
+        run_starts = np.flatnonzero(is_start)
+        run_ends = np.flatnonzero(is_end) + 1
+        return run_starts, run_ends - run_starts, self.owner[run_starts]
+
+
+def _summarise_numpy(
+    series_by_location: Mapping[int, models.ForecastSeries],
+) -> dict[int, ForecastSummary]:
+    summaries: dict[int, ForecastSummary] = {
+        location_id: _summarise_python(series)
+        for location_id, series in series_by_location.items()
+        if not len(series)
+    }
+    location_ids = [
+        location_id for location_id, series in series_by_location.items() if len(series)
+    ]
+    if not location_ids:
+        return summaries
+
+    series = [series_by_location[location_id] for location_id in location_ids]
+    cols = _Columns(series)
+    timestamps = cols.column(series, "timestamps")
+    temps = cols.column(series, "temp_celsius").astype(np.int64)
+    gusts = cols.column(series, "wind_gust_mph")
+    chances = cols.column(series, "precipitation_probability")
+    uv = cols.column(series, "max_uv_index")
+
+    # Daily temperatures, grouping on each change of series or day
+    days = timestamps // _SECONDS_PER_DAY
+    new_group = np.ones(len(days), dtype=bool)
+    new_group[1:] = (days[1:] != days[:-1]) | (cols.owner[1:] != cols.owner[:-1])
+    group_starts = np.flatnonzero(new_group)
+    group_counts = np.diff(np.append(group_starts, len(days)))
+    group_mins = np.minimum.reduceat(temps, group_starts)
+    group_maxs = np.maximum.reduceat(temps, group_starts)
+    group_means = np.add.reduceat(temps, group_starts) / group_counts
+    group_owner = cols.owner[group_starts]
+
+    # Missing gusts are counted as calm for the reduction
+    has_gust = gusts != MISSING_UNSIGNED_SHORT
+    gusts = np.where(has_gust, gusts, 0)
+    any_gusts = np.logical_or.reduceat(has_gust, cols.starts)
+    peak_gusts = np.maximum.reduceat(gusts, cols.starts)
+    peak_gust_idx = cols.first_where(
+        has_gust & (gusts == np.repeat(peak_gusts, cols.lengths))
+    )
+    has_chance = chances != MISSING_UNSIGNED_BYTE
+    first_rain_idx = cols.first_where(
+        has_chance & (chances >= RAIN_PRECIPITATION_PROBABILITY)
+    )
+
+    dry_starts, dry_lengths, dry_owner = cols.runs(
+        chances <= DRY_PRECIPITATION_PROBABILITY
+    )
+    # Longest run per series, taking the earliest on a tie
+    order = np.lexsort((dry_starts, -dry_lengths, dry_owner))
+    dry_owner_sorted = dry_owner[order]
+    longest = order[np.unique(dry_owner_sorted, return_index=True)[1]]
+    longest_dry: dict[int, tuple[int, int]] = {
+        int(dry_owner[run]): (
+            int(dry_starts[run]),
+            int(dry_starts[run] + dry_lengths[run]),
+        )
+        for run in longest
+    }
+
+    uv_starts, uv_lengths, uv_owner = cols.runs(
+        (uv != MISSING_UNSIGNED_BYTE) & (uv >= MIN_UV_EXPOSURE_INDEX)
+    )
+    first_uv = np.unique(uv_owner, return_index=True)[1]
+    uv_exposure: dict[int, tuple[int, int]] = {
+        int(uv_owner[run]): (
+            int(uv_starts[run]),
+            int(uv_starts[run] + uv_lengths[run]),
+        )
+        for run in first_uv
+    }
+
+    group_bounds = np.searchsorted(group_owner, np.arange(len(series) + 1))
+    for pos, (location_id, site_series) in enumerate(zip(location_ids, series)):
+        offset = int(cols.starts[pos])
+
+        def window(run: tuple[int, int] | None) -> TimeWindow | None:
+            if run is None:
+                return None
+            return _window(site_series, run[0] - offset, run[1] - offset)
+
+        daily_temperatures = [
+            DailyTemperature(
+                date=_timestamp_to_datetime(
+                    int(days[group_starts[group]]) * _SECONDS_PER_DAY
+                ).date(),
+                min_celsius=from_tenths(int(group_mins[group])),
+                max_celsius=from_tenths(int(group_maxs[group])),
+                mean_celsius=float(group_means[group]) / 10,
+            )
+            for group in range(group_bounds[pos], group_bounds[pos + 1])
+        ]
+        rain_idx = int(first_rain_idx[pos])
+        summaries[location_id] = ForecastSummary(
+            daily_temperatures=daily_temperatures,
+            longest_dry_window=window(longest_dry.get(pos)),
+            peak_gust_mph=int(peak_gusts[pos]) if any_gusts[pos] else None,
+            peak_gust_time=(
+                _timestamp_to_datetime(int(timestamps[peak_gust_idx[pos]]))
+                if any_gusts[pos]
+                else None
+            ),
+            uv_exposure=window(uv_exposure.get(pos)),
+            first_rain=(
+                _timestamp_to_datetime(int(timestamps[rain_idx]))
+                if rain_idx >= 0
+                else None
+            ),
+        )
+
+    return summaries
+
+
+def _rank_driest_numpy(
+    series_by_location: Mapping[int, models.ForecastSeries],
+    date: datetime.date,
+    start_hour: int,
+    end_hour: int,
+) -> list[tuple[int, float]]:
+    location_ids = list(series_by_location)
+    series = list(series_by_location.values())
+    if not series:
+        return []
+
+    cols = _Columns(series)
+    timestamps = cols.column(series, "timestamps")
+    chances = cols.column(series, "precipitation_probability")
+
+    seconds = timestamps % _SECONDS_PER_DAY
+    in_window = (
+        (timestamps // _SECONDS_PER_DAY == _day_number(date))
+        & (seconds >= start_hour * 3600)
+        & (seconds < end_hour * 3600)
+    )
+    in_window &= chances != MISSING_UNSIGNED_BYTE
+    owner = cols.owner[in_window]
+    counts = np.bincount(owner, minlength=len(series))
+    totals = np.bincount(owner, weights=chances[in_window], minlength=len(series))
+
+    ranked = np.flatnonzero(counts)
+    means = totals[ranked] / counts[ranked]
+    ids = np.array(location_ids, dtype=np.int64)[ranked]
+    order = np.lexsort((ids, means))
+    return [(int(ids[i]), float(means[i])) for i in order]
@@ -0,0 +1,423 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import time
+from abc import ABC, abstractmethod
+from types import TracebackType
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Mapping,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+
+import httpx
+
+from weather_uk.data import models
+from weather_uk.domain import instrumentation, serialisers
+from weather_uk.domain.cache import CachedForecast, ForecastCache, LocationsCache
+from weather_uk.domain.resilience import CircuitOpenError, ResiliencePolicy
+from weather_uk.domain.scheduler import RequestScheduler
+from weather_uk.domain.weather_api_client import (
+    ForecastsNotFoundError,
+    MetOfficeAPIClient,
+)
+
+T = TypeVar("T")
+
+
+class AbstractAsyncWeatherAPIClient(ABC):
+    """Async version of `AbstractWeatherAPIClient`."""
+
+    @abstractmethod
+    async def check_authentication(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_locations_list(self) -> Sequence[models.Location]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_forecast(self, location_id: int) -> list[models.ForecastDay]:
+        raise NotImplementedError
+
+    async def refresh_forecast(
+        self, location_id: int, resolution: Optional[models.Resolution] = None
+    ) -> list[models.ForecastDay]:
+        """Get the forecast at the resolution, even if the cached forecast is
+        still fresh. Clients with a single resolution ignore it.
+        """
+        return await self.get_forecast(location_id)
+
+    async def get_forecasts(
+        self, location_ids: Iterable[int]
+    ) -> dict[int, list[models.ForecastDay]]:
+        location_ids = list(dict.fromkeys(location_ids))
+        forecasts = await asyncio.gather(
+            *(self.get_forecast(location_id) for location_id in location_ids)
+        )
+        return dict(zip(location_ids, forecasts))
+
+
+class AsyncMetOfficeAPIClient(AbstractAsyncWeatherAPIClient):
+    """DataPoint client for use on an asyncio event loop, such as Textual's.
+
+    All requests share one pool of keep-alive connections, so several
+    forecasts, the sitelist and the authentication check can be fetched
+    concurrently, with requests beyond `max_connections` waiting their turn.
+    The caches, scheduler and resilience policy can be shared with a
+    `MetOfficeAPIClient`, so both clients serve the same cached data, count
+    towards the same fair use limits and trip the same circuit breaker.
+
+    Reading and writing the caches and decoding responses are done in worker
+    threads, to keep the event loop free. Errors are raised as `httpx`
+    exceptions.
+    """
+
+    BASE_URL: str = MetOfficeAPIClient.BASE_URL
+    DATATYPE: str = MetOfficeAPIClient.DATATYPE
+    FORECAST_RESOLUTION: models.Resolution = MetOfficeAPIClient.FORECAST_RESOLUTION
+    BULK_FORECASTS_THRESHOLD: int = MetOfficeAPIClient.BULK_FORECASTS_THRESHOLD
+    MAX_CONNECTIONS: int = MetOfficeAPIClient.MAX_PARALLEL_REQUESTS
+    KEEPALIVE_EXPIRY: float = 30.0
+    TRANSIENT_STATUS_CODES: frozenset[int] = MetOfficeAPIClient.TRANSIENT_STATUS_CODES
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        locations_cache: Optional[LocationsCache] = None,
+        forecast_cache: Optional[ForecastCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        resilience: Optional[ResiliencePolicy] = None,
+        max_connections: int = MAX_CONNECTIONS,
+        keepalive_expiry: float = KEEPALIVE_EXPIRY,
+    ) -> None:
+        self.api_key: str | None = api_key
+        self._locations_cache: LocationsCache | None = locations_cache
+        self._forecast_cache: ForecastCache | None = forecast_cache
+        self._scheduler: RequestScheduler = (
+            scheduler if scheduler is not None else RequestScheduler()
+        )
+        self.resilience: ResiliencePolicy = (
+            resilience if resilience is not None else ResiliencePolicy()
+        )
+        self._client: httpx.AsyncClient = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                self.resilience.read_timeout,
+                connect=self.resilience.connect_timeout,
+                # Wait as long as needed for a free connection from the pool
+                pool=None,
+            ),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+        self._request_slots = asyncio.Semaphore(max_connections)
+        self._in_flight: dict[Hashable, asyncio.Future[Any]] = {}
+
+    @classmethod
+    def from_client(cls, client: MetOfficeAPIClient) -> AsyncMetOfficeAPIClient:
+        """Async client sharing the caches, scheduler and resilience policy of
+        a synchronous client.
+        """
+        async_client = cls(
+            client.api_key,
+            locations_cache=client._locations_cache,
+            forecast_cache=client._forecast_cache,
+            scheduler=client._scheduler,
+            resilience=client.resilience,
+        )
+        async_client.BASE_URL = client.BASE_URL
+        return async_client
+
+    async def __aenter__(self) -> AsyncMetOfficeAPIClient:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def check_authentication(self) -> None:
+        # Try a small request (0.1kB) - if no exceptions then all is well!
+        resource: str = "txt/wxfcs/regionalforecast/json/capabilities"
+        await self._request(resource)
+
+    async def get_locations_list(self) -> Sequence[models.Location]:
+        cache = self._locations_cache
+        cached = await asyncio.to_thread(cache.load) if cache is not None else None
+        if cache is not None and cached is not None and cached.is_fresh(cache.ttl):
+            return cached.locations
+
+        headers: dict[str, str] = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        resource: str = f"val/wxfcs/all/{self.DATATYPE}/sitelist"
+        try:
+            resp = await self._request(resource, headers=headers)
+        except Exception as err:
+            if cached is None or not self._can_fall_back(err):
+                raise
+            self.resilience.record_fallback()
+            return cached.locations
+
+        if cache is not None and cached is not None:
+            if resp.status_code == httpx.codes.NOT_MODIFIED:
+                return (await asyncio.to_thread(cache.touch, cached)).locations
+        return await asyncio.to_thread(self._decode_locations_list, resp)
+
+    def _decode_locations_list(self, resp: httpx.Response) -> Sequence[models.Location]:
+        locations = serialisers.decode_met_office_locations(
+            serialisers.loads(resp.content)
+        )
+        if self._locations_cache is not None:
+            self._locations_cache.save(
+                locations,
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+            )
+        return locations
+
+    async def get_forecast(
+        self, location_id: int, resolution: Optional[models.Resolution] = None
+    ) -> list[models.ForecastDay]:
+        """Get the forecast for a location, 3 hourly unless another resolution
+        is given. The hourly resolution gets the latest observations instead.
+        """
+        return await self._get_forecast(
+            location_id, resolution or self.FORECAST_RESOLUTION, refresh=False
+        )
+
+    async def refresh_forecast(
+        self, location_id: int, resolution: Optional[models.Resolution] = None
+    ) -> list[models.ForecastDay]:
+        return await self._get_forecast(
+            location_id, resolution or self.FORECAST_RESOLUTION, refresh=True
+        )
+
+    async def get_observations(self, location_id: int) -> list[models.ForecastDay]:
+        """Get the hourly observations for the last 24 hours at a location."""
+        return await self.get_forecast(location_id, models.Resolution.HOURLY)
+
+    async def _get_forecast(
+        self, location_id: int, resolution: models.Resolution, refresh: bool
+    ) -> list[models.ForecastDay]:
+        [cached] = await self._get_cached_forecasts([location_id], resolution)
+        if cached is not None and cached.is_fresh() and not refresh:
+            return await asyncio.to_thread(_read_forecast, cached)
+
+        try:
+            return await self._coalesce(
+                ("forecast", location_id, resolution),
+                lambda: self._fetch_forecast(location_id, resolution),
+            )
+        except Exception as err:
+            if cached is None or not self._can_fall_back(err):
+                raise
+            self.resilience.record_fallback()
+            return await asyncio.to_thread(_read_forecast, cached)
+
+    async def _get_cached_forecasts(
+        self, location_ids: list[int], resolution: models.Resolution
+    ) -> list[CachedForecast | None]:
+        cache = self._forecast_cache
+        if cache is None:
+            return [None] * len(location_ids)
+        # Look them all up in one go, as a cache miss reads from disk
+        return await asyncio.to_thread(
+            lambda: [cache.get(location_id, resolution) for location_id in location_ids]
+        )
+
+    async def get_latest_issue_time(
+        self, resolution: Optional[models.Resolution] = None
+    ) -> datetime.datetime:
+        """When the latest forecast at the resolution was issued."""
+        resolution = resolution or self.FORECAST_RESOLUTION
+        resource: str = self._site_resource(resolution, "capabilities")
+        resp = await self._request(resource, f"res={resolution}&")
+        return serialisers.decode_met_office_capabilities(
+            serialisers.loads(resp.content)
+        )
+
+    async def _fetch_forecast(
+        self, location_id: int, resolution: models.Resolution
+    ) -> list[models.ForecastDay]:
+        resource: str = self._site_resource(resolution, str(location_id))
+        resp = await self._request(resource, f"res={resolution}&")
+        return await asyncio.to_thread(
+            self._decode_forecast, location_id, resolution, resp.content
+        )
+
+    def _decode_forecast(
+        self, location_id: int, resolution: models.Resolution, content: bytes
+    ) -> list[models.ForecastDay]:
+        json_data: dict = serialisers.loads(content)
+        forecast = serialisers.decode_met_office_forecast(json_data)
+        if self._forecast_cache is not None:
+            self._forecast_cache.put(
+                location_id,
+                resolution,
+                CachedForecast(
+                    forecast=forecast,
+                    issue_time=serialisers.decode_met_office_issue_time(json_data),
+                    fetched_at=time.time(),
+                ),
+                content,
+            )
+        return forecast
+
+    async def get_forecasts(
+        self,
+        location_ids: Iterable[int],
+        resolution: Optional[models.Resolution] = None,
+    ) -> dict[int, list[models.ForecastDay]]:
+        """Get the forecasts for many locations at once, concurrently on the
+        connection pool, or from the forecast for all sites once there are
+        more than `BULK_FORECASTS_THRESHOLD` to fetch.
+        """
+        resolution = resolution or self.FORECAST_RESOLUTION
+        location_ids = list(dict.fromkeys(location_ids))
+        fresh: dict[int, CachedForecast] = {}
+        stale: dict[int, CachedForecast] = {}
+        missing: list[int] = []
+        for location_id, cached in zip(
+            location_ids, await self._get_cached_forecasts(location_ids, resolution)
+        ):
+            if cached is not None and cached.is_fresh():
+                fresh[location_id] = cached
+            else:
+                missing.append(location_id)
+                if cached is not None:
+                    stale[location_id] = cached
+        forecasts = await asyncio.to_thread(_read_forecasts, fresh)
+
+        if len(missing) > self.BULK_FORECASTS_THRESHOLD:
+            try:
+                forecasts.update(await self._get_bulk_forecasts(missing, resolution))
+            except Exception as err:
+                if len(stale) < len(missing) or not self._can_fall_back(err):
+                    raise
+                self.resilience.record_fallback()
+                forecasts.update(await asyncio.to_thread(_read_forecasts, stale))
+            not_found = [
+                location_id for location_id in missing if location_id not in forecasts
+            ]
+            if not_found:
+                raise ForecastsNotFoundError(not_found, forecasts)
+        elif missing:
+            fetched = await asyncio.gather(
+                *(self.get_forecast(location_id, resolution) for location_id in missing)
+            )
+            forecasts.update(zip(missing, fetched))
+
+        return forecasts
+
+    async def _get_bulk_forecasts(
+        self, location_ids: list[int], resolution: models.Resolution
+    ) -> dict[int, list[models.ForecastDay]]:
+        # Downloaded in full then decoded in a worker thread, rather than
+        # streamed, so the event loop isn't held up decoding each chunk
+        resource: str = self._site_resource(resolution, "all")
+        resp = await self._request(resource, f"res={resolution}&")
+        fetched_at = time.time()
+
+        def decode() -> dict[int, list[models.ForecastDay]]:
+            forecasts: dict[int, list[models.ForecastDay]] = {}
+            for site in serialisers.iter_met_office_site_forecasts(
+                [resp.content], set(location_ids)
+            ):
+                forecasts[site.location_id] = site.forecast
+                if self._forecast_cache is not None:
+                    self._forecast_cache.put(
+                        site.location_id,
+                        resolution,
+                        CachedForecast(site.forecast, site.issue_time, fetched_at),
+                        site.content,
+                    )
+            return forecasts
+
+        return await asyncio.to_thread(decode)
+
+    async def _coalesce(self, key: Hashable, fetch: Callable[[], Awaitable[T]]) -> T:
+        """Await `fetch`, unless a fetch for the same `key` is already in
+        progress, in which case share its result.
+        """
+        future = self._in_flight.get(key)
+        if future is None:
+            future = self._in_flight[key] = asyncio.ensure_future(fetch())
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Don't cancel the fetch for the others sharing it
+        result: T = await asyncio.shield(future)
+        return result
+
+    def _site_resource(self, resolution: models.Resolution, site: str) -> str:
+        feed: str = "wxobs" if resolution.is_observations else "wxfcs"
+        return f"val/{feed}/all/{self.DATATYPE}/{site}"
+
+    async def _request(
+        self,
+        resource: str,
+        query: Optional[str] = None,
+        headers: Optional[dict[str, str]] = None,
+    ) -> httpx.Response:
+        query = "" if not query else query
+        url: str = f"{self.BASE_URL}{resource}?{query}key={self.api_key}"
+
+        async def send() -> httpx.Response:
+            async with self._request_slots:
+                # Waiting for the scheduler blocks, so don't hold up the loop
+                await asyncio.to_thread(self._scheduler.acquire)
+                resp = await self._client.get(url, headers=headers)
+            # Only raise for errors, as a 304 is expected when revalidating
+            if resp.is_error:
+                resp.raise_for_status()
+            return resp
+
+        with instrumentation.span("datapoint.request", resource=resource) as span:
+            resp = await self.resilience.acall(send, self._is_transient_error)
+            if span is not None:
+                span.attributes["status_code"] = resp.status_code
+            return resp
+
+    def _is_transient_error(self, err: Exception) -> bool:
+        if isinstance(err, httpx.TransportError):
+            return True
+        if isinstance(err, httpx.HTTPStatusError):
+            return err.response.status_code in self.TRANSIENT_STATUS_CODES
+        return False
+
+    def _can_fall_back(self, err: Exception) -> bool:
+        # Serve stale cached data while DataPoint is down, but not for errors
+        # such as an invalid API key
+        return isinstance(err, CircuitOpenError) or self._is_transient_error(err)
+
+
+def _read_forecast(cached: CachedForecast) -> list[models.ForecastDay]:
+    # Builds the forecast from the cached series on first read
+    return cached.forecast
+
+
+def _read_forecasts(
+    cached_forecasts: Mapping[int, CachedForecast],
+) -> dict[int, list[models.ForecastDay]]:
+    return {
+        location_id: cached.forecast for location_id, cached in cached_forecasts.items()
+    }
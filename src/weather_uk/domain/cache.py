@@ -0,0 +1,376 @@
+import datetime
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+from weather_uk.data import models
+from weather_uk.domain import instrumentation, serialisers
+from weather_uk.domain.search import LocationIndex
+
+
+@dataclass
+class CachedLocations:
+    locations: Sequence[models.Location]
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+    def is_fresh(self, ttl: float, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return now - self.fetched_at < ttl
+
+
+class LocationsCache:
+    """On-disk cache of the DataPoint sitelist.
+
+    The sitelist is stored as a binary snapshot of the decoded locations (see
+    `serialisers.encode_locations_snapshot`), so warm starts don't need to
+    download or parse the full JSON response. Once the TTL has expired, the
+    stored ETag and Last-Modified values are used to revalidate the cache with
+    a conditional request.
+    """
+
+    # The sitelist very rarely changes, and stale entries are revalidated
+    DEFAULT_TTL: float = 7 * 24 * 60 * 60
+    FORMAT_VERSION: int = 1
+
+    def __init__(self, filepath: Path, ttl: float = DEFAULT_TTL) -> None:
+        self.filepath: Path = filepath
+        self.ttl: float = ttl
+
+    def load(self) -> CachedLocations | None:
+        try:
+            with open(self.metadata_filepath, encoding="utf-8") as metadata_file:
+                metadata: dict = json.load(metadata_file)
+
+            if metadata["version"] != self.FORMAT_VERSION:
+                return None
+
+            locations = serialisers.load_locations_snapshot(self.filepath)
+            cached = CachedLocations(
+                locations=locations,
+                etag=metadata["etag"],
+                last_modified=metadata["last_modified"],
+                fetched_at=metadata["fetched_at"],
+            )
+        # A missing or corrupt cache is just a cache miss
+        except (OSError, ValueError, KeyError, TypeError):
+            instrumentation.count("locations_cache.miss")
+            return None
+
+        instrumentation.count("locations_cache.hit")
+        return cached
+
+    def save(
+        self,
+        locations: Sequence[models.Location],
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> CachedLocations:
+        cached = CachedLocations(
+            locations=locations,
+            etag=etag,
+            last_modified=last_modified,
+            fetched_at=time.time(),
+        )
+        self._write(cached)
+        return cached
+
+    def touch(self, cached: CachedLocations) -> CachedLocations:
+        """Mark the cached sitelist as fresh after a successful revalidation."""
+        cached.fetched_at = time.time()
+        self._write_metadata(cached)
+        return cached
+
+    def load_index(self, locations: Sequence[models.Location]) -> LocationIndex:
+        """Load the search index for the cached locations, or build and save a
+        new index if the sitelist has changed since it was last built.
+        """
+        try:
+            index = LocationIndex.loads(self.index_filepath.read_bytes(), locations)
+        except (OSError, ValueError):
+            pass
+        else:
+            instrumentation.count("location_index_cache.hit")
+            return index
+
+        instrumentation.count("location_index_cache.miss")
+        with instrumentation.span("search.build_index", locations=len(locations)):
+            index = LocationIndex(locations)
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self.index_filepath, index.dumps())
+        return index
+
+    @property
+    def metadata_filepath(self) -> Path:
+        return self.filepath.with_suffix(".meta.json")
+
+    @property
+    def index_filepath(self) -> Path:
+        return self.filepath.with_suffix(".index")
+
+    def _write(self, cached: CachedLocations) -> None:
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        snapshot = serialisers.encode_locations_snapshot(cached.locations)
+        _atomic_write(self.filepath, snapshot)
+        self._write_metadata(cached)
+
+    def _write_metadata(self, cached: CachedLocations) -> None:
+        metadata = {
+            "version": self.FORMAT_VERSION,
+            "etag": cached.etag,
+            "last_modified": cached.last_modified,
+            "fetched_at": cached.fetched_at,
+        }
+        _atomic_write(
+            self.metadata_filepath,
+            json.dumps(metadata, separators=(",", ":")).encode("utf-8"),
+        )
+
+
+def _atomic_write(filepath: Path, data: bytes) -> None:
+    # Write to a temporary file first so a crash can't leave a partial cache
+    tmp_filepath = filepath.with_name(f"{filepath.name}.tmp")
+    tmp_filepath.write_bytes(data)
+    os.replace(tmp_filepath, filepath)
+
+
+class CachedForecast:
+    """A forecast with when it was issued and fetched.
+
+    The forecast can be given as a compact `ForecastSeries`, as it is held in
+    memory by the cache, in which case the `ForecastDay` list is only built
+    when the forecast is first read. So checking whether a cached forecast is
+    fresh doesn't build it.
+    """
+
+    __slots__ = ("_forecast", "_series", "issue_time", "fetched_at")
+
+    def __init__(
+        self,
+        forecast: list[models.ForecastDay] | models.ForecastSeries,
+        issue_time: datetime.datetime,
+        fetched_at: float,
+    ) -> None:
+        self._forecast: list[models.ForecastDay] | None = None
+        self._series: models.ForecastSeries | None = None
+        if isinstance(forecast, models.ForecastSeries):
+            self._series = forecast
+        else:
+            self._forecast = forecast
+        self.issue_time: datetime.datetime = issue_time
+        self.fetched_at: float = fetched_at
+
+    @property
+    def forecast(self) -> list[models.ForecastDay]:
+        if self._forecast is None:
+            assert self._series is not None
+            self._forecast = self._series.to_forecast_days()
+        return self._forecast
+
+    @property
+    def series(self) -> models.ForecastSeries:
+        if self._series is None:
+            assert self._forecast is not None
+            self._series = models.ForecastSeries.from_forecast_days(self._forecast)
+        return self._series
+
+    @property
+    def expires(self) -> datetime.datetime:
+        """When the next forecast is due to be issued."""
+        return self.issue_time + ForecastCache.ISSUE_INTERVAL
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        if now < self.expires.timestamp():
+            return True
+        # The next forecast can be published late, so don't keep asking for it
+        return now - self.fetched_at < ForecastCache.RECHECK_INTERVAL
+
+
+class ForecastCache:
+    """Cache of DataPoint forecasts, keyed on the location and resolution.
+
+    Recently used forecasts are kept in memory as compact `ForecastSeries`, and
+    the raw responses are also saved on disk when a directory is given. Rather
+    than a fixed TTL, each forecast is fresh until the next forecast is due to
+    be issued.
+
+    The saved responses are pruned on the first save, then hourly or whenever
+    they would take up more than `max_disk_bytes`: those fetched over `max_age`
+    seconds ago are removed, then the oldest until there is room to spare.
+    """
+
+    # DataPoint forecasts are updated hourly
+    ISSUE_INTERVAL: datetime.timedelta = datetime.timedelta(hours=1)
+    RECHECK_INTERVAL: float = 5 * 60
+    DEFAULT_MAX_ENTRIES: int = 64
+    DEFAULT_MAX_AGE: float = 2 * 24 * 60 * 60
+    DEFAULT_MAX_DISK_BYTES: int = 100 * 1024 * 1024
+    PRUNE_INTERVAL: float = 60 * 60
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_age: float = DEFAULT_MAX_AGE,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+    ) -> None:
+        self.directory: Path | None = directory
+        self.max_entries: int = max_entries
+        self.max_age: float = max_age
+        self.max_disk_bytes: int = max_disk_bytes
+        self._entries: OrderedDict[
+            tuple[int, str], tuple[models.ForecastSeries, datetime.datetime, float]
+        ] = OrderedDict()
+        # Forecasts can be loaded from several workers at once
+        self._lock = threading.Lock()
+        # Size of the saved responses as of the last prune, plus those saved since
+        self._disk_bytes: int | None = None
+        self._next_prune: float = 0.0
+
+    def get(self, location_id: int, resolution: str) -> CachedForecast | None:
+        """Return the cached forecast, whether or not it is still fresh."""
+        key = (location_id, resolution)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            instrumentation.count("forecast_cache.memory_hit")
+            return CachedForecast(*entry)
+
+        cached = self._load(location_id, resolution)
+        if cached is not None:
+            instrumentation.count("forecast_cache.disk_hit")
+            self._remember(key, cached)
+        else:
+            instrumentation.count("forecast_cache.miss")
+        return cached
+
+    def put(
+        self,
+        location_id: int,
+        resolution: str,
+        cached: CachedForecast,
+        content: Optional[bytes] = None,
+    ) -> None:
+        """Cache a forecast, saving the raw response `content` on disk if given."""
+        self._remember((location_id, resolution), cached)
+        if self.directory is not None and content is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                prune_due = (
+                    self._disk_bytes is None
+                    or self._disk_bytes + len(content) > self.max_disk_bytes
+                    or time.time() >= self._next_prune
+                )
+            if prune_due:
+                self.prune(reserve_bytes=len(content))
+            filepath = self._filepath(location_id, resolution)
+            _atomic_write(filepath, content)
+            os.utime(filepath, (cached.fetched_at, cached.fetched_at))
+            with self._lock:
+                if self._disk_bytes is not None:
+                    self._disk_bytes += len(content)
+
+    def next_expiry(
+        self, location_ids: Iterable[int], resolution: str
+    ) -> datetime.datetime | None:
+        """When the first of these cached forecasts is due to be reissued, or
+        None if none of them are cached.
+        """
+        expiry_times = [
+            cached.expires
+            for cached in (
+                self.get(location_id, resolution) for location_id in location_ids
+            )
+            if cached is not None
+        ]
+        return min(expiry_times, default=None)
+
+    def prune(self, now: Optional[float] = None, reserve_bytes: int = 0) -> None:
+        """Remove the saved forecasts that are too old, then the oldest of the
+        rest if they take up too much space, leaving room for `reserve_bytes`.
+        """
+        if self.directory is None:
+            return
+        now = time.time() if now is None else now
+
+        expired: list[str] = []
+        saved: list[tuple[float, int, str]] = []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    # Temporary files are only left behind by a crash, unless
+                    # they are being written now
+                    if not entry.name.endswith((".json", ".json.tmp")):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    if now - stat.st_mtime > self.max_age:
+                        expired.append(entry.path)
+                    elif entry.name.endswith(".json"):
+                        saved.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            pass
+
+        # Once over the limit, prune to well under it, so the next saves don't
+        # each have to prune again
+        total_bytes = sum(size for _, size, _ in saved) + reserve_bytes
+        limit = self.max_disk_bytes
+        if total_bytes > limit:
+            limit = limit * 3 // 4
+        newest_first = sorted(saved, reverse=True)
+        kept = 0
+        kept_bytes = reserve_bytes
+        while kept < len(newest_first) and kept_bytes + newest_first[kept][1] <= limit:
+            kept_bytes += newest_first[kept][1]
+            kept += 1
+        expired.extend(path for _, _, path in newest_first[kept:])
+
+        for path in expired:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if expired:
+            instrumentation.count("forecast_cache.pruned", len(expired))
+        with self._lock:
+            self._disk_bytes = kept_bytes - reserve_bytes
+            self._next_prune = now + self.PRUNE_INTERVAL
+
+    def _remember(self, key: tuple[int, str], cached: CachedForecast) -> None:
+        with self._lock:
+            self._entries[key] = (cached.series, cached.issue_time, cached.fetched_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, location_id: int, resolution: str) -> CachedForecast | None:
+        if self.directory is None:
+            return None
+
+        filepath = self._filepath(location_id, resolution)
+        try:
+            fetched_at: float = filepath.stat().st_mtime
+            json_data: dict = serialisers.loads(filepath.read_bytes())
+            return CachedForecast(
+                serialisers.decode_met_office_forecast_series(json_data),
+                serialisers.decode_met_office_issue_time(json_data),
+                fetched_at,
+            )
+        # A missing or corrupt cache is just a cache miss
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _filepath(self, location_id: int, resolution: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{location_id}-{resolution}.json"
@@ -1,3 +1,7 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Generator, Iterable
+
 from weather_uk.data import models
 from weather_uk.domain.weather_api_client import AbstractWeatherAPIClient
 
@@ -7,3 +11,42 @@ def get_forecast(
     location_id: int,
 ) -> list[models.ForecastDay]:
     return api_client.get_forecast(location_id)
+
+
+def get_forecasts(
+    api_client: AbstractWeatherAPIClient,
+    location_ids: Iterable[int],
+) -> dict[int, list[models.ForecastDay]]:
+    return api_client.get_forecasts(location_ids)
+
+
+def iter_forecasts(
+    api_client: AbstractWeatherAPIClient,
+    location_ids: Iterable[int],
+    max_workers: int,
+) -> Generator[tuple[int, list[models.ForecastDay] | Exception], None, None]:
+    """Fetch forecasts with at most `max_workers` requests at once, yielding
+    each (or the error fetching it) as soon as it arrives.
+    """
+    location_ids = list(dict.fromkeys(location_ids))
+    if not location_ids:
+        return
+    with ThreadPoolExecutor(max_workers=min(len(location_ids), max_workers)) as pool:
+        # Copy the context so each request keeps the caller's priority
+        futures = {
+            pool.submit(
+                contextvars.copy_context().run, api_client.get_forecast, location_id
+            ): location_id
+            for location_id in location_ids
+        }
+        try:
+            for future in as_completed(futures):
+                error = future.exception()
+                if isinstance(error, Exception):
+                    yield futures[future], error
+                else:
+                    yield futures[future], future.result()
+        finally:
+            # Don't start the remaining requests if the caller stops early
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,312 @@
+"""Lightweight timing spans and counters for the hot paths.
+
+Spans are recorded around the slow steps of showing a forecast (requests,
+decoding, search and rendering), and counters track e.g. cache hits, so a
+slow screen can be traced to its cause:
+
+    with instrumentation.span("datapoint.request", resource=resource):
+        ...
+
+    @instrumentation.timed("decode.forecast")
+    def decode_met_office_forecast(json_data: dict) -> list[models.ForecastDay]:
+        ...
+
+The recorded spans can be exported as JSON, or as an OpenTelemetry (OTLP/JSON)
+trace file to view in any tool that imports OpenTelemetry traces.
+"""
+
+import functools
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from contextlib import AbstractContextManager, contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, ParamSpec, TypeVar
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+SERVICE_NAME = "weather-uk"
+# OpenTelemetry span kind and status codes
+SPAN_KIND_INTERNAL = 1
+STATUS_CODE_ERROR = 2
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: int
+    span_id: int
+    parent_id: int | None
+    # Wall clock start time, for exporting, while the duration is measured
+    # with the more precise performance counter
+    start_time_ns: int
+    duration_ns: int = 0
+    thread: str = ""
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def end_time_ns(self) -> int:
+        return self.start_time_ns + self.duration_ns
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_ns / 1_000_000
+
+
+@dataclass
+class SpanStats:
+    """Running totals for all the spans with the same name."""
+
+    name: str
+    count: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+    last_ns: int = 0
+    errors: int = 0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ns / self.count / 1_000_000 if self.count else 0.0
+
+    @property
+    def max_ms(self) -> float:
+        return self.max_ns / 1_000_000
+
+    @property
+    def last_ms(self) -> float:
+        return self.last_ns / 1_000_000
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_ns / 1_000_000
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Recorder:
+    """Records spans and counters from any thread.
+
+    Only the most recent `max_spans` spans are kept for exporting, but the
+    stats for each span name cover every span since the last reset.
+    """
+
+    DEFAULT_MAX_SPANS: int = 10_000
+
+    def __init__(self, max_spans: int = DEFAULT_MAX_SPANS) -> None:
+        self.enabled: bool = True
+        self._spans: deque[Span] = deque(maxlen=max_spans)
+        self._stats: dict[str, SpanStats] = {}
+        self._counters: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span | None]:
+        """Time the code in this context. Attributes can be added to the
+        span while it is open, e.g. the size of a response.
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=random.getrandbits(128) if parent is None else parent.trace_id,
+            span_id=random.getrandbits(64),
+            parent_id=None if parent is None else parent.span_id,
+            start_time_ns=time.time_ns(),
+            thread=threading.current_thread().name,
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        start = time.perf_counter_ns()
+        try:
+            yield span
+        except BaseException as err:
+            span.error = f"{type(err).__name__}: {err}"
+            raise
+        finally:
+            span.duration_ns = time.perf_counter_ns() - start
+            _current_span.reset(token)
+            self._record(span)
+
+    def count(self, name: str, increment: int = 1) -> None:
+        if self.enabled:
+            with self._lock:
+                self._counters[name] += increment
+
+    @property
+    def counters(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    @property
+    def spans(self) -> list[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def stats(self) -> list[SpanStats]:
+        """Stats for each span name, slowest in total first."""
+        with self._lock:
+            stats = [SpanStats(**asdict(stats)) for stats in self._stats.values()]
+        return sorted(stats, key=lambda stats: stats.total_ns, reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans.clear()
+            self._stats.clear()
+            self._counters.clear()
+
+    def _record(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+            stats = self._stats.get(span.name)
+            if stats is None:
+                stats = self._stats[span.name] = SpanStats(span.name)
+            stats.count += 1
+            stats.total_ns += span.duration_ns
+            stats.max_ns = max(stats.max_ns, span.duration_ns)
+            stats.last_ns = span.duration_ns
+            if span.error is not None:
+                stats.errors += 1
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "spans": [
+                {
+                    "name": span.name,
+                    "trace_id": f"{span.trace_id:032x}",
+                    "span_id": f"{span.span_id:016x}",
+                    "parent_id": (
+                        None if span.parent_id is None else f"{span.parent_id:016x}"
+                    ),
+                    "start_time_ns": span.start_time_ns,
+                    "duration_ms": span.duration_ms,
+                    "thread": span.thread,
+                    "attributes": span.attributes,
+                    "error": span.error,
+                }
+                for span in self.spans
+            ],
+            "stats": [
+                {
+                    "name": stats.name,
+                    "count": stats.count,
+                    "mean_ms": stats.mean_ms,
+                    "max_ms": stats.max_ms,
+                    "total_ms": stats.total_ms,
+                    "errors": stats.errors,
+                }
+                for stats in self.stats()
+            ],
+            "counters": self.counters,
+        }
+
+    def to_otlp(self) -> dict[str, Any]:
+        """The spans as an OpenTelemetry trace, in the OTLP/JSON encoding."""
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes(
+                            {"service.name": SERVICE_NAME, "process.pid": os.getpid()}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [_otlp_span(span) for span in self.spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def export_json(self, filepath: Path) -> None:
+        _write_json(filepath, self.to_json())
+
+    def export_otlp(self, filepath: Path) -> None:
+        _write_json(filepath, self.to_otlp())
+
+
+def _otlp_span(span: Span) -> dict[str, Any]:
+    otlp_span: dict[str, Any] = {
+        "traceId": f"{span.trace_id:032x}",
+        "spanId": f"{span.span_id:016x}",
+        "parentSpanId": "" if span.parent_id is None else f"{span.parent_id:016x}",
+        "name": span.name,
+        "kind": SPAN_KIND_INTERNAL,
+        # 64 bit integers are encoded as strings in OTLP/JSON
+        "startTimeUnixNano": str(span.start_time_ns),
+        "endTimeUnixNano": str(span.end_time_ns),
+        "attributes": _otlp_attributes({**span.attributes, "thread.name": span.thread}),
+        "status": {},
+    }
+    if span.error is not None:
+        otlp_span["status"] = {"code": STATUS_CODE_ERROR, "message": span.error}
+    return otlp_span
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    otlp_attributes: list[dict[str, Any]] = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            otlp_value: dict[str, Any] = {"boolValue": value}
+        elif isinstance(value, int):
+            otlp_value = {"intValue": str(value)}
+        elif isinstance(value, float):
+            otlp_value = {"doubleValue": value}
+        else:
+            otlp_value = {"stringValue": str(value)}
+        otlp_attributes.append({"key": key, "value": otlp_value})
+    return otlp_attributes
+
+
+def _write_json(filepath: Path, data: dict[str, Any]) -> None:
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    filepath.write_text(json.dumps(data, indent=2, default=str))
+
+
+recorder = Recorder()
+
+
+def span(name: str, **attributes: Any) -> AbstractContextManager[Span | None]:
+    return recorder.span(name, **attributes)
+
+
+def timed(name: str) -> Callable[[Callable[P, T]], Callable[P, T]]:
+    """Decorator to record a span for each call of a function."""
+
+    def decorator(func: Callable[P, T]) -> Callable[P, T]:
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count(name: str, increment: int = 1) -> None:
+    recorder.count(name, increment)
+
+
+def export_traces(directory: Path, now: Optional[float] = None) -> tuple[Path, Path]:
+    """Export the recorded spans as both JSON and an OTLP/JSON trace, in
+    timestamped files. Returns the paths of the two files.
+    """
+    timestamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+    json_filepath = directory / f"{SERVICE_NAME}-{timestamp}.json"
+    otlp_filepath = directory / f"{SERVICE_NAME}-{timestamp}.otlp.json"
+    recorder.export_json(json_filepath)
+    recorder.export_otlp(otlp_filepath)
+    return json_filepath, otlp_filepath
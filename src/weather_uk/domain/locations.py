@@ -1,8 +1,41 @@
+from typing import Iterator, Optional, Sequence
+
 from weather_uk.data import models
+from weather_uk.domain.cache import LocationsCache
+from weather_uk.domain.search import LocationIndex
+from weather_uk.domain.spatial import NearbyLocation, SiteIndex
 from weather_uk.domain.weather_api_client import AbstractWeatherAPIClient
 
 
 def get_locations_list(
     api_client: AbstractWeatherAPIClient,
-) -> list[models.Location]:
+) -> Sequence[models.Location]:
     return api_client.get_locations_list()
+
+
+def iter_locations_list(
+    api_client: AbstractWeatherAPIClient,
+) -> Iterator[models.Location]:
+    return api_client.iter_locations_list()
+
+
+def get_location_index(
+    locations: Sequence[models.Location],
+    cache: Optional[LocationsCache] = None,
+) -> LocationIndex:
+    if cache is None:
+        return LocationIndex(locations)
+    return cache.load_index(locations)
+
+
+def get_site_index(locations: Sequence[models.Location]) -> SiteIndex:
+    return SiteIndex(locations)
+
+
+def get_nearest_locations(
+    site_index: SiteIndex,
+    latitude: float,
+    longitude: float,
+    count: int = 1,
+) -> list[NearbyLocation]:
+    return site_index.nearest(latitude, longitude, count)
@@ -0,0 +1,59 @@
+import time
+from typing import Iterable, Optional
+
+from weather_uk.data import models
+from weather_uk.domain import instrumentation
+from weather_uk.domain.cache import ForecastCache
+from weather_uk.domain.scheduler import Priority, request_priority
+from weather_uk.domain.weather_api_client import AbstractWeatherAPIClient
+
+
+class ForecastPrefetcher:
+    """Keeps the forecast cache warm for the user's favourite and recent
+    locations, so their forecasts can be shown without waiting for DataPoint.
+
+    Each prefetch returns how long to wait before the next one, which is when
+    a new forecast is next expected to be issued.
+    """
+
+    # Don't prefetch more often than this, e.g. while a new forecast is late
+    MIN_INTERVAL: float = ForecastCache.RECHECK_INTERVAL
+    RETRY_INTERVAL: float = 15 * 60
+
+    def __init__(
+        self,
+        api_client: AbstractWeatherAPIClient,
+        forecast_cache: ForecastCache,
+        resolution: models.Resolution = models.Resolution.THREE_HOURLY,
+    ) -> None:
+        self.api_client: AbstractWeatherAPIClient = api_client
+        self.forecast_cache: ForecastCache = forecast_cache
+        self.resolution: models.Resolution = resolution
+
+    def prefetch(
+        self,
+        location_ids: Iterable[int],
+        now: Optional[float] = None,
+    ) -> float | None:
+        """Fetch any forecasts not already cached, in the background lane.
+        Returns the seconds until the next prefetch, or None if there is
+        nothing to prefetch.
+        """
+        location_ids = list(dict.fromkeys(location_ids))
+        if not location_ids:
+            return None
+
+        try:
+            with request_priority(Priority.BACKGROUND):
+                self.api_client.get_forecasts(location_ids)
+        # Prefetching is only an optimisation, so whatever went wrong, try again
+        # later rather than take down the app
+        except Exception:
+            instrumentation.count("prefetch.error")
+            return self.RETRY_INTERVAL
+
+        now = time.time() if now is None else now
+        expires = self.forecast_cache.next_expiry(location_ids, self.resolution)
+        if expires is None:
+            return self.RETRY_INTERVAL
+        return max(self.MIN_INTERVAL, expires.timestamp() - now)
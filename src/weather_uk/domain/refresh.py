@@ -0,0 +1,68 @@
+import datetime
+import time
+from typing import Optional
+
+from weather_uk.data import models
+from weather_uk.domain.cache import ForecastCache
+from weather_uk.domain.weather_api_client import AbstractWeatherAPIClient
+
+
+class ForecastRefresher:
+    """Keeps a forecast on display up to date, with as few requests as
+    possible.
+
+    Nothing is requested until the next forecast is due to be issued. From then
+    until it has been issued, only the (tiny) capabilities are checked, so the
+    forecast itself is fetched once per issue.
+    """
+
+    # Check again this often while the next forecast is late
+    MIN_INTERVAL: float = ForecastCache.RECHECK_INTERVAL
+    RETRY_INTERVAL: float = 15 * 60
+
+    def __init__(
+        self,
+        api_client: AbstractWeatherAPIClient,
+        forecast_cache: ForecastCache,
+        location_id: int,
+        resolution: models.Resolution = models.Resolution.THREE_HOURLY,
+    ) -> None:
+        self.api_client: AbstractWeatherAPIClient = api_client
+        self.forecast_cache: ForecastCache = forecast_cache
+        self.location_id: int = location_id
+        self.resolution: models.Resolution = resolution
+        # When the forecast on display was issued
+        self.issue_time: datetime.datetime | None = None
+        self.update_issue_time()
+
+    def update_issue_time(self) -> None:
+        """Read the issue time of the forecast on display, after it has been
+        fetched.
+        """
+        cached = self.forecast_cache.get(self.location_id, self.resolution)
+        if cached is not None:
+            self.issue_time = cached.issue_time
+
+    def delay(self, now: Optional[float] = None) -> float:
+        """Seconds until the next forecast is due to be issued."""
+        if self.issue_time is None:
+            return self.RETRY_INTERVAL
+        now = time.time() if now is None else now
+        expires = self.issue_time + ForecastCache.ISSUE_INTERVAL
+        return max(self.MIN_INTERVAL, expires.timestamp() - now)
+
+    def check(self) -> list[models.ForecastDay] | None:
+        """Fetch the forecast if a new one has been issued, otherwise return
+        None. Raises the API client's errors.
+        """
+        latest = self.api_client.get_latest_issue_time(self.resolution)
+        if (
+            latest is not None
+            and self.issue_time is not None
+            and latest <= self.issue_time
+        ):
+            return None
+
+        forecast = self.api_client.refresh_forecast(self.location_id, self.resolution)
+        self.update_issue_time()
+        return forecast
@@ -0,0 +1,222 @@
+import asyncio
+import dataclasses
+import enum
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a request while the circuit breaker is open."""
+
+
+class BreakerState(enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half open"
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter between attempts."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def delay(self, retry: int) -> float:
+        """Seconds to wait before the given retry, counting from zero."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+
+class CircuitBreaker:
+    """Fails fast once `failure_threshold` requests in a row have failed.
+
+    After `reset_timeout` seconds a single trial request is let through, which
+    closes the breaker again if it succeeds.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self._clock = clock
+        self._failures: int = 0
+        self._opened_at: float | None = None
+        self._trial_in_progress: bool = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            return self._state()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state is BreakerState.CLOSED:
+                return True
+            if state is BreakerState.HALF_OPEN and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self) -> bool:
+        """Record a failed request, returning True if this opened the breaker."""
+        with self._lock:
+            was_closed = self._opened_at is None
+            self._failures += 1
+            self._trial_in_progress = False
+            if self._failures >= self.failure_threshold or not was_closed:
+                self._opened_at = self._clock()
+                return was_closed
+            return False
+
+    def _state(self) -> BreakerState:
+        if self._opened_at is None:
+            return BreakerState.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return BreakerState.HALF_OPEN
+        return BreakerState.OPEN
+
+
+@dataclass
+class ResilienceMetrics:
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    short_circuited: int = 0
+    breaker_opened: int = 0
+    stale_fallbacks: int = 0
+    breaker_state: BreakerState = BreakerState.CLOSED
+
+
+class ResiliencePolicy:
+    """Timeouts, retries and a circuit breaker for requests to an upstream API.
+
+    Only transient failures (as decided by the caller) are retried or count
+    towards opening the breaker, so e.g. an invalid API key fails at once. The
+    same policy can be shared by synchronous and asynchronous clients, so they
+    share one breaker.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        async_sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.connect_timeout: float = connect_timeout
+        self.read_timeout: float = read_timeout
+        self.retry: RetryPolicy = retry if retry is not None else RetryPolicy()
+        self.breaker: CircuitBreaker = (
+            breaker if breaker is not None else CircuitBreaker()
+        )
+        self._sleep = sleep
+        self._async_sleep = async_sleep
+        self._metrics = ResilienceMetrics()
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        return (self.connect_timeout, self.read_timeout)
+
+    @property
+    def metrics(self) -> ResilienceMetrics:
+        with self._lock:
+            return dataclasses.replace(self._metrics, breaker_state=self.breaker.state)
+
+    def call(
+        self,
+        send: Callable[[], T],
+        is_transient: Callable[[Exception], bool],
+        idempotent: bool = True,
+    ) -> T:
+        """Call `send`, retrying transient failures if the request is
+        idempotent. Raises `CircuitOpenError` while the breaker is open.
+        """
+        max_attempts = self.retry.max_attempts if idempotent else 1
+        for attempt in range(max_attempts):
+            self._start_attempt()
+            try:
+                result = send()
+            except Exception as err:
+                if not self._should_retry(err, is_transient, attempt, max_attempts):
+                    raise
+            else:
+                self.breaker.record_success()
+                return result
+            self._sleep(self.retry.delay(attempt))
+
+        raise AssertionError("unreachable")
+
+    async def acall(
+        self,
+        send: Callable[[], Awaitable[T]],
+        is_transient: Callable[[Exception], bool],
+        idempotent: bool = True,
+    ) -> T:
+        """As `call`, for a coroutine function `send`."""
+        max_attempts = self.retry.max_attempts if idempotent else 1
+        for attempt in range(max_attempts):
+            self._start_attempt()
+            try:
+                result = await send()
+            except Exception as err:
+                if not self._should_retry(err, is_transient, attempt, max_attempts):
+                    raise
+            else:
+                self.breaker.record_success()
+                return result
+            await self._async_sleep(self.retry.delay(attempt))
+
+        raise AssertionError("unreachable")
+
+    def record_fallback(self) -> None:
+        self._count("stale_fallbacks")
+
+    def _start_attempt(self) -> None:
+        if not self.breaker.allow_request():
+            self._count("short_circuited")
+            raise CircuitOpenError("Requests are failing, try again later")
+        self._count("requests")
+
+    def _should_retry(
+        self,
+        err: Exception,
+        is_transient: Callable[[Exception], bool],
+        attempt: int,
+        max_attempts: int,
+    ) -> bool:
+        if not is_transient(err):
+            # The upstream is still responding, so don't open the breaker
+            self.breaker.record_success()
+            return False
+        self._count("failures")
+        if self.breaker.record_failure():
+            self._count("breaker_opened")
+        if attempt + 1 >= max_attempts:
+            return False
+        self._count("retries")
+        return True
+
+    def _count(self, metric: str) -> None:
+        with self._lock:
+            setattr(self._metrics, metric, getattr(self._metrics, metric) + 1)
@@ -0,0 +1,256 @@
+import datetime
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, Callable, Hashable, Iterator, Optional, TypeVar
+
+from weather_uk.domain.cache import _atomic_write
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+_request_priority: ContextVar[Priority] = ContextVar(
+    "request_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """Make the requests in this context with the given priority."""
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _request_priority.get()
+
+
+class QuotaExceededError(Exception):
+    """Raised when the daily allowance of requests has been used up."""
+
+
+class TokenBucket:
+    """Allows bursts of up to `capacity` requests, refilling at a steady rate
+    of `capacity` tokens every `period` seconds.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        period: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity: int = capacity
+        self.rate: float = capacity / period
+        self._clock = clock
+        self._tokens: float = capacity
+        self._updated: float = clock()
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available."""
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+    def take(self) -> None:
+        self._refill()
+        self._tokens -= 1
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+
+class DailyUsage:
+    """Count of requests made each (UTC) day, saved to `filepath` if given so
+    the count carries over between runs.
+
+    The file is shared by every process using it, such as the app and the CLI
+    run from cron, so each request re-reads and increments the saved count
+    while holding a lock on it.
+    """
+
+    def __init__(
+        self,
+        filepath: Optional[Path] = None,
+        now: Callable[[], float] = time.time,
+    ) -> None:
+        self.filepath: Path | None = filepath
+        self._now = now
+        self._date: str = self._today()
+        self._count: int = 0
+        self._load()
+
+    @property
+    def count(self) -> int:
+        self._roll_over()
+        self._load()
+        return self._count
+
+    def increment(self) -> None:
+        if self.filepath is None:
+            self._roll_over()
+            self._count += 1
+            return
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        with _locked(self.filepath.with_name(f"{self.filepath.name}.lock")):
+            self._roll_over()
+            self._load()
+            self._count += 1
+            self._save()
+
+    def _today(self) -> str:
+        now = datetime.datetime.fromtimestamp(self._now(), tz=datetime.timezone.utc)
+        return now.date().isoformat()
+
+    def _roll_over(self) -> None:
+        today = self._today()
+        if today != self._date:
+            self._date = today
+            self._count = 0
+
+    def _load(self) -> None:
+        if self.filepath is None:
+            return
+        try:
+            usage: dict[str, Any] = json.loads(self.filepath.read_text())
+            if usage["date"] == self._date:
+                self._count = max(self._count, int(usage["requests"]))
+        # A missing file is a new day, but a corrupt one keeps the last count
+        # read rather than starting the day again from 0
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save(self) -> None:
+        assert self.filepath is not None
+        _atomic_write(
+            self.filepath,
+            json.dumps({"date": self._date, "requests": self._count}).encode("utf-8"),
+        )
+
+
+@contextmanager
+def _locked(lock_filepath: Path) -> Iterator[None]:
+    """Hold an exclusive lock on `lock_filepath`, shared between processes."""
+    with open(lock_filepath, "a+b") as lock_file:
+        if sys.platform == "win32":
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class RequestScheduler:
+    """Keeps requests within the DataPoint fair use limits.
+
+    Requests are throttled to the per minute limit, with interactive requests
+    always served before background ones, and fail with `QuotaExceededError`
+    once the daily limit is reached. Identical requests made at the same time
+    can also be coalesced, so they share one fetch.
+    """
+
+    # https://www.metoffice.gov.uk/about-us/legal/fair-usage
+    PER_MINUTE: int = 100
+    PER_DAY: int = 5000
+
+    def __init__(
+        self,
+        per_minute: int = PER_MINUTE,
+        per_day: int = PER_DAY,
+        usage_filepath: Optional[Path] = None,
+        clock: Callable[[], float] = time.monotonic,
+        now: Callable[[], float] = time.time,
+    ) -> None:
+        self.per_day: int = per_day
+        self._bucket = TokenBucket(per_minute, 60, clock)
+        self._usage = DailyUsage(usage_filepath, now)
+        self._condition = threading.Condition()
+        self._waiting: Counter[Priority] = Counter()
+        self._in_flight: dict[Hashable, Future[Any]] = {}
+        self._in_flight_lock = threading.Lock()
+
+    @property
+    def requests_today(self) -> int:
+        with self._condition:
+            return self._usage.count
+
+    def acquire(self) -> None:
+        """Wait until a request can be made with the current priority."""
+        priority = current_priority()
+        with self._condition:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    if self._usage.count >= self.per_day:
+                        raise QuotaExceededError(
+                            f"Daily limit of {self.per_day} requests reached"
+                        )
+                    wait: float | None = None
+                    if not any(self._waiting[p] for p in Priority if p < priority):
+                        wait = self._bucket.wait_time()
+                        if wait <= 0:
+                            break
+                    self._condition.wait(wait)
+
+                self._bucket.take()
+                self._usage.increment()
+            finally:
+                self._waiting[priority] -= 1
+                self._condition.notify_all()
+
+    def coalesce(self, key: Hashable, fetch: Callable[[], T]) -> T:
+        """Call `fetch`, unless a fetch for the same `key` is already in
+        progress, in which case wait for and share its result.
+        """
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if future is None:
+                future = self._in_flight[key] = Future()
+
+        if not is_leader:
+            result: T = future.result()
+            return result
+
+        try:
+            result = fetch()
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
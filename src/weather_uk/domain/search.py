@@ -0,0 +1,204 @@
+import array
+import bisect
+import marshal
+import re
+import sys
+import zlib
+from typing import Iterable, Iterator, Sequence
+
+from weather_uk.data import models
+
+# Match quality, best first
+EXACT_MATCH = 0
+NAME_PREFIX_MATCH = 1
+WORD_PREFIX_MATCH = 2
+NAME_AND_REGION_MATCH = 3
+FUZZY_MATCH = 4
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class LocationIndex:
+    """Search index over the sitelist, built once so each search is fast.
+
+    Locations are matched on the start of any word in their name, and a
+    search can also include words from the region (e.g. "newport wight").
+    Trigrams of each word give some tolerance for typos. Results are ranked by
+    how well they match, then by the shortest name.
+    """
+
+    FORMAT_VERSION: int = 1
+    # Limit the work done for very short searches, which match most locations
+    MAX_CANDIDATES: int = 500
+    MIN_FUZZY_QUERY_LENGTH: int = 3
+    MIN_FUZZY_SIMILARITY: float = 0.6
+
+    def __init__(self, locations: Sequence[models.Location]) -> None:
+        self.locations: Sequence[models.Location] = locations
+        self._names: list[str] = [_normalise(loc.name) for loc in locations]
+        self._regions: list[str] = [_normalise(loc.region or "") for loc in locations]
+        self._name_keys, self._name_ids = _word_suffixes(self._names)
+        self._region_keys, self._region_ids = _word_suffixes(self._regions)
+
+        trigram_ids: dict[str, array.array] = {}
+        for idx, name in enumerate(self._names):
+            for trigram in _trigrams(name):
+                trigram_ids.setdefault(trigram, array.array("I")).append(idx)
+        self._trigram_ids: dict[str, bytes] = {
+            trigram: ids.tobytes() for trigram, ids in trigram_ids.items()
+        }
+
+    def search(self, query: str, limit: int = 20) -> list[models.Location]:
+        q: str = _normalise(query)
+        if not q:
+            return []
+
+        ranks: dict[int, tuple[int, float, int, str]] = {}
+
+        def rank(idx: int, quality: int, similarity: float = 1.0) -> None:
+            name = self._names[idx]
+            key = (quality, -similarity, len(name), name)
+            if idx not in ranks or key < ranks[idx]:
+                ranks[idx] = key
+
+        for idx in self._prefix_ids(q, self._name_keys, self._name_ids):
+            name = self._names[idx]
+            if name == q:
+                rank(idx, EXACT_MATCH)
+            elif name.startswith(q):
+                rank(idx, NAME_PREFIX_MATCH)
+            else:
+                rank(idx, WORD_PREFIX_MATCH)
+
+        # Every word must start a word in either the name or the region
+        matches: set[int] | None = None
+        for word in q.split():
+            word_matches = set(self._prefix_ids(word, self._name_keys, self._name_ids))
+            word_matches.update(
+                self._prefix_ids(word, self._region_keys, self._region_ids)
+            )
+            matches = word_matches if matches is None else matches & word_matches
+        for idx in matches or ():
+            rank(idx, NAME_AND_REGION_MATCH)
+
+        if len(ranks) < limit and len(q) >= self.MIN_FUZZY_QUERY_LENGTH:
+            for idx, similarity in self._fuzzy_matches(q):
+                rank(idx, FUZZY_MATCH, similarity)
+
+        best: list[int] = sorted(ranks, key=ranks.__getitem__)[:limit]
+        return [self.locations[idx] for idx in best]
+
+    def dumps(self) -> bytes:
+        return marshal.dumps(
+            (
+                self.FORMAT_VERSION,
+                sys.byteorder,
+                _fingerprint(self.locations),
+                self._names,
+                self._regions,
+                self._name_keys,
+                self._name_ids.tobytes(),
+                self._region_keys,
+                self._region_ids.tobytes(),
+                self._trigram_ids,
+            )
+        )
+
+    @classmethod
+    def loads(
+        cls, data: bytes, locations: Sequence[models.Location]
+    ) -> "LocationIndex":
+        """Load an index saved with `dumps`, which must have been built from the
+        same locations. Raises ValueError if the index can't be used.
+        """
+        try:
+            (
+                version,
+                byteorder,
+                fingerprint,
+                names,
+                regions,
+                name_keys,
+                name_ids,
+                region_keys,
+                region_ids,
+                trigram_ids,
+            ) = marshal.loads(data)
+        except (EOFError, TypeError) as err:
+            raise ValueError("invalid location index") from err
+
+        if version != cls.FORMAT_VERSION or byteorder != sys.byteorder:
+            raise ValueError("incompatible location index")
+        if fingerprint != _fingerprint(locations):
+            raise ValueError("location index was built from different locations")
+
+        index = cls.__new__(cls)
+        index.locations = locations
+        index._names = names
+        index._regions = regions
+        index._name_keys = name_keys
+        index._name_ids = array.array("I", name_ids)
+        index._region_keys = region_keys
+        index._region_ids = array.array("I", region_ids)
+        index._trigram_ids = trigram_ids
+        return index
+
+    def _prefix_ids(
+        self, prefix: str, keys: list[str], ids: array.array
+    ) -> Iterator[int]:
+        start = bisect.bisect_left(keys, prefix)
+        end = min(len(keys), start + self.MAX_CANDIDATES)
+        for pos in range(start, end):
+            if not keys[pos].startswith(prefix):
+                break
+            yield ids[pos]
+
+    def _fuzzy_matches(self, q: str) -> Iterator[tuple[int, float]]:
+        query_trigrams = _trigrams(q)
+        shared: dict[int, int] = {}
+        for trigram in query_trigrams:
+            ids = self._trigram_ids.get(trigram)
+            if ids is None:
+                continue
+            for idx in memoryview(ids).cast("I"):
+                shared[idx] = shared.get(idx, 0) + 1
+
+        min_shared: float = self.MIN_FUZZY_SIMILARITY * len(query_trigrams)
+        for idx, count in shared.items():
+            if count >= min_shared:
+                yield idx, count / len(query_trigrams)
+
+
+def _normalise(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def _word_suffixes(texts: list[str]) -> tuple[list[str], array.array]:
+    """Sorted keys for every position a word starts in each text, so a prefix
+    search with bisect finds any text with a word starting with the prefix.
+    """
+    suffixes: list[tuple[str, int]] = []
+    for idx, text in enumerate(texts):
+        start = 0
+        while text:
+            suffixes.append((text[start:], idx))
+            start = text.find(" ", start) + 1
+            if start == 0:
+                break
+    suffixes.sort()
+    return [key for key, _ in suffixes], array.array("I", (i for _, i in suffixes))
+
+
+def _trigrams(text: str) -> set[str]:
+    trigrams: set[str] = set()
+    for word in text.split():
+        padded = f"  {word} "
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def _fingerprint(locations: Iterable[models.Location]) -> int:
+    checksum = 0
+    for location in locations:
+        checksum = zlib.crc32(f"{location.id}\0{location}\0".encode(), checksum)
+    return checksum
@@ -1,8 +1,41 @@
+import array
 import datetime
 import json
-from typing import Any
+import mmap
+import re
+import struct
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Container, Iterable, Iterator, Optional, Sequence
 
 from weather_uk.data import models
+from weather_uk.data.models.forecast_series import WEATHER_TYPES
+from weather_uk.data.models.location_table import NO_REGION
+from weather_uk.domain import instrumentation
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+
+@instrumentation.timed("decode.json")
+def loads(data: bytes | str) -> Any:
+    """Parse a DataPoint JSON response, leaving every value as returned.
+
+    DataPoint returns all values as strings, but the `decode_met_office_*`
+    functions know which fields are numeric and convert only those, so the
+    parsed JSON doesn't need walking again. Uses orjson when it is installed.
+    """
+    return _parse_json(data)
+
+
+def _parse_json(data: bytes | str) -> Any:
+    # Untimed, for the many small documents parsed while streaming
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 class NumbersStoredAsTextDecoder(json.JSONDecoder):
@@ -27,47 +60,521 @@ class NumbersStoredAsTextDecoder(json.JSONDecoder):
             return o
 
 
+@instrumentation.timed("decode.locations")
 def decode_met_office_locations(json_data: dict) -> list[models.Location]:
-    locations: list[models.Location] = []
     locations_data: list[dict] = json_data["Locations"]["Location"]
-    for location in locations_data:
-        id: int = location["id"]
-        name: str = location["name"]
-        region: str | None = location.get("unitaryAuthArea")
+    return [decode_met_office_location(location) for location in locations_data]
+
+
+def decode_met_office_location(json_data: dict) -> models.Location:
+    id: int = int(json_data["id"])
+    name: str = json_data["name"]
+    region: str | None = json_data.get("unitaryAuthArea")
+
+    return models.Location(
+        id,
+        name,
+        region,
+        latitude=_optional_float(json_data.get("latitude")),
+        longitude=_optional_float(json_data.get("longitude")),
+        elevation=_optional_float(json_data.get("elevation")),
+    )
+
+
+def _optional_float(value: str | float | None) -> float | None:
+    return None if value is None else float(value)
+
+
+def iter_met_office_locations(chunks: Iterable[bytes]) -> Iterator[models.Location]:
+    """Decode the sitelist incrementally from a stream of raw response chunks,
+    yielding each location as soon as the chunk it ends in has been received.
+    """
+    # One span for the whole stream, rather than one per location, which would
+    # crowd every other span out of the recorder
+    with instrumentation.span("decode.locations_stream") as span:
+        count = 0
+        for items in iter_json_array_batches(chunks, b"Location"):
+            # Parsing the items of a chunk together saves a call per location
+            for location in _parse_json(b"[" + b",".join(items) + b"]"):
+                yield decode_met_office_location(location)
+            count += len(items)
+        if span is not None:
+            span.attributes["locations"] = count
+
+
+# Objects without any nested objects or arrays (such as the sites of the
+# sitelist) are matched whole, otherwise strings are matched whole so any
+# brackets inside them are skipped, while a lone quote is the start of a string
+# that hasn't been fully received yet. The patterns are unambiguous, so a
+# partially received object fails to match in linear time.
+_JSON_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_JSON_TOKEN = re.compile(
+    rb"\{[^\"\[\]{}]*(?:"
+    + _JSON_STRING
+    + rb"[^\"\[\]{}]*)*\}|"
+    + _JSON_STRING
+    + rb'|"|[\[\]{}]'
+)
+
+
+def iter_json_array_items(chunks: Iterable[bytes], key: bytes) -> Iterator[bytes]:
+    """Incrementally scan a stream of JSON chunks for the first array with the
+    given key, yielding the raw JSON of each object (or array) inside it.
+
+    Only the structure of the JSON is tracked, so each item can be decoded
+    while the rest of the response is still being downloaded.
+    """
+    for items in iter_json_array_batches(chunks, key):
+        yield from items
+
+
+def iter_json_array_batches(
+    chunks: Iterable[bytes], key: bytes
+) -> Iterator[list[bytes]]:
+    """As `iter_json_array_items`, but yields the items that were completed by
+    each chunk together, so they can be parsed in one go.
+    """
+    array_start = re.compile(rb'"' + re.escape(key) + rb'"\s*:\s*\[')
+    chunks = iter(chunks)
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        match = array_start.search(buffer)
+        if match:
+            buffer = buffer[match.end() :]
+            break
+    else:
+        return
+
+    depth: int = 0
+    item_start: int | None = None
+    pos: int = 0
+    while True:
+        items: list[bytes] = []
+        for match in _JSON_TOKEN.finditer(buffer, pos):
+            token: bytes = match.group()
+            if token[0] == ord('"'):
+                if len(token) == 1:
+                    # Wait for the rest of this string before continuing
+                    pos = match.start()
+                    break
+            elif len(token) > 1:
+                # A whole object, which is an item if it isn't nested
+                if depth == 0:
+                    items.append(token)
+            elif token in b"[{":
+                if depth == 0:
+                    item_start = match.start()
+                depth += 1
+            elif depth == 0:
+                if items:
+                    yield items
+                return  # the end of the array
+            else:
+                depth -= 1
+                if depth == 0 and item_start is not None:
+                    items.append(buffer[item_start : match.end()])
+                    item_start = None
+        else:
+            pos = len(buffer)
+        if items:
+            yield items
+
+        # Drop everything already scanned, except any partially received item
+        keep_from: int = pos if item_start is None else item_start
+        buffer = buffer[keep_from:]
+        pos -= keep_from
+        if item_start is not None:
+            item_start = 0
+
+        next_chunk: bytes | None = next(chunks, None)
+        if next_chunk is None:
+            raise ValueError(f"unexpected end of JSON while reading {key!r} array")
+        buffer += next_chunk
+
+
+# Versioned binary snapshot of a decoded sitelist. All integers are little-endian:
+#
+#   header         magic, version, site count, region count, blob lengths
+#   ids            int32 per site
+#   region index   uint16 per site (NO_REGION if the site has no region)
+#   coordinates    float64 latitude, longitude and elevation per site (NaN if unknown)
+#   name offsets   uint32 per site + 1, code point offsets into the names blob
+#   region offsets uint32 per region + 1, code point offsets into the regions blob
+#   names blob     UTF-8 encoded site names, concatenated
+#   regions blob   UTF-8 encoded unique region names, concatenated
+LOCATIONS_SNAPSHOT_MAGIC: bytes = b"WXSL"
+LOCATIONS_SNAPSHOT_VERSION: int = 2
+_SNAPSHOT_HEADER = struct.Struct("<4sHHIIII")
+_NAN: float = float("nan")
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def encode_locations_snapshot(locations: Sequence[models.Location]) -> bytes:
+    regions: dict[str, int] = {}
+    region_index = array.array("H")
+    for location in locations:
+        if location.region is None:
+            region_index.append(NO_REGION)
+        else:
+            region_index.append(regions.setdefault(location.region, len(regions)))
+
+    names = "".join(location.name for location in locations).encode("utf-8")
+    regions_blob = "".join(regions).encode("utf-8")
+    ids = array.array("i", (location.id for location in locations))
+    coordinates = array.array(
+        "d",
+        (
+            _NAN if value is None else value
+            for location in locations
+            for value in (location.latitude, location.longitude, location.elevation)
+        ),
+    )
+    name_offsets = _offsets(location.name for location in locations)
+    region_offsets = _offsets(regions)
+
+    header = _SNAPSHOT_HEADER.pack(
+        LOCATIONS_SNAPSHOT_MAGIC,
+        LOCATIONS_SNAPSHOT_VERSION,
+        0,
+        len(locations),
+        len(regions),
+        len(names),
+        len(regions_blob),
+    )
+    arrays: list[array.array] = [
+        ids,
+        region_index,
+        coordinates,
+        name_offsets,
+        region_offsets,
+    ]
+    if sys.byteorder == "big":
+        for arr in arrays:
+            arr.byteswap()
+
+    return b"".join([header, *(arr.tobytes() for arr in arrays), names, regions_blob])
+
+
+@instrumentation.timed("decode.locations_snapshot")
+def load_locations_snapshot(filepath: Path) -> models.LocationTable:
+    """Load a sitelist snapshot written by `encode_locations_snapshot`.
+
+    The file is memory-mapped and sliced straight into typed arrays, so no
+    intermediate JSON dicts are created for the thousands of sites, and a
+    `Location` is only built for each site as it is read.
+    """
+    with open(filepath, "rb") as snapshot_file:
+        try:
+            buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as err:  # an empty file can't be mapped
+            raise SnapshotError("empty locations snapshot") from err
+
+    with buffer:
+        return decode_locations_snapshot(buffer)
+
+
+def decode_locations_snapshot(buffer: bytes | mmap.mmap) -> models.LocationTable:
+    if len(buffer) < _SNAPSHOT_HEADER.size:
+        raise SnapshotError("truncated locations snapshot header")
+
+    (
+        magic,
+        version,
+        _,
+        count,
+        region_count,
+        names_length,
+        regions_length,
+    ) = _SNAPSHOT_HEADER.unpack_from(buffer)
+    if magic != LOCATIONS_SNAPSHOT_MAGIC:
+        raise SnapshotError("not a locations snapshot")
+    if version != LOCATIONS_SNAPSHOT_VERSION:
+        raise SnapshotError(f"unsupported locations snapshot version {version}")
+
+    view = memoryview(buffer)
+    try:
+        pos: int = _SNAPSHOT_HEADER.size
+        ids, pos = _read_array(view, pos, "i", count)
+        region_index, pos = _read_array(view, pos, "H", count)
+        coordinates, pos = _read_array(view, pos, "d", count * 3)
+        name_offsets, pos = _read_array(view, pos, "I", count + 1)
+        region_offsets, pos = _read_array(view, pos, "I", region_count + 1)
+        names = str(view[pos : pos + names_length], "utf-8")
+        pos += names_length
+        regions_blob = str(view[pos : pos + regions_length], "utf-8")
+        if pos + regions_length != len(view):
+            raise SnapshotError("locations snapshot has unexpected length")
+    finally:
+        view.release()
+
+    regions: list[str] = [
+        regions_blob[region_offsets[i] : region_offsets[i + 1]]
+        for i in range(region_count)
+    ]
+    return models.LocationTable(
+        ids, names, name_offsets, region_index, regions, coordinates
+    )
+
+
+def _offsets(strings: Iterable[str]) -> array.array:
+    offsets = array.array("I", [0])
+    total = 0
+    for string in strings:
+        total += len(string)
+        offsets.append(total)
+    return offsets
 
-        locations.append(models.Location(id, name, region))
 
-    return locations
+def _read_array(
+    view: memoryview, pos: int, typecode: str, length: int
+) -> tuple[array.array, int]:
+    arr = array.array(typecode)
+    end = pos + arr.itemsize * length
+    if end > len(view):
+        raise SnapshotError("truncated locations snapshot")
+    arr.frombytes(view[pos:end])
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr, end
 
 
+@instrumentation.timed("decode.forecast")
 def decode_met_office_forecast(json_data: dict) -> list[models.ForecastDay]:
-    forecast: list[models.ForecastDay] = []
+    """Decode a forecast or observations for a site, at any resolution."""
     forecast_data: dict = json_data["SiteRep"]["DV"]
-    for day in forecast_data["Location"]["Period"]:
+    return decode_met_office_site_forecast(forecast_data["Location"])
+
+
+def decode_met_office_site_forecast(json_data: dict) -> list[models.ForecastDay]:
+    forecast: list[models.ForecastDay] = []
+    for day in json_data["Period"]:
         # requires slice as datetime doesn't parse the "Z" from ISO 8601
         date = datetime.date.fromisoformat(day["value"][:-1])
         forecast_day = models.ForecastDay(date=date, hours=[])
-        for period in day["Rep"]:
-            weather: models.Weather = decode_met_office_weather(period)
-            minutes_after_midnight: int = period["$"]
-            hour = datetime.time(minutes_after_midnight // 60)
-            forecast_day.hours.append(models.ForecastHour(hour, weather))
+        for period in _reps(day):
+            minutes_after_midnight, values = _decode_rep(period)
+            forecast_day.hours.append(
+                models.ForecastHour(
+                    datetime.time(*divmod(minutes_after_midnight, 60)),
+                    _weather(values),
+                )
+            )
 
         forecast.append(forecast_day)
 
     return forecast
 
 
+def decode_met_office_issue_time(json_data: dict) -> datetime.datetime:
+    return _decode_data_date(json_data["SiteRep"]["DV"]["dataDate"])
+
+
+def decode_met_office_capabilities(json_data: dict) -> datetime.datetime:
+    """Decode the issue time of the latest forecast (or observations) from the
+    capabilities of a site-specific resource.
+    """
+    return _decode_data_date(json_data["Resource"]["dataDate"])
+
+
+def _decode_data_date(data_date: str) -> datetime.datetime:
+    # requires slice as datetime doesn't parse the "Z" from ISO 8601
+    return datetime.datetime.fromisoformat(data_date[:-1]).replace(
+        tzinfo=datetime.timezone.utc
+    )
+
+
+_DATA_DATE = re.compile(rb'"dataDate"\s*:\s*"([^"]+)"')
+_SITE_ID = re.compile(rb'"i"\s*:\s*"?(\d+)')
+
+
+@dataclass
+class SiteForecast:
+    location_id: int
+    issue_time: datetime.datetime
+    forecast: list[models.ForecastDay]
+    # The raw JSON for this site, as a complete single site response
+    content: bytes
+
+
+def iter_met_office_site_forecasts(
+    chunks: Iterable[bytes],
+    location_ids: Optional[Container[int]] = None,
+) -> Iterator[SiteForecast]:
+    """Decode the forecasts for many sites incrementally from a stream of raw
+    response chunks, such as the response for all sites. Only the sites in
+    `location_ids` are decoded, if given.
+    """
+    # The issue time is given before the list of sites, so only the start of
+    # the response is kept, until the issue time has been found
+    head = bytearray()
+    data_date: bytes | None = None
+
+    def find_data_date(chunks: Iterable[bytes]) -> Iterator[bytes]:
+        nonlocal data_date
+        for chunk in chunks:
+            if data_date is None:
+                head.extend(chunk)
+                data_date_match = _DATA_DATE.search(head)
+                if data_date_match is not None:
+                    data_date = data_date_match.group(1)
+                    head.clear()
+            yield chunk
+
+    issue_time: datetime.datetime | None = None
+    for site in iter_json_array_items(find_data_date(chunks), b"Location"):
+        if data_date is None:
+            raise ValueError("forecast has no dataDate before its sites")
+        if issue_time is None:
+            issue_time = _decode_data_date(data_date.decode())
+
+        site_id_match = _SITE_ID.search(site)
+        if site_id_match is None:
+            continue
+        location_id = int(site_id_match.group(1))
+        if location_ids is not None and location_id not in location_ids:
+            continue
+
+        yield SiteForecast(
+            location_id=location_id,
+            issue_time=issue_time,
+            forecast=decode_met_office_site_forecast(loads(site)),
+            content=b'{"SiteRep":{"DV":{"dataDate":"%s","Location":%s}}}'
+            % (data_date, site),
+        )
+
+
+@instrumentation.timed("decode.forecast_series")
+def decode_met_office_forecast_series(json_data: dict) -> models.ForecastSeries:
+    """Decode a forecast straight into columns, without creating any `Weather`."""
+    series = models.ForecastSeries()
+    forecast_data: dict = json_data["SiteRep"]["DV"]
+    for day in forecast_data["Location"]["Period"]:
+        date = datetime.date.fromisoformat(day["value"][:-1])
+        midnight = int(
+            datetime.datetime.combine(
+                date, datetime.time(), tzinfo=datetime.timezone.utc
+            ).timestamp()
+        )
+        for period in _reps(day):
+            minutes_after_midnight, values = _decode_rep(period)
+            series.append(midnight + minutes_after_midnight * 60, *values)
+
+    return series
+
+
 def decode_met_office_weather(json_data: dict) -> models.Weather:
-    return models.Weather(
-        weather_type=models.WeatherType(json_data["W"]),
-        precipitation_probability=json_data["Pp"],
-        temp_celsius=json_data["T"],
-        feels_like_temp_celsius=json_data["F"],
-        wind_direction=json_data["D"],
-        wind_speed_mph=json_data["S"],
-        wind_gust_mph=json_data["G"],
-        visibility=json_data["V"],
-        humidity_percent=json_data["H"],
-        max_uv_index=json_data["U"],
+    _, values = _decode_rep(json_data)
+    return _weather(values)
+
+
+@dataclass(frozen=True)
+class _RepParameters:
+    """Names of the parameters in a `Rep` that differ between resolutions.
+    Parameters missing from a `Rep` (e.g. the chance of precipitation in
+    observations) are decoded as None.
+    """
+
+    temp_celsius: str = "T"
+    feels_like_temp_celsius: str = "F"
+    precipitation_probability: str = "Pp"
+    wind_gust_mph: str = "G"
+    humidity_percent: str = "H"
+
+
+_REP_PARAMETERS = _RepParameters()
+# Daily forecasts have a day and a night `Rep`, with the day's maximum and the
+# night's minimum temperatures, and the gust and humidity at noon and midnight
+_DAILY_REPS: dict[str, tuple[int, _RepParameters]] = {
+    "Day": (6 * 60, _RepParameters("Dm", "FDm", "PPd", "Gn", "Hn")),
+    "Night": (18 * 60, _RepParameters("Nm", "FNm", "PPn", "Gm", "Hm")),
+}
+
+# Observations give the visibility in metres, rather than as a code
+_VISIBILITY_METRES: tuple[tuple[int, str], ...] = (
+    (1_000, "VP"),
+    (4_000, "PO"),
+    (10_000, "MO"),
+    (20_000, "GO"),
+    (40_000, "VG"),
+)
+
+# Weather type code, chance of precipitation, temperature, feels like
+# temperature, wind direction, wind speed, wind gust, visibility code, humidity
+# and UV index, in the order of `models.Weather` and `ForecastSeries.append`
+_RepValues = tuple[
+    Optional[int],
+    Optional[int],
+    float,
+    Optional[int],
+    Optional[str],
+    Optional[int],
+    Optional[int],
+    Optional[str],
+    float,
+    Optional[int],
+]
+
+
+def _reps(day: dict) -> list[dict]:
+    # A period with a single `Rep` isn't wrapped in a list
+    reps: list[dict] | dict = day["Rep"]
+    return [reps] if isinstance(reps, dict) else reps
+
+
+def _decode_rep(json_data: dict) -> tuple[int, _RepValues]:
+    """Decode a `Rep` of any resolution, returning its time in minutes after
+    midnight and its values.
+    """
+    time: str | int = json_data["$"]
+    daily_rep = _DAILY_REPS.get(time) if isinstance(time, str) else None
+    if daily_rep is None:
+        minutes_after_midnight = int(time)
+        parameters = _REP_PARAMETERS
+    else:
+        minutes_after_midnight, parameters = daily_rep
+
+    return minutes_after_midnight, (
+        _optional_int(json_data.get("W")),
+        _optional_int(json_data.get(parameters.precipitation_probability)),
+        _number(json_data[parameters.temp_celsius]),
+        _optional_int(json_data.get(parameters.feels_like_temp_celsius)),
+        json_data.get("D"),
+        _optional_int(json_data.get("S")),
+        _optional_int(json_data.get(parameters.wind_gust_mph)),
+        _visibility_code(json_data.get("V")),
+        _number(json_data[parameters.humidity_percent]),
+        _optional_int(json_data.get("U")),
     )
+
+
+def _weather(values: _RepValues) -> models.Weather:
+    weather_type = None if values[0] is None else WEATHER_TYPES[values[0]]
+    return models.Weather(weather_type, *values[1:])
+
+
+def _number(value: str | float) -> float:
+    # Forecasts are given in whole numbers, but observations to one decimal place
+    if isinstance(value, float):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _optional_int(value: str | int | None) -> int | None:
+    return None if value is None else int(value)
+
+
+def _visibility_code(value: str | int | None) -> str | None:
+    if value is None or isinstance(value, str) and not value.isdigit():
+        return value
+    metres = int(value)
+    for limit, code in _VISIBILITY_METRES:
+        if metres < limit:
+            return code
+    return "EX"
@@ -0,0 +1,125 @@
+import heapq
+import math
+from dataclasses import dataclass
+from typing import Sequence
+
+from weather_uk.data import models
+
+EARTH_RADIUS_KM: float = 6371.0
+
+Point = tuple[float, float, float]
+
+
+@dataclass
+class NearbyLocation:
+    location: models.Location
+    distance_km: float
+
+
+class SiteIndex:
+    """k-d tree over the sitelist coordinates for nearest site lookups.
+
+    Sites are stored as points on the unit sphere, so the straight line
+    distance between points always ranks sites in the same order as the great
+    circle distance, with no special cases near the poles or the antimeridian.
+    Sites without coordinates are left out of the index.
+    """
+
+    def __init__(self, locations: Sequence[models.Location]) -> None:
+        self.locations: list[models.Location] = [
+            location
+            for location in locations
+            if location.latitude is not None and location.longitude is not None
+        ]
+        self._points: list[Point] = [
+            _to_point(location.latitude, location.longitude)  # type: ignore[arg-type]
+            for location in self.locations
+        ]
+        # The tree is stored implicitly: each node is the median of its range
+        # of `_order`, split on the axis for its depth
+        self._order: list[int] = list(range(len(self._points)))
+        self._build(0, len(self._order), 0)
+
+    def nearest(
+        self, latitude: float, longitude: float, count: int = 1
+    ) -> list[NearbyLocation]:
+        """Return up to `count` sites nearest to the given coordinates, nearest
+        first.
+        """
+        if count < 1 or not self._order:
+            return []
+
+        target = _to_point(latitude, longitude)
+        # Max heap of the best (negated squared distance, site) found so far
+        best: list[tuple[float, int]] = []
+        self._search(target, count, best, 0, len(self._order), 0)
+
+        return [
+            NearbyLocation(
+                self.locations[site],
+                _chord_to_km(math.sqrt(-negated_distance)),
+            )
+            for negated_distance, site in sorted(best, reverse=True)
+        ]
+
+    def _build(self, start: int, end: int, axis: int) -> None:
+        if end - start <= 1:
+            return
+        points = self._points
+        self._order[start:end] = sorted(
+            self._order[start:end], key=lambda site: points[site][axis]
+        )
+        mid = (start + end) // 2
+        next_axis = (axis + 1) % 3
+        self._build(start, mid, next_axis)
+        self._build(mid + 1, end, next_axis)
+
+    def _search(
+        self,
+        target: Point,
+        count: int,
+        best: list[tuple[float, int]],
+        start: int,
+        end: int,
+        axis: int,
+    ) -> None:
+        if start >= end:
+            return
+        mid = (start + end) // 2
+        site = self._order[mid]
+        point = self._points[site]
+
+        distance = _squared_distance(target, point)
+        if len(best) < count:
+            heapq.heappush(best, (-distance, site))
+        elif distance < -best[0][0]:
+            heapq.heapreplace(best, (-distance, site))
+
+        # Search the side of the split containing the target first, then the
+        # other side only if it could contain anything nearer
+        offset = target[axis] - point[axis]
+        next_axis = (axis + 1) % 3
+        near, far = ((start, mid), (mid + 1, end))
+        if offset > 0:
+            near, far = far, near
+        self._search(target, count, best, *near, next_axis)
+        if len(best) < count or offset * offset < -best[0][0]:
+            self._search(target, count, best, *far, next_axis)
+
+
+def _to_point(latitude: float, longitude: float) -> Point:
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    return (
+        math.cos(lat) * math.cos(lon),
+        math.cos(lat) * math.sin(lon),
+        math.sin(lat),
+    )
+
+
+def _squared_distance(a: Point, b: Point) -> float:
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+def _chord_to_km(chord: float) -> float:
+    return EARTH_RADIUS_KM * 2 * math.asin(min(1.0, chord / 2))
@@ -1,11 +1,34 @@
-import json
+import contextvars
+import datetime
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional, Sequence
 
 import requests
 
 from weather_uk.data import models
-from weather_uk.domain import serialisers
+from weather_uk.domain import instrumentation, serialisers
+from weather_uk.domain.cache import CachedForecast, ForecastCache, LocationsCache
+from weather_uk.domain.resilience import CircuitOpenError, ResiliencePolicy
+from weather_uk.domain.scheduler import RequestScheduler
+
+
+class ForecastsNotFoundError(LookupError):
+    """Raised when some of the forecasts requested at once weren't given, with
+    the forecasts that were.
+    """
+
+    def __init__(
+        self,
+        location_ids: list[int],
+        forecasts: dict[int, list[models.ForecastDay]],
+    ) -> None:
+        super().__init__(
+            "No forecast for location(s) " + ", ".join(map(str, location_ids))
+        )
+        self.location_ids: list[int] = location_ids
+        self.forecasts: dict[int, list[models.ForecastDay]] = forecasts
 
 
 class AbstractWeatherAPIClient(ABC):
@@ -14,72 +37,360 @@ class AbstractWeatherAPIClient(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def get_locations_list(self) -> list[models.Location]:
+    def get_locations_list(self) -> Sequence[models.Location]:
         raise NotImplementedError
 
     @abstractmethod
     def get_forecast(self, location_id: int) -> list[models.ForecastDay]:
         raise NotImplementedError
 
+    def iter_locations_list(self) -> Iterator[models.Location]:
+        yield from self.get_locations_list()
+
+    def get_latest_issue_time(
+        self, resolution: Optional[models.Resolution] = None
+    ) -> datetime.datetime | None:
+        """When the latest forecast at the resolution was issued, or None if it
+        can't be told without fetching a forecast.
+        """
+        return None
+
+    def refresh_forecast(
+        self, location_id: int, resolution: Optional[models.Resolution] = None
+    ) -> list[models.ForecastDay]:
+        """Get the forecast at the resolution, even if the cached forecast is
+        still fresh. Clients with a single resolution ignore it.
+        """
+        return self.get_forecast(location_id)
+
+    def get_forecasts(
+        self, location_ids: Iterable[int]
+    ) -> dict[int, list[models.ForecastDay]]:
+        return {
+            location_id: self.get_forecast(location_id) for location_id in location_ids
+        }
+
 
 class MetOfficeAPIClient(AbstractWeatherAPIClient):
     BASE_URL: str = "http://datapoint.metoffice.gov.uk/public/data/"
     DATATYPE: str = "json"
+    FORECAST_RESOLUTION: models.Resolution = models.Resolution.THREE_HOURLY
+    STREAM_CHUNK_SIZE: int = 16 * 1024
+    # Fetching more forecasts than this at once streams the forecast for all
+    # sites rather than making a request per site, as it costs less of the
+    # fair use allowance and avoids queuing for connections
+    BULK_FORECASTS_THRESHOLD: int = 50
+    MAX_PARALLEL_REQUESTS: int = 8
+    # Responses worth retrying, as the request may succeed later
+    TRANSIENT_STATUS_CODES: frozenset[int] = frozenset({429, 500, 502, 503, 504})
 
-    def __init__(self, api_key: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        locations_cache: Optional[LocationsCache] = None,
+        forecast_cache: Optional[ForecastCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        resilience: Optional[ResiliencePolicy] = None,
+    ) -> None:
         self.api_key: str | None = api_key
         self._session: requests.Session = requests.Session()
+        self._locations_cache: LocationsCache | None = locations_cache
+        self._forecast_cache: ForecastCache | None = forecast_cache
+        self._scheduler: RequestScheduler = (
+            scheduler if scheduler is not None else RequestScheduler()
+        )
+        self.resilience: ResiliencePolicy = (
+            resilience if resilience is not None else ResiliencePolicy()
+        )
 
     def check_authentication(self) -> None:
         # Try a small request (0.1kB) - if no exceptions then all is well!
         resource: str = "txt/wxfcs/regionalforecast/json/capabilities"
         self._request(resource)
 
-    def get_locations_list(self) -> list[models.Location]:
+    def get_locations_list(self) -> Sequence[models.Location]:
+        """Get the sitelist, decoding it in one pass once it has downloaded,
+        which is much quicker overall than streaming it.
+        """
+        resp = self._request_locations_list(stream=False)
+        if not isinstance(resp, requests.Response):
+            return resp
+
+        locations = serialisers.decode_met_office_locations(
+            serialisers.loads(resp.content)
+        )
+        self._save_locations_list(locations, resp)
+        return locations
+
+    def iter_locations_list(self) -> Iterator[models.Location]:
+        """Stream the sitelist, yielding each location as it downloads."""
+        resp = self._request_locations_list(stream=True)
+        if not isinstance(resp, requests.Response):
+            yield from resp
+            return
+
+        locations: list[models.Location] = []
+        with resp:
+            chunks = resp.iter_content(chunk_size=self.STREAM_CHUNK_SIZE)
+            for location in serialisers.iter_met_office_locations(chunks):
+                locations.append(location)
+                yield location
+        self._save_locations_list(locations, resp)
+
+    def _request_locations_list(
+        self, stream: bool
+    ) -> requests.Response | Sequence[models.Location]:
+        """Request the sitelist, or return the cached sitelist instead if it
+        is still fresh, hasn't been modified, or can't be downloaded.
+        """
+        cache = self._locations_cache
+        cached = cache.load() if cache is not None else None
+        if cache is not None and cached is not None and cached.is_fresh(cache.ttl):
+            return cached.locations
+
+        headers: dict[str, str] = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
         resource: str = f"val/wxfcs/all/{self.DATATYPE}/sitelist"
-        resp: requests.Response = self._request(resource)
-        json_data: dict = json.loads(
-            resp.text,
-            cls=serialisers.NumbersStoredAsTextDecoder,
+        try:
+            resp = self._request(resource, headers=headers, stream=stream)
+        except Exception as err:
+            if cached is None or not self._can_fall_back(err):
+                raise
+            self.resilience.record_fallback()
+            return cached.locations
+
+        if cache is not None and cached is not None:
+            if resp.status_code == requests.codes.not_modified:
+                resp.close()
+                return cache.touch(cached).locations
+        return resp
+
+    def _save_locations_list(
+        self, locations: Sequence[models.Location], resp: requests.Response
+    ) -> None:
+        if self._locations_cache is not None:
+            self._locations_cache.save(
+                locations,
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+            )
+
+    def get_forecast(
+        self, location_id: int, resolution: Optional[models.Resolution] = None
+    ) -> list[models.ForecastDay]:
+        """Get the forecast for a location, 3 hourly unless another resolution
+        is given. The hourly resolution gets the latest observations instead.
+        """
+        return self._get_forecast(
+            location_id, resolution or self.FORECAST_RESOLUTION, refresh=False
         )
 
-        return serialisers.decode_met_office_locations(json_data)
+    def refresh_forecast(
+        self, location_id: int, resolution: Optional[models.Resolution] = None
+    ) -> list[models.ForecastDay]:
+        return self._get_forecast(
+            location_id, resolution or self.FORECAST_RESOLUTION, refresh=True
+        )
 
-    def get_forecast(self, location_id: int) -> list[models.ForecastDay]:
-        resource: str = f"val/wxfcs/all/{self.DATATYPE}/{location_id}"
-        query: str = "res=3hourly&"
-        resp: requests.Response = self._request(resource, query)
-        json_data = json.loads(
-            resp.text,
-            cls=serialisers.NumbersStoredAsTextDecoder,
+    def _get_forecast(
+        self, location_id: int, resolution: models.Resolution, refresh: bool
+    ) -> list[models.ForecastDay]:
+        cache = self._forecast_cache
+        cached = cache.get(location_id, resolution) if cache is not None else None
+        if cached is not None and cached.is_fresh() and not refresh:
+            return cached.forecast
+
+        try:
+            return self._scheduler.coalesce(
+                ("forecast", location_id, resolution),
+                lambda: self._fetch_forecast(location_id, resolution),
+            )
+        except Exception as err:
+            if cached is None or not self._can_fall_back(err):
+                raise
+            self.resilience.record_fallback()
+            return cached.forecast
+
+    def get_latest_issue_time(
+        self, resolution: Optional[models.Resolution] = None
+    ) -> datetime.datetime:
+        # The capabilities are tiny compared to a forecast, so are a cheap way to
+        # check for a new issue
+        resolution = resolution or self.FORECAST_RESOLUTION
+        resource: str = self._site_resource(resolution, "capabilities")
+        resp: requests.Response = self._request(resource, f"res={resolution}&")
+        return serialisers.decode_met_office_capabilities(
+            serialisers.loads(resp.content)
         )
 
-        return serialisers.decode_met_office_forecast(json_data)
+    def get_observations(self, location_id: int) -> list[models.ForecastDay]:
+        """Get the hourly observations for the last 24 hours at a location."""
+        return self.get_forecast(location_id, models.Resolution.HOURLY)
+
+    def _fetch_forecast(
+        self, location_id: int, resolution: models.Resolution
+    ) -> list[models.ForecastDay]:
+        cache = self._forecast_cache
+        resource: str = self._site_resource(resolution, str(location_id))
+        query: str = f"res={resolution}&"
+        resp: requests.Response = self._request(resource, query)
+        json_data: dict = serialisers.loads(resp.content)
+        forecast = serialisers.decode_met_office_forecast(json_data)
+
+        if cache is not None:
+            cache.put(
+                location_id,
+                resolution,
+                CachedForecast(
+                    forecast=forecast,
+                    issue_time=serialisers.decode_met_office_issue_time(json_data),
+                    fetched_at=time.time(),
+                ),
+                resp.content,
+            )
+
+        return forecast
+
+    def get_forecasts(
+        self,
+        location_ids: Iterable[int],
+        resolution: Optional[models.Resolution] = None,
+    ) -> dict[int, list[models.ForecastDay]]:
+        resolution = resolution or self.FORECAST_RESOLUTION
+        forecasts: dict[int, list[models.ForecastDay]] = {}
+        stale: dict[int, CachedForecast] = {}
+        missing: list[int] = []
+        for location_id in dict.fromkeys(location_ids):
+            cached = (
+                self._forecast_cache.get(location_id, resolution)
+                if self._forecast_cache is not None
+                else None
+            )
+            if cached is not None and cached.is_fresh():
+                forecasts[location_id] = cached.forecast
+            else:
+                missing.append(location_id)
+                if cached is not None:
+                    stale[location_id] = cached
+
+        if len(missing) > self.BULK_FORECASTS_THRESHOLD:
+            try:
+                forecasts.update(self._get_bulk_forecasts(missing, resolution))
+            except Exception as err:
+                if len(stale) < len(missing) or not self._can_fall_back(err):
+                    raise
+                self.resilience.record_fallback()
+                forecasts.update(
+                    (location_id, cached.forecast)
+                    for location_id, cached in stale.items()
+                )
+            not_found = [
+                location_id for location_id in missing if location_id not in forecasts
+            ]
+            if not_found:
+                raise ForecastsNotFoundError(not_found, forecasts)
+        elif missing:
+            max_workers = min(len(missing), self.MAX_PARALLEL_REQUESTS)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Copy the context so each request keeps the caller's priority
+                futures = [
+                    executor.submit(
+                        contextvars.copy_context().run,
+                        self.get_forecast,
+                        location_id,
+                        resolution,
+                    )
+                    for location_id in missing
+                ]
+                forecasts.update(zip(missing, (future.result() for future in futures)))
+
+        return forecasts
+
+    def _get_bulk_forecasts(
+        self, location_ids: list[int], resolution: models.Resolution
+    ) -> dict[int, list[models.ForecastDay]]:
+        resource: str = self._site_resource(resolution, "all")
+        query: str = f"res={resolution}&"
+        forecasts: dict[int, list[models.ForecastDay]] = {}
+        with self._request(resource, query, stream=True) as resp:
+            chunks = resp.iter_content(chunk_size=self.STREAM_CHUNK_SIZE)
+            fetched_at = time.time()
+            for site in serialisers.iter_met_office_site_forecasts(
+                chunks, set(location_ids)
+            ):
+                forecasts[site.location_id] = site.forecast
+                if self._forecast_cache is not None:
+                    self._forecast_cache.put(
+                        site.location_id,
+                        resolution,
+                        CachedForecast(site.forecast, site.issue_time, fetched_at),
+                        site.content,
+                    )
+
+        return forecasts
+
+    def _site_resource(self, resolution: models.Resolution, site: str) -> str:
+        feed: str = "wxobs" if resolution.is_observations else "wxfcs"
+        return f"val/{feed}/all/{self.DATATYPE}/{site}"
 
     def _request(
         self,
         resource: str,
         query: Optional[str] = None,
+        headers: Optional[dict[str, str]] = None,
+        stream: bool = False,
     ) -> requests.Response:
-        req: requests.Request = self._build_request(resource, query)
+        req: requests.Request = self._build_request(resource, query, headers)
         prepped: requests.PreparedRequest = req.prepare()
-        try:
-            resp: requests.Response = self._session.send(prepped)
-            resp.raise_for_status()
-        except requests.exceptions.HTTPError as http_err:
-            raise http_err
-        except requests.exceptions.ConnectionError as cxn_err:
-            raise cxn_err
-        except requests.exceptions.Timeout as timeout_err:
-            raise timeout_err
-        except requests.exceptions.RequestException as req_err:
-            raise req_err
 
-        return resp
+        def send() -> requests.Response:
+            self._scheduler.acquire()
+            resp: requests.Response = self._session.send(
+                prepped, stream=stream, timeout=self.resilience.timeout
+            )
+            try:
+                resp.raise_for_status()
+            except requests.exceptions.HTTPError:
+                resp.close()
+                raise
+            return resp
+
+        # For streamed responses, this only times the wait for the headers
+        with instrumentation.span(
+            "datapoint.request", resource=resource, stream=stream
+        ) as span:
+            resp = self.resilience.call(
+                send, self._is_transient_error, idempotent=prepped.method == "GET"
+            )
+            if span is not None:
+                span.attributes["status_code"] = resp.status_code
+            return resp
+
+    def _is_transient_error(self, err: Exception) -> bool:
+        if isinstance(
+            err, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+        ):
+            return True
+        if isinstance(err, requests.exceptions.HTTPError) and err.response is not None:
+            return err.response.status_code in self.TRANSIENT_STATUS_CODES
+        return False
+
+    def _can_fall_back(self, err: Exception) -> bool:
+        # Serve stale cached data while DataPoint is down, but not for errors
+        # such as an invalid API key
+        return isinstance(err, CircuitOpenError) or self._is_transient_error(err)
 
     def _build_request(
-        self, resource: str, query: Optional[str] = None
+        self,
+        resource: str,
+        query: Optional[str] = None,
+        headers: Optional[dict[str, str]] = None,
     ) -> requests.Request:
         query = "" if not query else query
         url: str = f"{self.BASE_URL}{resource}?{query}key={self.api_key}"
-        return requests.Request(method="GET", url=url)
+        return requests.Request(method="GET", url=url, headers=headers)
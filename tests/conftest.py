@@ -0,0 +1,14 @@
+import pytest
+from fake_weather_api import FakeWeatherAPIClient
+
+from weather_uk.domain.cache import ForecastCache
+
+
+@pytest.fixture
+def forecast_cache() -> ForecastCache:
+    return ForecastCache()
+
+
+@pytest.fixture
+def weather_api(forecast_cache: ForecastCache) -> FakeWeatherAPIClient:
+    return FakeWeatherAPIClient(forecast_cache)
@@ -0,0 +1,430 @@
+"""Local stand-in for the DataPoint API, serving synthetic data over HTTP.
+
+Exercises the real HTTP path of the API clients, so they can be tested,
+benchmarked and soak tested offline. The sitelist and forecasts are generated
+for any number of sites, and the server can be made slow or unreliable:
+
+    with DataPointServer(sites=5000, latency=0.05, error_rate=0.1) as server:
+        api = MetOfficeAPIClient(server.api_key)
+        api.BASE_URL = server.base_url
+
+It can also be run on its own, e.g. `python tests/datapoint_server.py --help`.
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter, deque
+from functools import lru_cache
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlsplit
+
+FIRST_SITE_ID = 300000
+COMPASS_POINTS = ("N", "NE", "E", "SE", "S", "SW", "W", "NW")
+VISIBILITY_CODES = ("VP", "PO", "MO", "GO", "VG", "EX")
+PERIODS_PER_DAY = 8
+FEED_RESOLUTIONS = {"wxfcs": ("3hourly", "daily"), "wxobs": ("hourly",)}
+
+ISSUE_TIME = datetime.datetime(2023, 3, 13, 23, tzinfo=datetime.timezone.utc)
+LAST_MODIFIED = "Mon, 13 Mar 2023 23:00:00 GMT"
+
+
+class DataPointServer:
+    """Serves DataPoint's sitelist, forecast, observations and capabilities
+    resources, with forecasts at the 3 hourly and daily resolutions.
+
+    - `latency` delays every response by that many seconds.
+    - `error_rate` is the fraction of requests that fail with a 503.
+    - `rate_limit` is the number of requests allowed per minute, beyond which
+      requests fail with a 429, as DataPoint does for fair use.
+    - The sitelist has an ETag, and conditional requests get a 304.
+    - Requests without the right `api_key` get a 403.
+    """
+
+    def __init__(
+        self,
+        sites: int = 100,
+        days: int = 5,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: Optional[int] = None,
+        api_key: str = "0123-4567-89ab-cdef",
+        issue_time: datetime.datetime = ISSUE_TIME,
+        seed: int = 0,
+        port: int = 0,
+    ) -> None:
+        self.sites: int = sites
+        self.days: int = days
+        self.latency: float = latency
+        self.error_rate: float = error_rate
+        self.rate_limit: int | None = rate_limit
+        self.api_key: str = api_key
+        self.issue_time: datetime.datetime = issue_time
+        self.seed: int = seed
+        # Count of requests for each resource, including failed requests
+        self.requests: Counter[str] = Counter()
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent_requests: deque[float] = deque()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), _RequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.datapoint = self  # type: ignore[attr-defined]
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host!s}:{port}/public/data/"
+
+    @property
+    def site_ids(self) -> range:
+        return range(FIRST_SITE_ID, FIRST_SITE_ID + self.sites)
+
+    def start(self) -> "DataPointServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "DataPointServer":
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    @property
+    def sitelist_etag(self) -> str:
+        digest = hashlib.sha1(self.sitelist_content()).hexdigest()
+        return f'"{digest[:16]}"'
+
+    def sitelist_content(self) -> bytes:
+        return make_sitelist(self.sites, self.seed)
+
+    def forecast_content(self, location_id: int, resolution: str = "3hourly") -> bytes:
+        return json.dumps(
+            make_site_rep(
+                self.issue_time, self._location_forecast(location_id, resolution)
+            )
+        ).encode()
+
+    def all_forecasts_content(self, resolution: str = "3hourly") -> bytes:
+        locations = [
+            self._location_forecast(location_id, resolution)
+            for location_id in self.site_ids
+        ]
+        return json.dumps(make_site_rep(self.issue_time, locations)).encode()
+
+    def capabilities_content(self, resolution: str = "3hourly") -> bytes:
+        return json.dumps(make_capabilities(self.issue_time, resolution)).encode()
+
+    def _location_forecast(self, location_id: int, resolution: str) -> dict[str, Any]:
+        if resolution == "daily":
+            return make_daily_location_forecast(
+                location_id, self.days, self.issue_time, self.seed
+            )
+        if resolution == "hourly":
+            return make_location_observations(location_id, self.issue_time, self.seed)
+        return make_location_forecast(
+            location_id, self.days, self.issue_time, self.seed
+        )
+
+    def _check_limits(self) -> HTTPStatus | None:
+        with self._lock:
+            if self._random.random() < self.error_rate:
+                return HTTPStatus.SERVICE_UNAVAILABLE
+            if self.rate_limit is not None:
+                now = time.monotonic()
+                while self._recent_requests and now - self._recent_requests[0] > 60:
+                    self._recent_requests.popleft()
+                if len(self._recent_requests) >= self.rate_limit:
+                    return HTTPStatus.TOO_MANY_REQUESTS
+                self._recent_requests.append(now)
+        return None
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    # Keep connections alive, as DataPoint does
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        server: DataPointServer = self.server.datapoint  # type: ignore[attr-defined]
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        resource = url.path.removeprefix("/public/data/")
+        with server._lock:
+            server.requests[resource] += 1
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        if query.get("key") != [server.api_key]:
+            self._send(HTTPStatus.FORBIDDEN)
+            return
+        status = server._check_limits()
+        if status is not None:
+            self._send(status, headers={"Retry-After": "60"})
+            return
+
+        if resource == "txt/wxfcs/regionalforecast/json/capabilities":
+            self._send(HTTPStatus.OK, b'{"RegionalFcst": {"issuedAt": ""}}')
+        elif resource == "val/wxfcs/all/json/sitelist":
+            etag = server.sitelist_etag
+            headers = {"ETag": etag, "Last-Modified": LAST_MODIFIED}
+            if self.headers.get("If-None-Match") == etag:
+                self._send(HTTPStatus.NOT_MODIFIED, headers=headers)
+            else:
+                self._send(HTTPStatus.OK, server.sitelist_content(), headers)
+        elif resource.startswith(("val/wxfcs/all/json/", "val/wxobs/all/json/")):
+            feed, site = resource.split("/")[1], resource.rsplit("/", 1)[-1]
+            resolution = query.get("res", [""])[0]
+            if resolution not in FEED_RESOLUTIONS[feed]:
+                self._send(HTTPStatus.BAD_REQUEST)
+            elif site == "capabilities":
+                self._send(HTTPStatus.OK, server.capabilities_content(resolution))
+            elif site == "all":
+                self._send(HTTPStatus.OK, server.all_forecasts_content(resolution))
+            elif site.isdigit() and int(site) in server.site_ids:
+                self._send(
+                    HTTPStatus.OK, server.forecast_content(int(site), resolution)
+                )
+            else:
+                self._send(HTTPStatus.NOT_FOUND)
+        else:
+            self._send(HTTPStatus.NOT_FOUND)
+
+    def _send(
+        self,
+        status: HTTPStatus,
+        content: bytes = b"",
+        headers: Optional[dict[str, str]] = None,
+    ) -> None:
+        self.send_response(status)
+        if content:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@lru_cache(maxsize=4)
+def make_sitelist(sites: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    locations = [
+        {
+            "elevation": f"{rng.uniform(0, 500):.1f}",
+            "id": str(location_id),
+            "latitude": f"{rng.uniform(50, 58.5):.4f}",
+            "longitude": f"{rng.uniform(-6, 1.7):.4f}",
+            "name": f"Site {location_id}",
+            "region": rng.choice(("nw", "ne", "se", "sw", "wm", "em")),
+            "unitaryAuthArea": f"Area {location_id % 50}",
+        }
+        for location_id in range(FIRST_SITE_ID, FIRST_SITE_ID + sites)
+    ]
+    return json.dumps({"Locations": {"Location": locations}}).encode()
+
+
+def make_location_forecast(
+    location_id: int,
+    days: int = 5,
+    issue_time: datetime.datetime = ISSUE_TIME,
+    seed: int = 0,
+    periods_per_day: int = PERIODS_PER_DAY,
+) -> dict[str, Any]:
+    """Forecast for a location, 3 hourly by default or hourly with
+    `periods_per_day=24`.
+    """
+    rng = random.Random(seed * 1_000_003 + location_id)
+    minutes_per_period = 24 * 60 // periods_per_day
+    periods = []
+    for day in range(days):
+        date = issue_time.date() + datetime.timedelta(days=day)
+        reps = []
+        for period in range(periods_per_day):
+            temp = rng.randint(-5, 25)
+            speed = rng.randint(0, 30)
+            reps.append(
+                {
+                    "D": rng.choice(COMPASS_POINTS),
+                    "F": str(temp - rng.randint(0, 5)),
+                    "G": str(speed + rng.randint(0, 15)),
+                    "H": str(rng.randint(40, 100)),
+                    "Pp": str(rng.randint(0, 100)),
+                    "S": str(speed),
+                    "T": str(temp),
+                    "V": rng.choice(VISIBILITY_CODES),
+                    "W": str(rng.choice([w for w in range(31) if w != 4])),
+                    "U": str(rng.randint(0, 8)),
+                    "$": str(period * minutes_per_period),
+                }
+            )
+        periods.append({"type": "Day", "value": f"{date.isoformat()}Z", "Rep": reps})
+
+    return _location(location_id, periods)
+
+
+def make_daily_location_forecast(
+    location_id: int,
+    days: int = 5,
+    issue_time: datetime.datetime = ISSUE_TIME,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Daily forecast for a location, with a day and a night period per day."""
+    rng = random.Random(seed * 1_000_003 + location_id)
+    periods = []
+    for day in range(days):
+        date = issue_time.date() + datetime.timedelta(days=day)
+        reps = []
+        for period, (temp, gust, humidity, precip) in {
+            "Day": ("Dm", "Gn", "Hn", "PPd"),
+            "Night": ("Nm", "Gm", "Hm", "PPn"),
+        }.items():
+            temp_celsius = rng.randint(-5, 25)
+            speed = rng.randint(0, 30)
+            rep = {
+                "D": rng.choice(COMPASS_POINTS),
+                f"F{temp}": str(temp_celsius - rng.randint(0, 5)),
+                gust: str(speed + rng.randint(0, 15)),
+                humidity: str(rng.randint(40, 100)),
+                precip: str(rng.randint(0, 100)),
+                "S": str(speed),
+                temp: str(temp_celsius),
+                "V": rng.choice(VISIBILITY_CODES),
+                "W": str(rng.choice([w for w in range(31) if w != 4])),
+                "$": period,
+            }
+            if period == "Day":
+                rep["U"] = str(rng.randint(0, 8))
+            reps.append(rep)
+        periods.append({"type": "Day", "value": f"{date.isoformat()}Z", "Rep": reps})
+
+    return _location(location_id, periods)
+
+
+def make_location_observations(
+    location_id: int,
+    issue_time: datetime.datetime = ISSUE_TIME,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Hourly observations for the 24 hours up to `issue_time`, with the
+    visibility in metres, temperatures to one decimal place and a gust only
+    every other hour.
+    """
+    rng = random.Random(seed * 1_000_003 + location_id)
+    periods: list[dict[str, Any]] = []
+    for hours_ago in range(23, -1, -1):
+        time = issue_time - datetime.timedelta(hours=hours_ago)
+        value = f"{time.date().isoformat()}Z"
+        if not periods or periods[-1]["value"] != value:
+            periods.append({"type": "Day", "value": value, "Rep": []})
+        speed = rng.randint(0, 30)
+        rep = {
+            "D": rng.choice(COMPASS_POINTS),
+            "H": f"{rng.uniform(40, 100):.1f}",
+            "P": str(rng.randint(980, 1040)),
+            "S": str(speed),
+            "T": f"{rng.uniform(-5, 25):.1f}",
+            "V": str(rng.randint(100, 60000)),
+            "W": str(rng.choice([w for w in range(31) if w != 4])),
+            "Pt": rng.choice(("F", "R", "S")),
+            "Dp": f"{rng.uniform(-5, 15):.1f}",
+            "$": str(time.hour * 60),
+        }
+        if hours_ago % 2:
+            rep["G"] = str(speed + rng.randint(0, 15))
+        periods[-1]["Rep"].append(rep)
+
+    return _location(location_id, periods)
+
+
+def _location(location_id: int, periods: list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        "i": str(location_id),
+        "lat": "50.0",
+        "lon": "-3.0",
+        "name": f"SITE {location_id}",
+        "country": "ENGLAND",
+        "continent": "EUROPE",
+        "elevation": "10.0",
+        "Period": periods,
+    }
+
+
+def make_site_rep(
+    issue_time: datetime.datetime, location: dict[str, Any] | list[dict[str, Any]]
+) -> dict[str, Any]:
+    return {
+        "SiteRep": {
+            "Wx": {"Param": []},
+            "DV": {
+                "dataDate": issue_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "type": "Forecast",
+                "Location": location,
+            },
+        }
+    }
+
+
+def make_capabilities(issue_time: datetime.datetime, resolution: str) -> dict[str, Any]:
+    return {
+        "Resource": {
+            "dataDate": issue_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "res": resolution,
+        }
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local stand-in DataPoint API.")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--sites", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=None)
+    parser.add_argument("--api-key", default="0123-4567-89ab-cdef")
+    args = parser.parse_args()
+
+    server = DataPointServer(
+        sites=args.sites,
+        days=args.days,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        api_key=args.api_key,
+        port=args.port,
+    )
+    print(f"Serving {args.sites} sites at {server.base_url} (key {args.api_key})")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Stand-in for the weather API client, for tests of the code that uses one.
+
+The tests get one from the `weather_api` fixture in conftest.py, and the
+benchmarks build their own with synthetic locations and forecasts.
+"""
+
+import datetime
+import threading
+import time
+from typing import Optional, Sequence
+
+from weather_uk.data import models
+from weather_uk.domain import scheduler
+from weather_uk.domain.cache import CachedForecast, ForecastCache
+from weather_uk.domain.weather_api_client import AbstractWeatherAPIClient
+
+ISSUE_TIME = datetime.datetime(2023, 6, 1, 9, tzinfo=datetime.timezone.utc)
+
+
+class FakeWeatherAPIClient(AbstractWeatherAPIClient):
+    """Returns the same `forecast` for every site, caching it in the
+    `forecast_cache` if there is one, and records the sites, priorities and
+    resolutions requested.
+
+    Requests for a site in `errors` raise its error instead, and once `error`
+    is set every request raises it, including the authentication check.
+    """
+
+    def __init__(
+        self,
+        forecast_cache: Optional[ForecastCache] = None,
+        forecast: Optional[list[models.ForecastDay]] = None,
+        issue_time: datetime.datetime = ISSUE_TIME,
+        locations: Sequence[models.Location] = (),
+        delay: float = 0.0,
+    ) -> None:
+        self.api_key: str | None = None
+        self.forecast_cache: ForecastCache | None = forecast_cache
+        self.forecast: list[models.ForecastDay] = forecast or []
+        self.issue_time: datetime.datetime = issue_time
+        self.locations: Sequence[models.Location] = locations
+        # Seconds each forecast takes to fetch
+        self.delay: float = delay
+        self.error: Exception | None = None
+        self.errors: dict[int, Exception] = {}
+
+        self.requested: list[int] = []
+        self.priorities: list[scheduler.Priority] = []
+        self.resolutions: list[models.Resolution | None] = []
+        self.in_flight: int = 0
+        self.max_in_flight: int = 0
+        self._lock = threading.Lock()
+
+    def check_authentication(self) -> None:
+        self._raise_error()
+
+    def get_locations_list(self) -> Sequence[models.Location]:
+        self._raise_error()
+        return self.locations
+
+    def get_forecast(self, location_id: int) -> list[models.ForecastDay]:
+        with self._lock:
+            self.requested.append(location_id)
+            self.priorities.append(scheduler.current_priority())
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+
+        self._raise_error(location_id)
+        if self.forecast_cache is not None:
+            self.forecast_cache.put(
+                location_id,
+                models.Resolution.THREE_HOURLY.value,
+                CachedForecast(self.forecast, self.issue_time, time.time()),
+            )
+        return self.forecast
+
+    def get_latest_issue_time(
+        self, resolution: Optional[models.Resolution] = None
+    ) -> datetime.datetime | None:
+        self.resolutions.append(resolution)
+        self._raise_error()
+        return None
+
+    def refresh_forecast(
+        self, location_id: int, resolution: Optional[models.Resolution] = None
+    ) -> list[models.ForecastDay]:
+        self.resolutions.append(resolution)
+        return self.get_forecast(location_id)
+
+    def _raise_error(self, location_id: Optional[int] = None) -> None:
+        error = self.error
+        if error is None and location_id is not None:
+            error = self.errors.get(location_id)
+        if error is not None:
+            raise error
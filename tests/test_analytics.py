@@ -0,0 +1,156 @@
+import datetime
+import json
+from pathlib import Path
+
+import pytest
+
+from weather_uk.data import models
+from weather_uk.domain import analytics, serialisers
+
+FAKE_DATA_DIR = Path(__file__).parent / "data"
+
+START = datetime.datetime(2023, 6, 1, tzinfo=datetime.timezone.utc)
+
+
+def make_series(
+    temps: list[int],
+    chances: list[int | None],
+    gusts: list[int | None],
+    uv: list[int | None],
+) -> models.ForecastSeries:
+    series = models.ForecastSeries()
+    for idx, (temp, chance, gust, uv_index) in enumerate(
+        zip(temps, chances, gusts, uv)
+    ):
+        timestamp = START + datetime.timedelta(hours=3 * idx)
+        series.append(
+            int(timestamp.timestamp()),
+            1,
+            chance,
+            temp,
+            temp,
+            "N",
+            (gust or 0) // 2,
+            gust,
+            "GO",
+            80,
+            uv_index,
+        )
+    return series
+
+
+@pytest.fixture
+def series_by_location() -> dict[int, models.ForecastSeries]:
+    json_data: dict = json.loads(
+        (FAKE_DATA_DIR / "310069-3hourly").read_text(),
+        cls=serialisers.NumbersStoredAsTextDecoder,
+    )
+    return {
+        310069: serialisers.decode_met_office_forecast_series(json_data),
+        1: make_series(
+            temps=[10, 12, 16, 14, 9, 7, 6, 8, 11, 13],
+            chances=[5, 10, 60, 10, 5, 5, 70, 5, 5, 5],
+            gusts=[10, 20, 35, 30, 35, 10, 5, 5, 5, 5],
+            uv=[0, 1, 3, 4, 1, 0, 0, 0, 0, 3],
+        ),
+        2: make_series(
+            temps=[3, 4],
+            chances=[90, 90],
+            gusts=[40, 50],
+            uv=[0, 0],
+        ),
+        3: models.ForecastSeries(),
+        3772: serialisers.decode_met_office_forecast_series(
+            serialisers.loads((FAKE_DATA_DIR / "3772-hourly").read_bytes())
+        ),
+    }
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    if request.param == "python":
+        monkeypatch.setattr(analytics, "np", None)
+    elif analytics.np is None:
+        pytest.skip("NumPy is not installed")
+    return str(request.param)
+
+
+def test_summarise_forecasts(
+    backend: str, series_by_location: dict[int, models.ForecastSeries]
+) -> None:
+    summaries = analytics.summarise_forecasts(series_by_location)
+
+    summary = summaries[1]
+    assert summary.daily_temperatures == [
+        analytics.DailyTemperature(datetime.date(2023, 6, 1), 6, 16, 10.25),
+        analytics.DailyTemperature(datetime.date(2023, 6, 2), 11, 13, 12.0),
+    ]
+    assert summary.longest_dry_window == analytics.TimeWindow(
+        START + datetime.timedelta(hours=9), START + datetime.timedelta(hours=18)
+    )
+    assert summary.peak_gust_mph == 35
+    assert summary.peak_gust_time == START + datetime.timedelta(hours=6)
+    assert summary.uv_exposure == analytics.TimeWindow(
+        START + datetime.timedelta(hours=6), START + datetime.timedelta(hours=12)
+    )
+    assert summary.first_rain == START + datetime.timedelta(hours=6)
+
+    assert summaries[2].longest_dry_window is None
+    assert summaries[2].uv_exposure is None
+    assert summaries[2].first_rain == START
+    assert summaries[3] == analytics.ForecastSummary([], None, None, None, None, None)
+    # Observations are given to one decimal place
+    assert summaries[3772].daily_temperatures == [
+        analytics.DailyTemperature(datetime.date(2023, 3, 13), 8.4, 9.8, 9.1),
+        analytics.DailyTemperature(datetime.date(2023, 3, 14), 6.6, 7.5, 7.05),
+    ]
+
+
+def test_summaries_leave_out_missing_values(backend: str) -> None:
+    series = make_series(
+        temps=[10, 8, 12, 6],
+        chances=[None, 60, None, 5],
+        gusts=[None, 20, None, None],
+        uv=[None, 4, 5, None],
+    )
+    calm = make_series(temps=[10], chances=[None], gusts=[None], uv=[None])
+
+    summaries = analytics.summarise_forecasts({1: series, 2: calm})
+
+    summary = summaries[1]
+    assert summary.peak_gust_mph == 20
+    assert summary.peak_gust_time == START + datetime.timedelta(hours=3)
+    assert summary.first_rain == START + datetime.timedelta(hours=3)
+    assert summary.uv_exposure == analytics.TimeWindow(
+        START + datetime.timedelta(hours=3), START + datetime.timedelta(hours=9)
+    )
+    assert summary.longest_dry_window == analytics.TimeWindow(
+        START + datetime.timedelta(hours=9), START + datetime.timedelta(hours=12)
+    )
+    assert summaries[2].peak_gust_mph is None
+    assert summaries[2].first_rain is None
+
+
+def test_numpy_and_python_summaries_match(
+    monkeypatch: pytest.MonkeyPatch,
+    series_by_location: dict[int, models.ForecastSeries],
+) -> None:
+    if analytics.np is None:
+        pytest.skip("NumPy is not installed")
+    summaries = analytics.summarise_forecasts(series_by_location)
+
+    monkeypatch.setattr(analytics, "np", None)
+    assert analytics.summarise_forecasts(series_by_location) == summaries
+    for location_id, series in series_by_location.items():
+        assert analytics.summarise_forecast(series) == summaries[location_id]
+
+
+def test_rank_driest(
+    backend: str, series_by_location: dict[int, models.ForecastSeries]
+) -> None:
+    ranking = analytics.rank_driest(
+        series_by_location, datetime.date(2023, 6, 1), start_hour=6, end_hour=15
+    )
+
+    assert ranking == [(1, 25.0)]
+    assert analytics.rank_driest({}, datetime.date(2023, 6, 1)) == []
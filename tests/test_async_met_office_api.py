@@ -0,0 +1,180 @@
+import asyncio
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+import httpx
+import pytest
+from datapoint_server import DataPointServer
+
+from weather_uk.data import models
+from weather_uk.domain import serialisers
+from weather_uk.domain.async_weather_api_client import AsyncMetOfficeAPIClient
+from weather_uk.domain.cache import ForecastCache
+from weather_uk.domain.resilience import BreakerState, ResiliencePolicy
+from weather_uk.domain.weather_api_client import MetOfficeAPIClient
+
+
+@pytest.fixture
+def server() -> Iterator[DataPointServer]:
+    with DataPointServer(sites=60, days=2) as server:
+        yield server
+
+
+async def no_sleep(delay: float) -> None:
+    pass
+
+
+def make_api(server: DataPointServer, **kwargs: Any) -> AsyncMetOfficeAPIClient:
+    api = AsyncMetOfficeAPIClient(
+        server.api_key,
+        resilience=ResiliencePolicy(sleep=lambda delay: None, async_sleep=no_sleep),
+        **kwargs,
+    )
+    api.BASE_URL = server.base_url
+    return api
+
+
+def decode_forecast(
+    server: DataPointServer, location_id: int
+) -> list[models.ForecastDay]:
+    return serialisers.decode_met_office_forecast(
+        serialisers.loads(server.forecast_content(location_id))
+    )
+
+
+def test_concurrent_requests_share_one_pool(server: DataPointServer) -> None:
+    site_ids = list(server.site_ids)
+
+    async def fetch_all() -> tuple[Any, ...]:
+        async with make_api(server, max_connections=2) as api:
+            return tuple(
+                await asyncio.gather(
+                    api.check_authentication(),
+                    api.get_locations_list(),
+                    *(api.get_forecast(location_id) for location_id in site_ids[:4]),
+                )
+            )
+
+    _, locations, *forecasts = asyncio.run(fetch_all())
+
+    assert [location.id for location in locations] == site_ids
+    assert forecasts == [decode_forecast(server, i) for i in site_ids[:4]]
+
+
+def test_shares_cache_and_resilience_with_sync_client(
+    server: DataPointServer,
+) -> None:
+    sync_api = MetOfficeAPIClient(
+        server.api_key,
+        forecast_cache=ForecastCache(),
+        resilience=ResiliencePolicy(sleep=lambda delay: None, async_sleep=no_sleep),
+    )
+    sync_api.BASE_URL = server.base_url
+    location_id = server.site_ids[0]
+
+    async def fetch() -> list[models.ForecastDay]:
+        async with AsyncMetOfficeAPIClient.from_client(sync_api) as api:
+            return await api.get_forecast(location_id)
+
+    forecast = asyncio.run(fetch())
+
+    assert sync_api.get_forecast(location_id) == forecast
+    assert server.requests[f"val/wxfcs/all/json/{location_id}"] == 1
+    assert sync_api.resilience.metrics.requests == 1
+
+
+def test_identical_requests_are_coalesced(server: DataPointServer) -> None:
+    server.latency = 0.05
+    location_id = server.site_ids[0]
+
+    async def fetch_twice() -> tuple[list[models.ForecastDay], ...]:
+        async with make_api(server) as api:
+            return await asyncio.gather(
+                api.get_forecast(location_id), api.get_forecast(location_id)
+            )
+
+    first, second = asyncio.run(fetch_twice())
+
+    assert first is second
+    assert server.requests[f"val/wxfcs/all/json/{location_id}"] == 1
+
+
+def test_get_forecasts(server: DataPointServer) -> None:
+    site_ids = list(server.site_ids)
+
+    async def fetch() -> tuple[dict[int, Any], dict[int, Any]]:
+        async with make_api(server, forecast_cache=ForecastCache()) as api:
+            return await api.get_forecasts(site_ids[:5]), await api.get_forecasts(
+                site_ids
+            )
+
+    few, many = asyncio.run(fetch())
+
+    assert few == {i: decode_forecast(server, i) for i in site_ids[:5]}
+    assert many == {i: decode_forecast(server, i) for i in site_ids}
+    # Beyond the first five, the rest came from the forecast for all sites
+    assert server.requests["val/wxfcs/all/json/all"] == 1
+    assert server.requests[f"val/wxfcs/all/json/{site_ids[5]}"] == 0
+
+
+def test_falls_back_to_cached_forecast_while_server_is_failing(
+    server: DataPointServer,
+) -> None:
+    location_id = server.site_ids[0]
+
+    async def fetch() -> tuple[list[models.ForecastDay], list[models.ForecastDay]]:
+        async with make_api(server, forecast_cache=ForecastCache()) as api:
+            forecast = await api.get_forecast(location_id)
+            server.error_rate = 1.0
+            return forecast, await api.refresh_forecast(location_id)
+
+    forecast, refreshed = asyncio.run(fetch())
+
+    assert refreshed == forecast
+    assert server.requests[f"val/wxfcs/all/json/{location_id}"] == 4
+
+
+def test_invalid_api_key_raises_http_status_error(server: DataPointServer) -> None:
+    api = make_api(server)
+    api.api_key = "wrong-key"
+
+    async def check() -> None:
+        async with api:
+            await api.check_authentication()
+
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        asyncio.run(check())
+    assert exc_info.value.response.status_code == 403
+    assert api.resilience.metrics.breaker_state is BreakerState.CLOSED
+
+
+def test_cache_and_decoding_are_kept_off_the_event_loop(
+    server: DataPointServer, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    threads: list[threading.Thread] = []
+    forecast_cache = ForecastCache(tmp_path / "forecasts")
+
+    def record_thread(func: Any) -> Any:
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            threads.append(threading.current_thread())
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    monkeypatch.setattr(forecast_cache, "get", record_thread(forecast_cache.get))
+    monkeypatch.setattr(forecast_cache, "put", record_thread(forecast_cache.put))
+    monkeypatch.setattr(
+        serialisers,
+        "decode_met_office_forecast",
+        record_thread(serialisers.decode_met_office_forecast),
+    )
+
+    async def fetch() -> None:
+        async with make_api(server, forecast_cache=forecast_cache) as api:
+            await api.get_forecast(server.site_ids[0])
+
+    asyncio.run(fetch())
+
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
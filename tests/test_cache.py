@@ -0,0 +1,273 @@
+import datetime
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+import requests
+
+from weather_uk.data import models
+from weather_uk.domain import serialisers
+from weather_uk.domain.cache import CachedForecast, ForecastCache, LocationsCache
+from weather_uk.domain.weather_api_client import (
+    ForecastsNotFoundError,
+    MetOfficeAPIClient,
+)
+
+FAKE_DATA_DIR = Path(__file__).parent / "data"
+
+
+class FakeSession(requests.Session):
+    def __init__(self, responses: list[requests.Response]) -> None:
+        super().__init__()
+        self.responses: list[requests.Response] = responses
+        self.sent: list[requests.PreparedRequest] = []
+
+    def send(
+        self, request: requests.PreparedRequest, **kwargs: object
+    ) -> requests.Response:
+        self.sent.append(request)
+        return self.responses.pop(0)
+
+
+def make_response(
+    status_code: int,
+    content: bytes = b"",
+    headers: dict[str, str] | None = None,
+) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp._content = content
+    resp._content_consumed = True
+    resp.headers.update(headers or {})
+    resp.encoding = "utf-8"
+    return resp
+
+
+@pytest.fixture
+def locations_cache(tmp_path: Path) -> LocationsCache:
+    return LocationsCache(tmp_path / "cache" / "sitelist.snapshot")
+
+
+def test_locations_cache_round_trip(locations_cache: LocationsCache) -> None:
+    locations = [
+        models.Location(14, "Carlisle Airport", "Cumbria"),
+        models.Location(3002, "Baltasound", "Shetland Islands"),
+        models.Location(3005, "Lerwick (S. Screen)", "Shetland Islands"),
+        models.Location(99999, "Nowhere", None),
+    ]
+    locations_cache.save(locations, etag='"abc"', last_modified=None)
+
+    cached = locations_cache.load()
+
+    assert cached is not None
+    assert cached.locations == locations
+    assert cached.etag == '"abc"'
+    assert cached.last_modified is None
+
+
+def test_locations_cache_miss_if_corrupt(locations_cache: LocationsCache) -> None:
+    assert locations_cache.load() is None
+
+    locations_cache.save([models.Location(14, "Carlisle Airport", "Cumbria")])
+    locations_cache.filepath.write_bytes(b"WXSL\x01")
+    assert locations_cache.load() is None
+
+
+def test_get_locations_list_served_from_fresh_cache(
+    locations_cache: LocationsCache,
+) -> None:
+    sitelist = (FAKE_DATA_DIR / "sitelist").read_bytes()
+    session = FakeSession([make_response(200, sitelist, {"ETag": '"v1"'})])
+    api = MetOfficeAPIClient("fake-key", locations_cache=locations_cache)
+    api._session = session
+
+    first = api.get_locations_list()
+    second = api.get_locations_list()
+
+    assert len(session.sent) == 1
+    assert second == first
+    assert len(second) == 10
+
+
+def test_get_locations_list_revalidates_stale_cache(
+    locations_cache: LocationsCache,
+) -> None:
+    sitelist = (FAKE_DATA_DIR / "sitelist").read_bytes()
+    session = FakeSession(
+        [
+            make_response(
+                200,
+                sitelist,
+                {"ETag": '"v1"', "Last-Modified": "Mon, 13 Mar 2023 10:00:00 GMT"},
+            ),
+            make_response(304),
+        ]
+    )
+    locations_cache.ttl = 0
+    api = MetOfficeAPIClient("fake-key", locations_cache=locations_cache)
+    api._session = session
+
+    first = api.get_locations_list()
+    second = api.get_locations_list()
+
+    revalidation = session.sent[1]
+    assert revalidation.headers["If-None-Match"] == '"v1"'
+    assert revalidation.headers["If-Modified-Since"] == (
+        "Mon, 13 Mar 2023 10:00:00 GMT"
+    )
+    assert second == first
+
+
+def test_get_forecast_cached_until_next_issue(tmp_path: Path) -> None:
+    forecast_json = (FAKE_DATA_DIR / "310069-3hourly").read_bytes()
+    session = FakeSession([make_response(200, forecast_json)])
+    forecast_cache = ForecastCache(tmp_path / "forecasts")
+    api = MetOfficeAPIClient("fake-key", forecast_cache=forecast_cache)
+    api._session = session
+
+    first = api.get_forecast(310069)
+    cached = forecast_cache.get(310069, "3hourly")
+    assert cached is not None
+    assert cached.issue_time == datetime.datetime(
+        2023, 3, 13, 23, tzinfo=datetime.timezone.utc
+    )
+    assert cached.expires == datetime.datetime(
+        2023, 3, 14, 0, tzinfo=datetime.timezone.utc
+    )
+
+    # Served from memory, then from disk by a new cache
+    assert api.get_forecast(310069) == first
+    api._forecast_cache = ForecastCache(tmp_path / "forecasts")
+    assert api.get_forecast(310069) == first
+    assert len(session.sent) == 1
+
+
+def test_cached_forecast_expires_at_next_issue() -> None:
+    issue_time = datetime.datetime(2023, 3, 13, 23, tzinfo=datetime.timezone.utc)
+    cached = CachedForecast([], issue_time, fetched_at=issue_time.timestamp())
+
+    assert cached.is_fresh(now=issue_time.timestamp() + 59 * 60)
+    assert not cached.is_fresh(now=issue_time.timestamp() + 61 * 60)
+
+    # Don't keep refetching if the next forecast is published late
+    cached.fetched_at = issue_time.timestamp() + 61 * 60
+    assert cached.is_fresh(now=issue_time.timestamp() + 62 * 60)
+
+
+def test_forecast_cache_builds_forecast_only_when_read() -> None:
+    forecast_json = serialisers.loads((FAKE_DATA_DIR / "310069-3hourly").read_bytes())
+    forecast = serialisers.decode_met_office_forecast(forecast_json)
+    issue_time = serialisers.decode_met_office_issue_time(forecast_json)
+    forecast_cache = ForecastCache()
+    forecast_cache.put(310069, "3hourly", CachedForecast(forecast, issue_time, 0))
+
+    cached = forecast_cache.get(310069, "3hourly")
+    assert cached is not None
+    assert cached.expires > issue_time
+    assert cached._forecast is None
+
+    assert cached.forecast == forecast
+    assert cached.forecast is cached.forecast
+
+
+def test_forecast_cache_evicts_least_recently_used() -> None:
+    forecast_cache = ForecastCache(max_entries=2)
+    issue_time = datetime.datetime(2023, 3, 13, 23, tzinfo=datetime.timezone.utc)
+    for location_id in (1, 2, 3):
+        forecast_cache.put(location_id, "3hourly", CachedForecast([], issue_time, 0))
+
+    assert forecast_cache.get(1, "3hourly") is None
+    assert forecast_cache.get(3, "3hourly") is not None
+
+
+def test_forecast_cache_prunes_old_files(tmp_path: Path) -> None:
+    content = (FAKE_DATA_DIR / "310069-3hourly").read_bytes()
+    issue_time = serialisers.decode_met_office_issue_time(serialisers.loads(content))
+    now = 1_685_620_800.0  # 2023-06-01 12:00 UTC
+    forecast_cache = ForecastCache(tmp_path, max_age=24 * 60 * 60)
+    for location_id, fetched_at in ((1, now - 25 * 60 * 60), (2, now - 60)):
+        forecast_cache.put(
+            location_id, "3hourly", CachedForecast([], issue_time, fetched_at), content
+        )
+    (tmp_path / "3-3hourly.json.tmp").write_bytes(content[:100])
+    os.utime(tmp_path / "3-3hourly.json.tmp", (now - 25 * 60 * 60,) * 2)
+
+    forecast_cache.prune(now)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["2-3hourly.json"]
+
+
+def test_forecast_cache_prunes_oldest_files_over_size_limit(tmp_path: Path) -> None:
+    content = (FAKE_DATA_DIR / "310069-3hourly").read_bytes()
+    issue_time = serialisers.decode_met_office_issue_time(serialisers.loads(content))
+    now = time.time()
+    forecast_cache = ForecastCache(tmp_path, max_disk_bytes=4 * len(content))
+    for location_id in range(1, 6):
+        forecast_cache.put(
+            location_id,
+            "3hourly",
+            CachedForecast([], issue_time, now - 60 + location_id),
+            content,
+        )
+
+    # Making room for the fifth pruned to 3/4 of the limit, leaving the newest
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "3-3hourly.json",
+        "4-3hourly.json",
+        "5-3hourly.json",
+    ]
+    assert ForecastCache(tmp_path).get(5, "3hourly") is not None
+    assert ForecastCache(tmp_path).get(1, "3hourly") is None
+
+
+def test_get_forecasts_uses_cache_then_bulk_download() -> None:
+    forecast_json = (FAKE_DATA_DIR / "310069-3hourly").read_bytes()
+    dv = json.loads(forecast_json)["SiteRep"]["DV"]
+    sites = [dict(dv["Location"], i=str(location_id)) for location_id in (1, 2, 3)]
+    all_sites = json.dumps({"SiteRep": {"DV": dict(dv, Location=sites)}}).encode()
+    session = FakeSession(
+        [make_response(200, forecast_json), make_response(200, all_sites)]
+    )
+    api = MetOfficeAPIClient("fake-key", forecast_cache=ForecastCache())
+    api._session = session
+    api.BULK_FORECASTS_THRESHOLD = 1
+
+    expected = api.get_forecast(310069)
+    forecasts = api.get_forecasts([310069, 1, 2, 1])
+
+    assert len(session.sent) == 2
+    assert session.sent[1].url == (
+        "http://datapoint.metoffice.gov.uk/public/data/val/wxfcs/all/json/all"
+        "?res=3hourly&key=fake-key"
+    )
+    assert forecasts == {310069: expected, 1: expected, 2: expected}
+
+
+def test_get_forecasts_reports_sites_missing_from_bulk_download() -> None:
+    forecast_json = (FAKE_DATA_DIR / "310069-3hourly").read_bytes()
+    dv = json.loads(forecast_json)["SiteRep"]["DV"]
+    sites = [dict(dv["Location"], i=str(location_id)) for location_id in (1, 2)]
+    all_sites = json.dumps({"SiteRep": {"DV": dict(dv, Location=sites)}}).encode()
+    api = MetOfficeAPIClient("fake-key", forecast_cache=ForecastCache())
+    api._session = FakeSession([make_response(200, all_sites)])
+    api.BULK_FORECASTS_THRESHOLD = 1
+
+    with pytest.raises(ForecastsNotFoundError) as exc_info:
+        api.get_forecasts([1, 2, 3])
+
+    assert exc_info.value.location_ids == [3]
+    assert sorted(exc_info.value.forecasts) == [1, 2]
+
+
+def test_get_forecasts_in_parallel() -> None:
+    forecast_json = (FAKE_DATA_DIR / "310069-3hourly").read_bytes()
+    session = FakeSession([make_response(200, forecast_json) for _ in range(3)])
+    api = MetOfficeAPIClient("fake-key")
+    api._session = session
+
+    forecasts = api.get_forecasts([1, 2, 3])
+
+    assert sorted(forecasts) == [1, 2, 3]
+    assert len(session.sent) == 3
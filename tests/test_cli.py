@@ -0,0 +1,158 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from datapoint_server import DataPointServer
+
+from weather_uk import cli
+from weather_uk.data import models
+from weather_uk.domain import serialisers
+from weather_uk.domain.resilience import ResiliencePolicy
+from weather_uk.domain.weather_api_client import MetOfficeAPIClient
+
+
+@pytest.fixture(scope="module")
+def server() -> Iterator[DataPointServer]:
+    with DataPointServer(sites=10, days=2) as server:
+        yield server
+
+
+@pytest.fixture
+def api(server: DataPointServer) -> MetOfficeAPIClient:
+    api = MetOfficeAPIClient(
+        server.api_key, resilience=ResiliencePolicy(sleep=lambda delay: None)
+    )
+    api.BASE_URL = server.base_url
+    return api
+
+
+def decode_forecast(
+    server: DataPointServer, location_id: int, resolution: str = "3hourly"
+) -> list[models.ForecastDay]:
+    content = server.forecast_content(location_id, resolution)
+    return serialisers.decode_met_office_forecast(serialisers.loads(content))
+
+
+def test_print_forecasts_as_json(
+    api: MetOfficeAPIClient, server: DataPointServer
+) -> None:
+    location_id = server.site_ids[0]
+    forecast = decode_forecast(server, location_id)
+    out = io.StringIO()
+
+    status = cli.print_forecasts(api, [location_id], "json", out)
+
+    assert status == 0
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 1
+    site = json.loads(lines[0])
+    assert site["location_id"] == location_id
+    assert len(site["forecast"]) == sum(len(day.hours) for day in forecast)
+    first_hour = forecast[0].hours[0]
+    assert site["forecast"][0]["temp_celsius"] == first_hour.weather.temp_celsius
+    assert site["forecast"][0]["time"].startswith(forecast[0].date.isoformat())
+
+
+def test_print_forecasts_as_csv(
+    api: MetOfficeAPIClient, server: DataPointServer
+) -> None:
+    location_id = server.site_ids[0]
+    forecast = decode_forecast(server, location_id)
+    out = io.StringIO()
+
+    status = cli.print_forecasts(api, [location_id, location_id], "csv", out)
+
+    assert status == 0
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert len(rows) == 2 * sum(len(day.hours) for day in forecast)
+    assert tuple(rows[0]) == cli.FIELDS
+    assert rows[0]["weather_type"] == str(forecast[0].hours[0].weather.weather_type)
+
+
+def test_print_forecasts_reports_errors(
+    api: MetOfficeAPIClient,
+    server: DataPointServer,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    location_id = server.site_ids[0]
+    out = io.StringIO()
+
+    status = cli.print_forecasts(api, [1, location_id], "table", out)
+
+    assert status == 1
+    assert "1: 404 Client Error" in capsys.readouterr().err
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("Location  Time (UTC)")
+    assert all(line.startswith(str(location_id)) for line in lines[1:])
+
+
+def test_print_daily_forecast_as_table(
+    api: MetOfficeAPIClient, server: DataPointServer
+) -> None:
+    location_id = server.site_ids[0]
+    forecast = decode_forecast(server, location_id, "daily")
+    day = forecast[0].hours[0]
+    out = io.StringIO()
+
+    status = cli.print_forecasts(
+        api, [location_id], "table", out, models.Resolution.DAILY
+    )
+
+    assert status == 0
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 1 + 2 * server.days
+    assert lines[1].startswith(
+        f"{location_id}    {forecast[0].date} 06:00  {day.weather.weather_type}"
+    )
+    # No UV index is given for the night
+    assert lines[2].split()[-1] == "-"
+
+
+def test_read_location_ids(tmp_path: Path) -> None:
+    ids_file = tmp_path / "sites.txt"
+    ids_file.write_text("310069\n\n# Shetland\n3002  # Baltasound\n")
+
+    assert list(cli.read_location_ids(ids_file)) == [310069, 3002]
+
+
+@pytest.mark.parametrize(
+    "contents, message",
+    [
+        (None, "can't read"),
+        ("310069\nBaltasound\n", "line 2: 'Baltasound' isn't a location ID"),
+    ],
+)
+def test_bad_ids_file_is_a_usage_error(
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    contents: str | None,
+    message: str,
+) -> None:
+    ids_file = tmp_path / "sites.txt"
+    if contents is not None:
+        ids_file.write_text(contents)
+
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(["forecast", "--ids-file", str(ids_file), "--api-key", "key"])
+
+    assert exit_info.value.code == 2
+    err = capsys.readouterr().err
+    assert err.startswith("usage:")
+    assert message in err
+
+
+def test_forecast_command_does_not_import_textual() -> None:
+    code = (
+        "import sys; from weather_uk import cli; "
+        "cli.build_parser().parse_args(['forecast', '--id', '1']); "
+        "assert not any(m.startswith('textual') for m in sys.modules)"
+    )
+    env = {**os.environ, "PYTHONPATH": str(Path(cli.__file__).parents[1])}
+
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
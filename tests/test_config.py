@@ -26,3 +26,36 @@ def test_update_config(fake_config_filepath: Path) -> None:
     api_key = "01234567-89ab-cdef-0123-456789abcdef"
     new_config = config.update_config(api_key, fake_config_filepath)
     assert new_config.api_key == api_key
+
+
+def test_toggle_favourite(fake_config_filepath: Path) -> None:
+    config.load_config(fake_config_filepath)
+
+    assert config.toggle_favourite(310069, fake_config_filepath).favourites == [310069]
+    assert config.toggle_favourite(14, fake_config_filepath).favourites == [
+        310069,
+        14,
+    ]
+    assert config.toggle_favourite(310069, fake_config_filepath).favourites == [14]
+
+
+def test_add_recent_location(fake_config_filepath: Path) -> None:
+    config.load_config(fake_config_filepath)
+    config.update_config("abc", fake_config_filepath)
+
+    for location_id in range(config.MAX_RECENT_LOCATIONS + 2):
+        config.add_recent_location(location_id, fake_config_filepath)
+    user_config = config.add_recent_location(5, fake_config_filepath)
+
+    assert user_config.api_key == "abc"
+    assert user_config.recent_locations == [5, 11, 10, 9, 8, 7, 6, 4, 3, 2]
+
+
+def test_load_theme(fake_config_filepath: Path) -> None:
+    config.load_config(fake_config_filepath)
+    with open(fake_config_filepath, "a") as configfile:
+        configfile.write("\n[theme]\nuv_extreme = bold white on magenta\n")
+
+    user_config = config.toggle_favourite(310069, fake_config_filepath)
+
+    assert user_config.theme == {"uv_extreme": "bold white on magenta"}
@@ -0,0 +1,186 @@
+import asyncio
+import datetime
+import inspect
+from pathlib import Path
+
+import pytest
+import requests
+from fake_weather_api import FakeWeatherAPIClient
+from rich.text import Text
+from textual import events
+from textual.app import App
+from textual.widgets import DataTable
+
+from weather_uk import config
+from weather_uk.app.app import WeatherUkApp
+from weather_uk.app.screens.dashboard import DashboardScreen, current_period
+from weather_uk.data import models
+from weather_uk.domain import serialisers
+from weather_uk.domain.cache import ForecastCache, LocationsCache
+from weather_uk.domain.forecast import iter_forecasts
+
+FAKE_DATA_DIR = Path(__file__).parent / "data"
+
+
+def load_forecast() -> tuple[list[models.ForecastDay], datetime.datetime]:
+    json_data = serialisers.loads((FAKE_DATA_DIR / "310069-3hourly").read_bytes())
+    return (
+        serialisers.decode_met_office_forecast(json_data),
+        serialisers.decode_met_office_issue_time(json_data),
+    )
+
+
+@pytest.fixture
+def weather_api(weather_api: FakeWeatherAPIClient) -> FakeWeatherAPIClient:
+    weather_api.forecast, weather_api.issue_time = load_forecast()
+    weather_api.errors[1] = requests.exceptions.HTTPError("404 Client Error: Not Found")
+    return weather_api
+
+
+class DashboardApp(App):
+    def __init__(
+        self,
+        favourites: list[int],
+        weather_api: FakeWeatherAPIClient,
+        forecast_cache: ForecastCache,
+        tmp_path: Path,
+    ) -> None:
+        super().__init__()
+        self._user_config = config.UserConfig("0123", favourites=favourites)
+        self._forecast_cache = forecast_cache
+        self._locations_cache = LocationsCache(tmp_path / "sitelist.snapshot")
+        self._weather_api = weather_api
+
+    def on_mount(self) -> None:
+        self.push_screen(DashboardScreen())
+
+
+class NavigationApp(WeatherUkApp):
+    # Relative stylesheets are found next to the subclass
+    CSS_PATH = str(Path(inspect.getfile(WeatherUkApp)).with_name("weather-uk.css"))
+
+    def __init__(
+        self,
+        first_screen: str,
+        weather_api: FakeWeatherAPIClient,
+        forecast_cache: ForecastCache,
+        tmp_path: Path,
+    ) -> None:
+        super().__init__()
+        self._first_screen: str = first_screen
+        self._user_config = config.UserConfig("0123", favourites=[310069])
+        self._forecast_cache = forecast_cache
+        self._locations_cache = LocationsCache(tmp_path / "sitelist.snapshot")
+        self._weather_api = weather_api
+        self._location_id = 310069
+
+    def _on_mount(self, event: events.Mount) -> None:
+        # Don't let the app replace the fakes with real clients
+        event.prevent_default()
+        self.push_screen(self._first_screen)
+
+
+@pytest.mark.parametrize("first_screen", ["forecast", "dashboard"])
+def test_dashboard_and_forecast_are_only_opened_once(
+    first_screen: str,
+    weather_api: FakeWeatherAPIClient,
+    forecast_cache: ForecastCache,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def navigate() -> list[list[str]]:
+        app = NavigationApp(first_screen, weather_api, forecast_cache, tmp_path)
+        monkeypatch.setattr(
+            config, "add_recent_location", lambda location_id: app._user_config
+        )
+        stacks = []
+        async with app.run_test(size=(160, 30)) as pilot:
+            for _ in range(2):
+                await pilot.pause()
+                await pilot.press("f2")
+                await pilot.pause()
+                stacks.append([type(screen).__name__ for screen in app.screen_stack])
+                # As if a row of the dashboard was selected
+                app.show_forecast(310069)
+                await pilot.pause()
+                stacks.append([type(screen).__name__ for screen in app.screen_stack])
+            await app.workers.wait_for_complete()
+        return stacks
+
+    stacks = asyncio.run(navigate())
+
+    assert all(len(stack) == len(set(stack)) for stack in stacks)
+    assert [stack[-1] for stack in stacks] == [
+        "DashboardScreen",
+        "ForecastScreen",
+        "DashboardScreen",
+        "ForecastScreen",
+    ]
+
+
+def test_dashboard_updates_each_row(
+    weather_api: FakeWeatherAPIClient, forecast_cache: ForecastCache, tmp_path: Path
+) -> None:
+    async def show_dashboard() -> tuple[list[object], list[object], bool]:
+        app = DashboardApp([310069, 1], weather_api, forecast_cache, tmp_path)
+        async with app.run_test(size=(160, 30)) as pilot:
+            await pilot.pause()
+            screen = app.screen
+            assert isinstance(screen, DashboardScreen)
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            table = screen.query_one(DataTable)
+            return (
+                table.get_row("310069"),
+                table.get_row("1"),
+                screen._refresh_timer is not None,
+            )
+
+    loaded, failed, refresh_scheduled = asyncio.run(show_dashboard())
+
+    forecast, _ = load_forecast()
+    _, weather = current_period(
+        forecast, datetime.datetime.now(datetime.timezone.utc)
+    ) or (None, None)
+    assert weather is not None
+    assert loaded[0] == "310069"
+    assert isinstance(loaded[2], Text) and loaded[2].plain == str(weather.weather_type)
+    assert isinstance(failed[-1], Text) and failed[-1].plain.startswith("Failed")
+    assert refresh_scheduled
+
+
+def test_current_period() -> None:
+    forecast, _ = load_forecast()
+    first_day = forecast[0]
+    start = datetime.datetime.combine(
+        first_day.date, first_day.hours[0].time, tzinfo=datetime.timezone.utc
+    )
+
+    assert current_period(forecast, start - datetime.timedelta(days=1)) == (
+        start,
+        first_day.hours[0].weather,
+    )
+    assert current_period(forecast, start + datetime.timedelta(minutes=1)) == (
+        start,
+        first_day.hours[0].weather,
+    )
+    assert current_period(forecast, start + datetime.timedelta(days=30)) == (
+        datetime.datetime.combine(
+            forecast[-1].date, forecast[-1].hours[-1].time, tzinfo=datetime.timezone.utc
+        ),
+        forecast[-1].hours[-1].weather,
+    )
+    assert current_period([], start) is None
+
+
+def test_iter_forecasts_bounds_parallel_requests(
+    weather_api: FakeWeatherAPIClient,
+) -> None:
+    weather_api.delay = 0.02
+
+    results = dict(iter_forecasts(weather_api, [1, 2, 3, 4, 5, 6, 2], max_workers=2))
+
+    assert sorted(results) == [1, 2, 3, 4, 5, 6]
+    assert isinstance(results[1], requests.exceptions.HTTPError)
+    assert isinstance(results[2], list)
+    assert weather_api.max_in_flight == 2
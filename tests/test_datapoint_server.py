@@ -0,0 +1,133 @@
+import datetime
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+import requests
+from datapoint_server import DataPointServer
+
+from weather_uk.data import models
+from weather_uk.domain.cache import ForecastCache, LocationsCache
+from weather_uk.domain.refresh import ForecastRefresher
+from weather_uk.domain.resilience import ResiliencePolicy, RetryPolicy
+from weather_uk.domain.weather_api_client import MetOfficeAPIClient
+
+
+@pytest.fixture
+def server() -> Iterator[DataPointServer]:
+    with DataPointServer(sites=200) as server:
+        yield server
+
+
+def make_api(server: DataPointServer, **kwargs: object) -> MetOfficeAPIClient:
+    api = MetOfficeAPIClient(
+        server.api_key,
+        resilience=ResiliencePolicy(sleep=lambda delay: None),
+        **kwargs,  # type: ignore[arg-type]
+    )
+    api.BASE_URL = server.base_url
+    return api
+
+
+def test_get_locations_list_revalidates_with_etag(
+    server: DataPointServer, tmp_path: Path
+) -> None:
+    locations_cache = LocationsCache(tmp_path / "sitelist.snapshot", ttl=0)
+    api = make_api(server, locations_cache=locations_cache)
+
+    locations = api.get_locations_list()
+    assert [location.id for location in locations] == list(server.site_ids)
+
+    # The cache has expired, but the sitelist hasn't changed
+    assert api.get_locations_list() == locations
+    assert server.requests["val/wxfcs/all/json/sitelist"] == 2
+
+
+def test_get_and_stream_locations_list(server: DataPointServer) -> None:
+    api = make_api(server)
+
+    streamed = list(api.iter_locations_list())
+
+    assert api.get_locations_list() == streamed
+    assert [location.id for location in streamed] == list(server.site_ids)
+
+
+def test_get_forecasts(server: DataPointServer) -> None:
+    api = make_api(server, forecast_cache=ForecastCache())
+    site_ids = list(server.site_ids)
+
+    few = api.get_forecasts(site_ids[:5])
+    many = api.get_forecasts(site_ids)
+
+    assert len(many) == len(site_ids)
+    assert all(many[location_id] == few[location_id] for location_id in few)
+    assert len(many[site_ids[0]]) == server.days
+    assert server.requests["val/wxfcs/all/json/all"] == 1
+
+
+def test_get_forecast_at_other_resolutions(server: DataPointServer) -> None:
+    api = make_api(server, forecast_cache=ForecastCache())
+    location_id = server.site_ids[0]
+
+    three_hourly = api.get_forecast(location_id)
+    daily = api.get_forecast(location_id, models.Resolution.DAILY)
+    observations = api.get_observations(location_id)
+
+    assert len(three_hourly[0].hours) == 8
+    assert [len(day.hours) for day in daily] == [2] * server.days
+    assert sum(len(day.hours) for day in observations) == 24
+    assert observations[-1].hours[-1].weather.precipitation_probability is None
+    # Each resolution is cached separately
+    assert api.get_forecast(location_id, models.Resolution.DAILY) == daily
+    assert server.requests[f"val/wxfcs/all/json/{location_id}"] == 2
+    assert server.requests[f"val/wxobs/all/json/{location_id}"] == 1
+
+
+def test_request_retries_server_errors(server: DataPointServer) -> None:
+    server.error_rate = 0.5
+    api = make_api(server)
+    api.resilience.retry = RetryPolicy(max_attempts=20)
+
+    for location_id in list(server.site_ids)[:10]:
+        assert api.get_forecast(location_id)
+
+    assert api.resilience.metrics.retries > 0
+
+
+def test_request_errors(server: DataPointServer) -> None:
+    server.rate_limit = 1
+    api = make_api(server)
+    api.check_authentication()
+
+    with pytest.raises(requests.exceptions.HTTPError) as err_info:
+        api.check_authentication()
+    assert err_info.value.response is not None
+    assert err_info.value.response.status_code == 429
+
+    api.api_key = "wrong"
+    with pytest.raises(requests.exceptions.HTTPError) as err_info:
+        api.check_authentication()
+    assert err_info.value.response is not None
+    assert err_info.value.response.status_code == 403
+
+
+def test_forecast_refresher_fetches_each_issue_once(server: DataPointServer) -> None:
+    forecast_cache = ForecastCache()
+    api = make_api(server, forecast_cache=forecast_cache)
+    location_id = server.site_ids[0]
+    first = api.get_forecast(location_id)
+    refresher = ForecastRefresher(api, forecast_cache, location_id)
+    resource = f"val/wxfcs/all/json/{location_id}"
+
+    assert refresher.issue_time == server.issue_time
+    assert refresher.check() is None
+    assert server.requests["val/wxfcs/all/json/capabilities"] == 1
+    assert server.requests[resource] == 1
+
+    server.issue_time += datetime.timedelta(hours=1)
+    server.seed += 1
+    forecast = refresher.check()
+    assert forecast is not None and forecast != first
+    assert refresher.issue_time == server.issue_time
+    assert refresher.check() is None
+    assert server.requests[resource] == 2
@@ -0,0 +1,121 @@
+import asyncio
+import dataclasses
+from pathlib import Path
+
+import pytest
+from textual.app import App, ComposeResult
+
+from weather_uk.app.widgets.forecast_grid import ForecastGrid
+from weather_uk.data import models
+from weather_uk.domain import instrumentation, serialisers
+from weather_uk.domain.instrumentation import Recorder
+
+FAKE_DATA_DIR = Path(__file__).parent / "data"
+
+
+@pytest.fixture
+def forecast() -> list[models.ForecastDay]:
+    content = (FAKE_DATA_DIR / "310069-3hourly").read_bytes()
+    return serialisers.decode_met_office_forecast(serialisers.loads(content))
+
+
+class ForecastGridApp(App):
+    def compose(self) -> ComposeResult:
+        yield ForecastGrid()
+
+
+def test_forecast_grid_only_formats_visible_cells(
+    forecast: list[models.ForecastDay],
+) -> None:
+    async def show_forecast() -> tuple[str, int, int]:
+        app = ForecastGridApp()
+        async with app.run_test(size=(80, 20)) as pilot:
+            grid = app.query_one(ForecastGrid)
+            grid.show_forecast(forecast)
+            await pilot.pause()
+            heading = grid.render_line(0).text
+            hours = sum(len(day.hours) for day in forecast)
+            return heading, len(grid._cells), hours * len(grid.ROWS)
+
+    heading, cells_formatted, cells = asyncio.run(show_forecast())
+
+    assert forecast[0].date.strftime("%A") in heading
+    assert 0 < cells_formatted < cells
+
+
+def test_forecast_grid_scroll_to_day(forecast: list[models.ForecastDay]) -> None:
+    async def scroll_to_day() -> tuple[int, str, str]:
+        app = ForecastGridApp()
+        async with app.run_test(size=(80, 20)) as pilot:
+            grid = app.query_one(ForecastGrid)
+            grid.show_forecast(forecast)
+            await pilot.pause()
+            grid.scroll_to_day(2)
+            await pilot.pause()
+            return (
+                int(grid.scroll_offset.x) // grid.column_width,
+                grid.render_line(0).text,
+                grid.render_line(1).text,
+            )
+
+    first_column, day_heading, time_heading = asyncio.run(scroll_to_day())
+
+    expected_column = sum(len(day.hours) for day in forecast[:2])
+    assert first_column == expected_column
+    assert forecast[2].date.strftime("%A") in day_heading
+    assert time_heading.split()[0] == forecast[2].hours[0].time.strftime("%H:%M")
+
+
+def test_forecast_grid_update_keeps_unchanged_cells(
+    forecast: list[models.ForecastDay],
+) -> None:
+    async def update_forecast() -> tuple[int, set[int], int, str]:
+        app = ForecastGridApp()
+        async with app.run_test(size=(80, 20)) as pilot:
+            grid = app.query_one(ForecastGrid)
+            grid.show_forecast(forecast)
+            grid.scroll_to_day(1)
+            await pilot.pause()
+
+            # A day later, the first day has gone and one period has changed
+            day = forecast[1]
+            hour = dataclasses.replace(
+                day.hours[0],
+                weather=dataclasses.replace(day.hours[0].weather, temp_celsius=40),
+            )
+            newer = [dataclasses.replace(day, hours=[hour] + day.hours[1:])]
+            changed = grid.update_forecast(newer + forecast[2:])
+            return (
+                changed,
+                {column for _, column in grid._cells},
+                int(grid.scroll_offset.x) // grid.column_width,
+                grid.render_line(1).text,
+            )
+
+    changed, cached_columns, first_column, time_heading = asyncio.run(update_forecast())
+
+    assert changed == 1
+    # Only the changed period has to be formatted again
+    assert 0 not in cached_columns and 1 in cached_columns
+    assert first_column == 0
+    assert time_heading.split()[0] == forecast[1].hours[0].time.strftime("%H:%M")
+
+
+def test_forecast_grid_spans(
+    forecast: list[models.ForecastDay], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    recorder = Recorder()
+    monkeypatch.setattr(instrumentation, "recorder", recorder)
+
+    async def show_forecast() -> None:
+        app = ForecastGridApp()
+        async with app.run_test(size=(80, 20)) as pilot:
+            app.query_one(ForecastGrid).show_forecast(forecast)
+            await pilot.pause()
+
+    asyncio.run(show_forecast())
+
+    names = [span.name for span in recorder.spans]
+    assert names.count("layout.forecast_grid") == 1
+    # The cells are only rendered once the grid is painted
+    assert "render.forecast_grid" in names[names.index("layout.forecast_grid") :]
@@ -0,0 +1,93 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+import requests
+from fake_weather_api import FakeWeatherAPIClient
+from textual.app import App
+from textual.screen import ModalScreen
+
+from weather_uk import config
+from weather_uk.app.screens.forecast import ForecastScreen
+from weather_uk.app.widgets.forecast_grid import ForecastGrid
+from weather_uk.domain import serialisers
+from weather_uk.domain.cache import ForecastCache
+from weather_uk.domain.resilience import CircuitOpenError
+from weather_uk.domain.scheduler import QuotaExceededError
+
+FAKE_DATA_DIR = Path(__file__).parent / "data"
+
+
+class ForecastApp(App):
+    def __init__(self, weather_api: FakeWeatherAPIClient) -> None:
+        super().__init__()
+        self._user_config = config.UserConfig("0123")
+        self._forecast_cache = ForecastCache()
+        self._weather_api = weather_api
+        self._location_id = 310069
+
+    def on_mount(self) -> None:
+        self.push_screen(ForecastScreen())
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        requests.exceptions.ConnectionError("offline"),
+        requests.exceptions.HTTPError("404 Client Error: Not Found"),
+        QuotaExceededError("Daily limit of 5000 requests reached"),
+        CircuitOpenError("Requests are failing, try again later"),
+    ],
+)
+def test_forecast_screen_shows_errors(
+    error: Exception, weather_api: FakeWeatherAPIClient
+) -> None:
+    weather_api.error = error
+
+    async def load_forecast() -> tuple[bool, bool, list[str]]:
+        app = ForecastApp(weather_api)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            return (
+                app.is_running,
+                app.screen.query_one(ForecastGrid).loading,
+                [notification.message for notification in app._notifications],
+            )
+
+    is_running, loading, notifications = asyncio.run(load_forecast())
+
+    assert is_running
+    assert not loading
+    assert notifications == [str(error)]
+
+
+def test_forecast_is_only_reloaded_for_another_location(
+    weather_api: FakeWeatherAPIClient,
+) -> None:
+    json_data = serialisers.loads((FAKE_DATA_DIR / "310069-3hourly").read_bytes())
+    weather_api.forecast = serialisers.decode_met_office_forecast(json_data)
+
+    async def open_overlays() -> tuple[list[int], bool]:
+        app = ForecastApp(weather_api)
+        async with app.run_test() as pilot:
+            for location_id in [310069, 310069, 14]:
+                await app.workers.wait_for_complete()
+                await pilot.pause()
+                app._location_id = location_id
+                # Suspends and then resumes the forecast screen
+                await app.push_screen(ModalScreen())
+                await pilot.pause()
+                app.pop_screen()
+                await pilot.pause()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            return weather_api.requested, bool(
+                app.screen.query_one(ForecastGrid).loading
+            )
+
+    requested, loading = asyncio.run(open_overlays())
+
+    assert requested == [310069, 14]
+    assert not loading
@@ -0,0 +1,115 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from datapoint_server import ISSUE_TIME, make_location_forecast, make_site_rep
+
+from weather_uk.data import models
+from weather_uk.domain import serialisers
+
+FAKE_DATA_DIR = Path(__file__).parent / "data"
+
+
+@pytest.fixture
+def forecast_json() -> dict:
+    json_data: dict = json.loads(
+        (FAKE_DATA_DIR / "310069-3hourly").read_text(),
+        cls=serialisers.NumbersStoredAsTextDecoder,
+    )
+    return json_data
+
+
+def test_forecast_series_round_trip(forecast_json: dict) -> None:
+    forecast = serialisers.decode_met_office_forecast(forecast_json)
+
+    series = models.ForecastSeries.from_forecast_days(forecast)
+
+    assert len(series) == sum(len(day.hours) for day in forecast)
+    assert series.to_forecast_days() == forecast
+
+
+def test_decode_forecast_series(forecast_json: dict) -> None:
+    forecast = serialisers.decode_met_office_forecast(forecast_json)
+
+    series = serialisers.decode_met_office_forecast_series(forecast_json)
+
+    assert series.to_forecast_days() == forecast
+    # Stored in tenths of a degree
+    assert list(series.temp_celsius) == [
+        hour.weather.temp_celsius * 10 for day in forecast for hour in day.hours
+    ]
+
+
+@pytest.mark.parametrize("filename", ["310069-daily", "3772-hourly"])
+def test_decode_forecast_series_at_other_resolutions(filename: str) -> None:
+    json_data = serialisers.loads((FAKE_DATA_DIR / filename).read_bytes())
+    forecast = serialisers.decode_met_office_forecast(json_data)
+
+    series = serialisers.decode_met_office_forecast_series(json_data)
+
+    assert series.to_forecast_days() == forecast
+    assert models.ForecastSeries.from_forecast_days(forecast).to_forecast_days() == (
+        forecast
+    )
+
+
+def test_forecast_row_missing_values() -> None:
+    json_data = serialisers.loads((FAKE_DATA_DIR / "3772-hourly").read_bytes())
+    series = serialisers.decode_met_office_forecast_series(json_data)
+
+    row = series[1]
+    assert row.precipitation_probability is None
+    assert row.feels_like_temp_celsius is None
+    assert row.wind_gust_mph is None
+    assert row.max_uv_index is None
+    assert series[0].wind_gust_mph == 31
+
+    row = series[2]
+    assert row.weather_type is None
+    assert row.wind_direction is None
+    assert row.wind_speed_mph is None
+    assert row.visibility is None
+
+
+def test_forecast_row(forecast_json: dict) -> None:
+    forecast = serialisers.decode_met_office_forecast(forecast_json)
+    series = serialisers.decode_met_office_forecast_series(forecast_json)
+
+    first_day = forecast[0]
+    first_hour = first_day.hours[0]
+    row = series[0]
+    assert row.time.date() == first_day.date
+    assert row.time.time() == first_hour.time
+    assert row.weather == first_hour.weather
+    assert row.wind_direction == first_hour.weather.wind_direction
+    assert series[-1].weather == forecast[-1].hours[-1].weather
+    with pytest.raises(IndexError):
+        series[len(series)]
+
+
+def deep_size(obj: object, seen: set[int]) -> int:
+    """The size of an object and everything it refers to, apart from enum
+    members, which are shared.
+    """
+    if id(obj) in seen or isinstance(obj, models.WeatherType):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, list):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_size(getattr(obj, slot), seen) for slot in obj.__slots__)
+    return size
+
+
+@pytest.mark.parametrize("periods_per_day, min_ratio", [(8, 7), (24, 10)])
+def test_forecast_series_memory(periods_per_day: int, min_ratio: int) -> None:
+    location = make_location_forecast(310069, periods_per_day=periods_per_day)
+    content = json.dumps(make_site_rep(ISSUE_TIME, location)).encode()
+    forecast = serialisers.decode_met_office_forecast(serialisers.loads(content))
+    series = models.ForecastSeries.from_forecast_days(forecast)
+
+    # Each array has a fixed overhead, which is a larger share of a forecast
+    # with fewer periods
+    assert deep_size(forecast, set()) >= min_ratio * deep_size(series, set())
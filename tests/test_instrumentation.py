@@ -0,0 +1,154 @@
+import datetime
+import json
+from pathlib import Path
+
+import pytest
+
+from weather_uk.domain import instrumentation, serialisers
+from weather_uk.domain.cache import CachedForecast, ForecastCache
+from weather_uk.domain.instrumentation import Recorder
+
+FAKE_DATA_DIR = Path(__file__).parent / "data"
+
+
+def test_span_records_stats() -> None:
+    recorder = Recorder()
+
+    for _ in range(3):
+        with recorder.span("decode"):
+            pass
+
+    [stats] = recorder.stats()
+    assert stats.name == "decode"
+    assert stats.count == 3
+    assert stats.max_ns >= stats.last_ns
+    assert stats.total_ns >= stats.max_ns
+    assert len(recorder.spans) == 3
+
+
+def test_nested_spans_share_a_trace() -> None:
+    recorder = Recorder()
+
+    with recorder.span("request") as parent:
+        with recorder.span("decode") as child:
+            pass
+    with recorder.span("render") as other:
+        pass
+
+    assert parent is not None and child is not None and other is not None
+    assert child.trace_id == parent.trace_id
+    assert child.parent_id == parent.span_id
+    assert parent.parent_id is None
+    assert other.trace_id != parent.trace_id
+
+
+def test_span_records_error() -> None:
+    recorder = Recorder()
+
+    with pytest.raises(ValueError):
+        with recorder.span("decode"):
+            raise ValueError("bad JSON")
+
+    [span] = recorder.spans
+    assert span.error == "ValueError: bad JSON"
+    assert recorder.stats()[0].errors == 1
+
+
+def test_timed_decorator(monkeypatch: pytest.MonkeyPatch) -> None:
+    recorder = Recorder()
+    monkeypatch.setattr(instrumentation, "recorder", recorder)
+
+    @instrumentation.timed("add")
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    assert add(1, 2) == 3
+    assert [span.name for span in recorder.spans] == ["add"]
+
+
+def test_disabled_recorder_records_nothing() -> None:
+    recorder = Recorder()
+    recorder.enabled = False
+
+    with recorder.span("decode") as span:
+        pass
+    recorder.count("cache.hit")
+
+    assert span is None
+    assert recorder.spans == []
+    assert recorder.counters == {}
+
+
+def test_spans_are_bounded() -> None:
+    recorder = Recorder(max_spans=2)
+
+    for _ in range(5):
+        with recorder.span("decode"):
+            pass
+
+    assert len(recorder.spans) == 2
+    assert recorder.stats()[0].count == 5
+
+
+def test_to_otlp() -> None:
+    recorder = Recorder()
+
+    with recorder.span("datapoint.request", resource="sitelist", stream=True) as span:
+        assert span is not None
+        span.attributes["status_code"] = 200
+
+    [resource_spans] = recorder.to_otlp()["resourceSpans"]
+    [scope_spans] = resource_spans["scopeSpans"]
+    [otlp_span] = scope_spans["spans"]
+    assert len(otlp_span["traceId"]) == 32
+    assert len(otlp_span["spanId"]) == 16
+    assert otlp_span["parentSpanId"] == ""
+    assert int(otlp_span["endTimeUnixNano"]) >= int(otlp_span["startTimeUnixNano"])
+    attributes = {
+        attribute["key"]: attribute["value"] for attribute in otlp_span["attributes"]
+    }
+    assert attributes["resource"] == {"stringValue": "sitelist"}
+    assert attributes["stream"] == {"boolValue": True}
+    assert attributes["status_code"] == {"intValue": "200"}
+
+
+def test_export_traces(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    recorder = Recorder()
+    monkeypatch.setattr(instrumentation, "recorder", recorder)
+    with recorder.span("decode"):
+        pass
+    recorder.count("forecast_cache.miss")
+
+    json_filepath, otlp_filepath = instrumentation.export_traces(tmp_path)
+
+    exported = json.loads(json_filepath.read_text())
+    assert [span["name"] for span in exported["spans"]] == ["decode"]
+    assert exported["counters"] == {"forecast_cache.miss": 1}
+    assert "resourceSpans" in json.loads(otlp_filepath.read_text())
+
+
+def test_forecast_cache_counts_hits_and_misses(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    recorder = Recorder()
+    monkeypatch.setattr(instrumentation, "recorder", recorder)
+    content = (FAKE_DATA_DIR / "310069-3hourly").read_bytes()
+    json_data = serialisers.loads(content)
+    cached = CachedForecast(
+        forecast=serialisers.decode_met_office_forecast(json_data),
+        issue_time=datetime.datetime(2023, 3, 13, 23, tzinfo=datetime.timezone.utc),
+        fetched_at=0,
+    )
+    ForecastCache(tmp_path).put(310069, "3hourly", cached, content)
+
+    cache = ForecastCache(tmp_path)
+    cache.get(310069, "3hourly")
+    cache.get(310069, "3hourly")
+    cache.get(310042, "3hourly")
+
+    assert recorder.counters == {
+        "forecast_cache.disk_hit": 1,
+        "forecast_cache.memory_hit": 1,
+        "forecast_cache.miss": 1,
+    }
+    assert "decode.forecast" in {stats.name for stats in recorder.stats()}
@@ -0,0 +1,53 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+import requests
+from fake_weather_api import FakeWeatherAPIClient
+from textual.app import App, ComposeResult
+
+from weather_uk.app.widgets.locations import LocationSearch
+from weather_uk.domain.cache import LocationsCache
+from weather_uk.domain.resilience import CircuitOpenError
+from weather_uk.domain.scheduler import QuotaExceededError
+
+
+class LocationSearchApp(App):
+    def __init__(self, weather_api: FakeWeatherAPIClient, tmp_path: Path) -> None:
+        super().__init__()
+        self._weather_api = weather_api
+        self._locations_cache = LocationsCache(tmp_path / "sitelist.snapshot")
+
+    def compose(self) -> ComposeResult:
+        yield LocationSearch()
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        requests.exceptions.ConnectionError("offline"),
+        requests.exceptions.Timeout("Read timed out"),
+        QuotaExceededError("Daily limit of 5000 requests reached"),
+        CircuitOpenError("Requests are failing, try again later"),
+    ],
+)
+def test_location_search_shows_errors(
+    error: Exception, weather_api: FakeWeatherAPIClient, tmp_path: Path
+) -> None:
+    weather_api.error = error
+
+    async def load_locations() -> tuple[bool, list[str]]:
+        app = LocationSearchApp(weather_api, tmp_path)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            return (
+                app.is_running,
+                [notification.message for notification in app._notifications],
+            )
+
+    is_running, notifications = asyncio.run(load_locations())
+
+    assert is_running
+    assert notifications == [str(error)]
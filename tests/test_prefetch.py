@@ -0,0 +1,56 @@
+import pytest
+import requests
+from fake_weather_api import ISSUE_TIME, FakeWeatherAPIClient
+
+from weather_uk.domain import instrumentation, scheduler
+from weather_uk.domain.cache import ForecastCache
+from weather_uk.domain.instrumentation import Recorder
+from weather_uk.domain.prefetch import ForecastPrefetcher
+
+
+def test_prefetch_in_background_until_next_issue(
+    weather_api: FakeWeatherAPIClient, forecast_cache: ForecastCache
+) -> None:
+    prefetcher = ForecastPrefetcher(weather_api, forecast_cache)
+    now = ISSUE_TIME.timestamp() + 20 * 60
+
+    delay = prefetcher.prefetch([310069, 14, 310069], now=now)
+
+    assert weather_api.requested == [310069, 14]
+    assert weather_api.priorities == [scheduler.Priority.BACKGROUND] * 2
+    assert delay == 40 * 60
+
+
+def test_prefetch_waits_at_least_the_minimum_interval(
+    weather_api: FakeWeatherAPIClient, forecast_cache: ForecastCache
+) -> None:
+    prefetcher = ForecastPrefetcher(weather_api, forecast_cache)
+
+    # The next forecast is late
+    delay = prefetcher.prefetch([310069], now=ISSUE_TIME.timestamp() + 2 * 60 * 60)
+
+    assert delay == ForecastPrefetcher.MIN_INTERVAL
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        requests.exceptions.ConnectionError(),
+        ValueError("forecast has no dataDate before its sites"),
+        KeyError("Location"),
+    ],
+)
+def test_prefetch_retries_later_after_errors(
+    error: Exception,
+    monkeypatch: pytest.MonkeyPatch,
+    weather_api: FakeWeatherAPIClient,
+    forecast_cache: ForecastCache,
+) -> None:
+    recorder = Recorder()
+    monkeypatch.setattr(instrumentation, "recorder", recorder)
+    weather_api.error = error
+    prefetcher = ForecastPrefetcher(weather_api, forecast_cache)
+
+    assert prefetcher.prefetch([310069]) == ForecastPrefetcher.RETRY_INTERVAL
+    assert recorder.counters == {"prefetch.error": 1}
+    assert prefetcher.prefetch([]) is None
@@ -0,0 +1,44 @@
+from fake_weather_api import ISSUE_TIME, FakeWeatherAPIClient
+
+from weather_uk.data import models
+from weather_uk.domain.cache import CachedForecast, ForecastCache
+from weather_uk.domain.refresh import ForecastRefresher
+
+
+def test_refresh_when_next_forecast_is_due(
+    weather_api: FakeWeatherAPIClient, forecast_cache: ForecastCache
+) -> None:
+    forecast_cache.put(
+        310069, "3hourly", CachedForecast([], ISSUE_TIME, ISSUE_TIME.timestamp())
+    )
+    refresher = ForecastRefresher(weather_api, forecast_cache, 310069)
+
+    assert refresher.delay(now=ISSUE_TIME.timestamp() + 20 * 60) == 40 * 60
+    # The next forecast is late
+    assert (
+        refresher.delay(now=ISSUE_TIME.timestamp() + 2 * 60 * 60)
+        == ForecastRefresher.MIN_INTERVAL
+    )
+
+
+def test_refresh_retries_later_without_a_forecast(
+    weather_api: FakeWeatherAPIClient, forecast_cache: ForecastCache
+) -> None:
+    refresher = ForecastRefresher(weather_api, forecast_cache, 310069)
+
+    assert refresher.issue_time is None
+    assert refresher.delay() == ForecastRefresher.RETRY_INTERVAL
+    # Without the capabilities, the forecast is fetched to find out
+    assert refresher.check() == []
+
+
+def test_refresh_at_the_refreshers_resolution(
+    weather_api: FakeWeatherAPIClient, forecast_cache: ForecastCache
+) -> None:
+    refresher = ForecastRefresher(
+        weather_api, forecast_cache, 310069, models.Resolution.DAILY
+    )
+
+    refresher.check()
+
+    assert weather_api.resolutions == [models.Resolution.DAILY] * 2
@@ -0,0 +1,201 @@
+import asyncio
+import datetime
+import json
+from pathlib import Path
+from typing import Union
+
+import pytest
+import requests
+
+from weather_uk.domain import serialisers
+from weather_uk.domain.cache import CachedForecast, ForecastCache
+from weather_uk.domain.resilience import (
+    BreakerState,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResiliencePolicy,
+    RetryPolicy,
+)
+from weather_uk.domain.weather_api_client import MetOfficeAPIClient
+
+FAKE_DATA_DIR = Path(__file__).parent / "data"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeSession(requests.Session):
+    def __init__(self, outcomes: list[Union[requests.Response, Exception]]) -> None:
+        super().__init__()
+        self.outcomes: list[Union[requests.Response, Exception]] = outcomes
+        self.timeouts: list[object] = []
+
+    def send(
+        self, request: requests.PreparedRequest, **kwargs: object
+    ) -> requests.Response:
+        self.timeouts.append(kwargs.get("timeout"))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_response(status_code: int, content: bytes = b"") -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp._content = content
+    resp._content_consumed = True
+    return resp
+
+
+def make_api(
+    outcomes: list[Union[requests.Response, Exception]],
+    forecast_cache: ForecastCache | None = None,
+    failure_threshold: int = 5,
+) -> tuple[MetOfficeAPIClient, FakeSession, list[float]]:
+    delays: list[float] = []
+    api = MetOfficeAPIClient(
+        api_key="123-456-789",
+        forecast_cache=forecast_cache,
+        resilience=ResiliencePolicy(
+            connect_timeout=2.0,
+            read_timeout=10.0,
+            retry=RetryPolicy(max_attempts=3),
+            breaker=CircuitBreaker(failure_threshold=failure_threshold),
+            sleep=delays.append,
+        ),
+    )
+    session = FakeSession(outcomes)
+    api._session = session
+    return api, session, delays
+
+
+def test_circuit_breaker_opens_and_recovers() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state is BreakerState.OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 30
+    assert breaker.state is BreakerState.HALF_OPEN
+    assert breaker.allow_request()
+    # Only one trial request at a time
+    assert not breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state is BreakerState.OPEN
+
+    clock.now = 60
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state is BreakerState.CLOSED
+
+
+def test_retry_delay_is_capped() -> None:
+    retry = RetryPolicy(base_delay=1, max_delay=4)
+
+    assert all(0 <= retry.delay(n) <= min(4, 2**n) for n in range(10))
+
+
+def test_request_retries_transient_errors() -> None:
+    api, session, delays = make_api(
+        [
+            requests.exceptions.ConnectionError(),
+            make_response(503),
+            make_response(200, b"{}"),
+        ]
+    )
+
+    resp = api._request("txt/wxfcs/regionalforecast/json/capabilities")
+
+    assert resp.status_code == 200
+    assert session.timeouts == [(2.0, 10.0)] * 3
+    assert len(delays) == 2
+    metrics = api.resilience.metrics
+    assert (metrics.requests, metrics.retries, metrics.failures) == (3, 2, 2)
+
+
+def test_request_does_not_retry_other_errors() -> None:
+    api, session, delays = make_api([make_response(403)])
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        api.check_authentication()
+
+    assert delays == []
+    assert api.resilience.metrics.breaker_state is BreakerState.CLOSED
+
+
+def test_async_calls_share_the_breaker() -> None:
+    delays: list[float] = []
+
+    async def record_delay(delay: float) -> None:
+        delays.append(delay)
+
+    async def send() -> None:
+        raise requests.exceptions.ConnectionError("offline")
+
+    resilience = ResiliencePolicy(
+        retry=RetryPolicy(max_attempts=3),
+        breaker=CircuitBreaker(failure_threshold=3),
+        async_sleep=record_delay,
+    )
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        asyncio.run(resilience.acall(send, lambda err: True))
+    assert len(delays) == 2
+    assert resilience.metrics.breaker_state is BreakerState.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        resilience.call(lambda: None, lambda err: True)
+
+
+def test_open_breaker_falls_back_to_stale_forecast() -> None:
+    json_data: dict = json.loads(
+        (FAKE_DATA_DIR / "310069-3hourly").read_text(),
+        cls=serialisers.NumbersStoredAsTextDecoder,
+    )
+    forecast = serialisers.decode_met_office_forecast(json_data)
+    forecast_cache = ForecastCache()
+    forecast_cache.put(
+        310069,
+        MetOfficeAPIClient.FORECAST_RESOLUTION,
+        CachedForecast(
+            forecast,
+            issue_time=datetime.datetime(2023, 6, 1, tzinfo=datetime.timezone.utc),
+            fetched_at=0,
+        ),
+    )
+    api, session, _ = make_api(
+        [make_response(500), make_response(500), make_response(500)],
+        forecast_cache=forecast_cache,
+        failure_threshold=3,
+    )
+
+    # The cached forecast is out of date, but DataPoint is down
+    assert api.get_forecast(310069) == forecast
+    assert api.resilience.metrics.breaker_state is BreakerState.OPEN
+
+    assert api.get_forecast(310069) == forecast
+    assert session.outcomes == []
+    metrics = api.resilience.metrics
+    assert (metrics.short_circuited, metrics.stale_fallbacks) == (1, 2)
+
+
+def test_open_breaker_without_cached_data_fails_fast() -> None:
+    api, session, _ = make_api(
+        [make_response(502), make_response(502), make_response(502)],
+        failure_threshold=3,
+    )
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        api.get_forecast(310069)
+    with pytest.raises(CircuitOpenError):
+        api.get_forecast(310069)
@@ -0,0 +1,158 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from weather_uk.domain.scheduler import (
+    DailyUsage,
+    Priority,
+    QuotaExceededError,
+    RequestScheduler,
+    TokenBucket,
+    request_priority,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0) -> None:
+        self.now: float = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=2, period=60, clock=clock)
+
+    bucket.take()
+    bucket.take()
+    assert bucket.wait_time() == pytest.approx(30)
+
+    clock.now = 45
+    assert bucket.wait_time() == 0
+    bucket.take()
+    assert bucket.wait_time() == pytest.approx(15)
+
+
+def test_daily_usage_is_saved_until_the_next_day(tmp_path: Path) -> None:
+    usage_filepath = tmp_path / "usage.json"
+    now = FakeClock(1_685_620_800.0)  # 2023-06-01 12:00 UTC
+    usage = DailyUsage(usage_filepath, now)
+    usage.increment()
+    usage.increment()
+
+    assert DailyUsage(usage_filepath, now).count == 2
+
+    now.now += 12 * 60 * 60
+    assert DailyUsage(usage_filepath, now).count == 0
+    assert usage.count == 0
+
+
+def test_daily_usage_counts_requests_from_every_process(tmp_path: Path) -> None:
+    usage_filepath = tmp_path / "usage.json"
+    now = FakeClock(1_685_620_800.0)  # 2023-06-01 12:00 UTC
+    app_usage = DailyUsage(usage_filepath, now)
+    cli_usage = DailyUsage(usage_filepath, now)
+
+    def make_requests(usage: DailyUsage) -> None:
+        for _ in range(50):
+            usage.increment()
+
+    threads = [
+        threading.Thread(target=make_requests, args=(usage,))
+        for usage in (app_usage, cli_usage)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert app_usage.count == cli_usage.count == 100
+    assert DailyUsage(usage_filepath, now).count == 100
+
+
+def test_daily_usage_keeps_its_count_if_the_file_is_corrupt(tmp_path: Path) -> None:
+    usage_filepath = tmp_path / "usage.json"
+    now = FakeClock(1_685_620_800.0)  # 2023-06-01 12:00 UTC
+    usage = DailyUsage(usage_filepath, now)
+    usage.increment()
+    usage.increment()
+
+    usage_filepath.write_text('{"date": "2023-06-01", "requ')
+    usage.increment()
+
+    assert usage.count == 3
+    assert DailyUsage(usage_filepath, now).count == 3
+
+
+def test_scheduler_raises_when_daily_limit_reached(tmp_path: Path) -> None:
+    usage_filepath = tmp_path / "usage.json"
+    scheduler = RequestScheduler(per_day=2, usage_filepath=usage_filepath)
+    scheduler.acquire()
+    scheduler.acquire()
+
+    with pytest.raises(QuotaExceededError):
+        scheduler.acquire()
+    with pytest.raises(QuotaExceededError):
+        RequestScheduler(per_day=2, usage_filepath=usage_filepath).acquire()
+
+
+def test_scheduler_serves_interactive_requests_first() -> None:
+    # One new token every 0.2 seconds, once the burst allowance is used
+    scheduler = RequestScheduler(per_minute=300)
+    for _ in range(300):
+        scheduler.acquire()
+
+    served: list[Priority] = []
+
+    def make_request(priority: Priority) -> None:
+        with request_priority(priority):
+            scheduler.acquire()
+        served.append(priority)
+
+    background = threading.Thread(target=make_request, args=(Priority.BACKGROUND,))
+    interactive = threading.Thread(target=make_request, args=(Priority.INTERACTIVE,))
+    background.start()
+    time.sleep(0.05)
+    interactive.start()
+    background.join()
+    interactive.join()
+
+    assert served == [Priority.INTERACTIVE, Priority.BACKGROUND]
+
+
+def test_scheduler_coalesces_identical_requests() -> None:
+    scheduler = RequestScheduler()
+    started = threading.Event()
+    release = threading.Event()
+    calls: list[str] = []
+
+    def fetch() -> list[str]:
+        calls.append("fetch")
+        started.set()
+        release.wait(timeout=5)
+        return ["forecast"]
+
+    results: list[list[str]] = []
+    leader = threading.Thread(
+        target=lambda: results.append(scheduler.coalesce("key", fetch))
+    )
+    leader.start()
+    started.wait(timeout=5)
+    follower = threading.Thread(
+        target=lambda: results.append(scheduler.coalesce("key", fetch))
+    )
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert calls == ["fetch"]
+    assert results == [["forecast"], ["forecast"]]
+    assert results[0] is results[1]
+    # Once finished, the next request fetches again
+    scheduler.coalesce("key", fetch)
+    assert len(calls) == 2
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pytest
+
+from weather_uk.data import models
+from weather_uk.domain.cache import LocationsCache
+from weather_uk.domain.search import LocationIndex
+
+LOCATIONS: list[models.Location] = [
+    models.Location(1, "Newport", "Newport"),
+    models.Location(2, "Newport", "Isle of Wight"),
+    models.Location(3, "Newport Pagnell", "Milton Keynes"),
+    models.Location(4, "Manchester Airport", "Manchester"),
+    models.Location(5, "Manchester", "Manchester"),
+    models.Location(6, "Liverpool John Lennon Airport", "Merseyside"),
+    models.Location(7, "Lerwick (S. Screen)", "Shetland Islands"),
+]
+
+
+@pytest.fixture
+def index() -> LocationIndex:
+    return LocationIndex(LOCATIONS)
+
+
+def ids(locations: list[models.Location]) -> list[int]:
+    return [location.id for location in locations]
+
+
+def test_search_ranks_exact_then_prefix_matches(index: LocationIndex) -> None:
+    assert ids(index.search("manchester")) == [5, 4]
+    assert ids(index.search("newp")) == [1, 2, 3]
+
+
+def test_search_matches_start_of_any_word(index: LocationIndex) -> None:
+    assert ids(index.search("lennon")) == [6]
+    assert ids(index.search("s scr")) == [7]
+
+
+def test_search_with_region(index: LocationIndex) -> None:
+    assert ids(index.search("newport wight")) == [2]
+    assert ids(index.search("shetland")) == [7]
+
+
+def test_search_tolerates_typos(index: LocationIndex) -> None:
+    assert ids(index.search("manchestr")) == [5, 4]
+    assert ids(index.search("liverpol")) == [6]
+
+
+def test_search_limit(index: LocationIndex) -> None:
+    assert len(index.search("newport", limit=2)) == 2
+    assert index.search("  ") == []
+
+
+def test_index_persisted_in_locations_cache(tmp_path: Path) -> None:
+    locations_cache = LocationsCache(tmp_path / "sitelist.snapshot")
+    built = locations_cache.load_index(LOCATIONS)
+    assert locations_cache.index_filepath.is_file()
+
+    loaded = LocationIndex.loads(locations_cache.index_filepath.read_bytes(), LOCATIONS)
+    assert ids(loaded.search("newport wight")) == ids(built.search("newport wight"))
+
+    with pytest.raises(ValueError):
+        LocationIndex.loads(built.dumps(), LOCATIONS[:-1])
@@ -0,0 +1,261 @@
+import datetime
+import json
+from pathlib import Path
+
+import pytest
+
+from weather_uk.data import models
+from weather_uk.domain import instrumentation, serialisers
+from weather_uk.domain.instrumentation import Recorder
+
+FAKE_DATA_DIR = Path(__file__).parent / "data"
+
+
+def test_locations_snapshot_round_trip(tmp_path: Path) -> None:
+    json_data: dict = json.loads(
+        (FAKE_DATA_DIR / "sitelist").read_text(),
+        cls=serialisers.NumbersStoredAsTextDecoder,
+    )
+    locations = serialisers.decode_met_office_locations(json_data)
+    locations.append(models.Location(354160, "Ynys Môn", None))
+
+    snapshot_filepath = tmp_path / "sitelist.snapshot"
+    snapshot_filepath.write_bytes(serialisers.encode_locations_snapshot(locations))
+
+    loaded = serialisers.load_locations_snapshot(snapshot_filepath)
+    assert loaded == locations
+    assert [(loc.latitude, loc.longitude, loc.elevation) for loc in loaded] == [
+        (loc.latitude, loc.longitude, loc.elevation) for loc in locations
+    ]
+
+
+def test_locations_snapshot_builds_locations_as_read() -> None:
+    locations = [
+        models.Location(3, "Aberdeen", "gr", 57.2, -2.2, 65.0),
+        models.Location(14, "Carlisle", None),
+        models.Location(310069, "Exeter", "sw"),
+    ]
+
+    loaded = serialisers.decode_locations_snapshot(
+        serialisers.encode_locations_snapshot(locations)
+    )
+
+    assert isinstance(loaded, models.LocationTable)
+    assert len(loaded) == 3
+    assert loaded[0] == locations[0] and loaded[0].elevation == 65.0
+    assert loaded[-1] == locations[-1]
+    assert loaded[1:] == locations[1:]
+    assert loaded.name(1) == "Carlisle"
+    with pytest.raises(IndexError):
+        loaded[3]
+
+
+def test_empty_locations_snapshot_round_trip() -> None:
+    snapshot = serialisers.encode_locations_snapshot([])
+
+    assert serialisers.decode_locations_snapshot(snapshot) == []
+
+
+@pytest.mark.parametrize(
+    "snapshot",
+    [
+        b"",
+        b"JSON" + bytes(20),
+        serialisers.encode_locations_snapshot([models.Location(1, "A", "B")])[:-1],
+    ],
+)
+def test_invalid_locations_snapshot(snapshot: bytes) -> None:
+    with pytest.raises(serialisers.SnapshotError):
+        serialisers.decode_locations_snapshot(snapshot)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_schema_aware_decoding_matches_numbers_stored_as_text(
+    use_orjson: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if not use_orjson:
+        monkeypatch.setattr(serialisers, "orjson", None)
+    elif serialisers.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    sitelist = (FAKE_DATA_DIR / "sitelist").read_bytes()
+    forecast = (FAKE_DATA_DIR / "310069-3hourly").read_bytes()
+
+    assert serialisers.decode_met_office_locations(
+        serialisers.loads(sitelist)
+    ) == serialisers.decode_met_office_locations(
+        json.loads(sitelist, cls=serialisers.NumbersStoredAsTextDecoder)
+    )
+    assert serialisers.decode_met_office_forecast(
+        serialisers.loads(forecast)
+    ) == serialisers.decode_met_office_forecast(
+        json.loads(forecast, cls=serialisers.NumbersStoredAsTextDecoder)
+    )
+
+
+def test_decode_daily_forecast() -> None:
+    json_data = serialisers.loads((FAKE_DATA_DIR / "310069-daily").read_bytes())
+
+    forecast = serialisers.decode_met_office_forecast(json_data)
+
+    assert [day.date for day in forecast] == [
+        datetime.date(2023, 3, 14),
+        datetime.date(2023, 3, 15),
+    ]
+    day, night = forecast[0].hours
+    assert day.time == datetime.time(6)
+    assert day.weather == models.Weather(
+        weather_type=models.WeatherType.LIGHT_RAIN,
+        precipitation_probability=55,
+        temp_celsius=12,
+        feels_like_temp_celsius=8,
+        wind_direction="WSW",
+        wind_speed_mph=16,
+        wind_gust_mph=31,
+        visibility="GO",
+        humidity_percent=72,
+        max_uv_index=2,
+    )
+    assert night.time == datetime.time(18)
+    assert night.weather.temp_celsius == 3
+    assert night.weather.precipitation_probability == 12
+    assert night.weather.max_uv_index is None
+
+
+def test_decode_observations() -> None:
+    json_data = serialisers.loads((FAKE_DATA_DIR / "3772-hourly").read_bytes())
+
+    observations = serialisers.decode_met_office_forecast(json_data)
+
+    hours = [hour for day in observations for hour in day.hours]
+    assert [hour.time for hour in observations[1].hours] == [
+        datetime.time(0),
+        datetime.time(1),
+    ]
+    assert hours[0].time == datetime.time(22)
+    assert hours[0].weather == models.Weather(
+        weather_type=models.WeatherType.CLOUDY,
+        precipitation_probability=None,
+        temp_celsius=9.8,
+        feels_like_temp_celsius=None,
+        wind_direction="SW",
+        wind_speed_mph=17,
+        wind_gust_mph=31,
+        visibility="VG",
+        humidity_percent=71.2,
+        max_uv_index=None,
+    )
+    assert hours[1].weather.wind_gust_mph is None
+    assert [hour.weather.visibility for hour in hours] == ["VG", "GO", None, "VP"]
+    # The station didn't report the weather type, wind or visibility
+    assert hours[2].weather.weather_type is None
+    assert hours[2].weather.wind_direction is None
+    assert hours[2].weather.wind_speed_mph is None
+    # Observations keep their decimal place
+    assert hours[2].weather.temp_celsius == 7.5
+    assert serialisers.decode_met_office_issue_time(json_data) == datetime.datetime(
+        2023, 3, 14, 1, tzinfo=datetime.timezone.utc
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1024 * 1024])
+def test_iter_met_office_locations_from_chunks(chunk_size: int) -> None:
+    sitelist = (FAKE_DATA_DIR / "sitelist").read_bytes()
+    chunks = [sitelist[i : i + chunk_size] for i in range(0, len(sitelist), chunk_size)]
+
+    actual = list(serialisers.iter_met_office_locations(chunks))
+
+    assert actual == serialisers.decode_met_office_locations(
+        serialisers.loads(sitelist)
+    )
+
+
+def test_iter_json_array_items_skips_brackets_in_strings() -> None:
+    data = b'{"Location": [{"name": "A [\\"x\\"] }"}, [1, {"b": "]"}]], "c": []}'
+
+    actual = list(serialisers.iter_json_array_items([data], b"Location"))
+
+    assert actual == [b'{"name": "A [\\"x\\"] }"}', b'[1, {"b": "]"}]']
+
+
+def test_iter_json_array_batches_by_chunk() -> None:
+    chunks = [
+        b'{"Location": [{"a": "1"}, {"a": "2"}, {"a"',
+        b': "3"}, {"b": {"c": "}"}}], "d": []}',
+    ]
+
+    actual = list(serialisers.iter_json_array_batches(chunks, b"Location"))
+
+    assert actual == [
+        [b'{"a": "1"}', b'{"a": "2"}'],
+        [b'{"a": "3"}', b'{"b": {"c": "}"}}'],
+    ]
+
+
+def test_iter_met_office_locations_records_one_span(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    recorder = Recorder()
+    monkeypatch.setattr(instrumentation, "recorder", recorder)
+    sitelist = (FAKE_DATA_DIR / "sitelist").read_bytes()
+
+    locations = list(
+        serialisers.iter_met_office_locations([sitelist[:100], sitelist[100:]])
+    )
+
+    [span] = recorder.spans
+    assert span.name == "decode.locations_stream"
+    assert span.attributes == {"locations": len(locations)}
+
+
+def test_iter_json_array_items_truncated_stream() -> None:
+    with pytest.raises(ValueError):
+        list(serialisers.iter_json_array_items([b'{"Location": [{"a": '], b"Location"))
+
+
+def test_iter_met_office_site_forecasts_filters_sites() -> None:
+    site_json = serialisers.loads((FAKE_DATA_DIR / "310069-3hourly").read_bytes())
+    dv = site_json["SiteRep"]["DV"]
+    sites = [dict(dv["Location"], i=str(location_id)) for location_id in (1, 2, 3)]
+    all_sites = json.dumps({"SiteRep": {"DV": dict(dv, Location=sites)}}).encode()
+    chunks = [all_sites[i : i + 100] for i in range(0, len(all_sites), 100)]
+
+    actual = list(serialisers.iter_met_office_site_forecasts(chunks, {1, 3}))
+
+    expected_forecast = serialisers.decode_met_office_forecast(site_json)
+    assert [site.location_id for site in actual] == [1, 3]
+    assert all(site.forecast == expected_forecast for site in actual)
+    assert actual[0].issue_time == serialisers.decode_met_office_issue_time(site_json)
+    # Each site can be cached as if it were a single site response
+    assert (
+        serialisers.decode_met_office_forecast(serialisers.loads(actual[0].content))
+        == expected_forecast
+    )
+
+
+def all_sites_content(site_json: dict, location_ids: list[int]) -> bytes:
+    dv = site_json["SiteRep"]["DV"]
+    sites = [dict(dv["Location"], i=str(location_id)) for location_id in location_ids]
+    return json.dumps({"SiteRep": {"DV": dict(dv, Location=sites)}}).encode()
+
+
+def test_iter_met_office_site_forecasts_finds_issue_time_across_chunks() -> None:
+    site_json = serialisers.loads((FAKE_DATA_DIR / "310069-3hourly").read_bytes())
+    content = all_sites_content(site_json, [1, 2])
+    # One byte at a time, so the dataDate is split across many chunks
+    chunks = [content[i : i + 1] for i in range(len(content))]
+
+    actual = list(serialisers.iter_met_office_site_forecasts(chunks, {2}))
+
+    assert [site.location_id for site in actual] == [2]
+    assert actual[0].issue_time == serialisers.decode_met_office_issue_time(site_json)
+
+
+def test_iter_met_office_site_forecasts_without_issue_time() -> None:
+    site_json = serialisers.loads((FAKE_DATA_DIR / "310069-3hourly").read_bytes())
+    del site_json["SiteRep"]["DV"]["dataDate"]
+    chunks = [all_sites_content(site_json, [1, 2])]
+
+    # Even if the first site isn't one of those wanted
+    with pytest.raises(ValueError):
+        list(serialisers.iter_met_office_site_forecasts(chunks, {2}))
@@ -0,0 +1,78 @@
+import json
+import math
+import random
+from pathlib import Path
+
+from weather_uk.data import models
+from weather_uk.domain import serialisers
+from weather_uk.domain.locations import get_nearest_locations, get_site_index
+from weather_uk.domain.spatial import SiteIndex
+
+FAKE_DATA_DIR = Path(__file__).parent / "data"
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def test_sitelist_coordinates_decoded() -> None:
+    json_data = json.loads((FAKE_DATA_DIR / "sitelist").read_text())
+    location = serialisers.decode_met_office_locations(json_data)[0]
+
+    assert location.latitude == 54.9375
+    assert location.longitude == -2.8092
+    assert location.elevation == 50.0
+
+
+def test_get_nearest_locations() -> None:
+    json_data = json.loads((FAKE_DATA_DIR / "sitelist").read_text())
+    locations = serialisers.decode_met_office_locations(json_data)
+    site_index = get_site_index(locations)
+
+    # Kirkwall, Orkney
+    nearest = get_nearest_locations(site_index, 58.98, -2.96, count=2)
+
+    assert [nearby.location.name for nearby in nearest] == [
+        "Wick John O Groats Airport",
+        "Fair Isle",
+    ]
+    assert round(nearest[0].distance_km) == 59
+
+
+def test_nearest_matches_linear_scan() -> None:
+    rng = random.Random(1)
+    locations = [
+        models.Location(
+            i,
+            f"Site {i}",
+            None,
+            latitude=rng.uniform(49.9, 60.9),
+            longitude=rng.uniform(-8.2, 1.8),
+        )
+        for i in range(2000)
+    ]
+    locations.append(models.Location(9999, "No coordinates", None))
+    site_index = SiteIndex(locations)
+
+    for _ in range(50):
+        lat, lon = rng.uniform(49.9, 60.9), rng.uniform(-8.2, 1.8)
+
+        def distance_km(location: models.Location) -> float:
+            assert location.latitude is not None and location.longitude is not None
+            return haversine_km(lat, lon, location.latitude, location.longitude)
+
+        expected = sorted(locations[:-1], key=distance_km)[:3]
+
+        actual = site_index.nearest(lat, lon, count=3)
+
+        assert [nearby.location.id for nearby in actual] == [
+            location.id for location in expected
+        ]
+        assert math.isclose(
+            actual[0].distance_km, distance_km(expected[0]), rel_tol=1e-6
+        )
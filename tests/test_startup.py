@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import weather_uk
+
+# Only needed once a screen is shown, so shouldn't slow down starting the app
+LAZY_MODULES = (
+    "requests",
+    "textual_autocomplete",
+    "weather_uk.app.screens.forecast",
+    "weather_uk.app.screens.locations",
+    "weather_uk.app.screens.welcome",
+    "weather_uk.domain.weather_api_client",
+)
+
+
+def test_app_imports_screens_lazily() -> None:
+    code = (
+        "import sys; import weather_uk.app.app; "
+        f"print(*(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    env = {**os.environ, "PYTHONPATH": str(Path(weather_uk.__file__).parents[1])}
+
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.split() == []
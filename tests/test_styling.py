@@ -0,0 +1,120 @@
+from pathlib import Path
+
+import pytest
+from rich.style import Style
+
+from weather_uk.app.styling import CellStyles, CellTheme
+from weather_uk.data import models
+from weather_uk.data.models.forecast_series import COMPASS_POINTS
+from weather_uk.domain import serialisers
+
+FAKE_DATA_DIR = Path(__file__).parent / "data"
+
+
+@pytest.fixture
+def weather() -> models.Weather:
+    content = (FAKE_DATA_DIR / "310069-3hourly").read_bytes()
+    forecast = serialisers.decode_met_office_forecast(serialisers.loads(content))
+    return forecast[0].hours[0].weather
+
+
+@pytest.mark.parametrize(
+    "uv_index, style",
+    [
+        (0, "white on grey30"),
+        (2, "black on green4"),
+        (3, "black on gold1"),
+        (7, "black on dark_orange"),
+        (10, "white on red3"),
+        (11, "white on purple3"),
+        (14, "white on purple3"),
+    ],
+)
+def test_uv_index_bands(weather: models.Weather, uv_index: int, style: str) -> None:
+    weather.max_uv_index = uv_index
+    assert CellStyles().uv_index(weather) == (f" {uv_index} ", Style.parse(style))
+
+
+def test_chance_of_precip(weather: models.Weather) -> None:
+    cell_styles = CellStyles()
+
+    weather.precipitation_probability = 29
+    assert cell_styles.chance_of_precip(weather) == ("29%", None)
+    weather.precipitation_probability = 30
+    assert cell_styles.chance_of_precip(weather) == (
+        "30%",
+        Style.parse("dark_blue on light_cyan1"),
+    )
+
+
+def test_every_compass_point_has_an_arrow(weather: models.Weather) -> None:
+    cell_styles = CellStyles()
+
+    for direction in COMPASS_POINTS:
+        weather.wind_direction = direction
+        text, _ = cell_styles.wind_direction(weather)
+        assert text.endswith(f" {direction}")
+        assert text[0] in "↓←↑→↙↘↖↗"
+
+    weather.wind_direction = "NNE"
+    assert cell_styles.wind_direction(weather) == ("↙ NNE", None)
+
+
+def test_cells_are_reused(weather: models.Weather) -> None:
+    cell_styles = CellStyles()
+    weather.temp_celsius = 12
+
+    assert cell_styles.temp(weather) is cell_styles.temp(weather)
+    assert cell_styles.weather_type(weather) == (str(weather.weather_type), None)
+
+
+def test_values_outside_the_tables(weather: models.Weather) -> None:
+    cell_styles = CellStyles()
+    weather.temp_celsius = 99.5
+    weather.wind_speed_mph = 250
+
+    assert cell_styles.temp(weather) == ("99.5°", None)
+    assert cell_styles.wind_speed(weather) == ("250", None)
+
+
+def test_missing_values(weather: models.Weather) -> None:
+    cell_styles = CellStyles()
+    weather.precipitation_probability = None
+    weather.feels_like_temp_celsius = None
+    weather.wind_gust_mph = None
+    weather.max_uv_index = None
+    weather.weather_type = None
+    weather.wind_direction = None
+    weather.wind_speed_mph = None
+    weather.visibility = None
+
+    assert cell_styles.chance_of_precip(weather) == ("-", None)
+    assert cell_styles.feels_like_temp(weather) == ("-", None)
+    assert cell_styles.wind_gust(weather) == ("-", None)
+    assert cell_styles.uv_index(weather) == ("-", None)
+    assert cell_styles.weather_type(weather) == ("-", None)
+    assert cell_styles.wind_direction(weather) == ("-", None)
+    assert cell_styles.wind_speed(weather) == ("-", None)
+    assert cell_styles.visibility(weather) == ("-", None)
+
+
+def test_theme_from_config(weather: models.Weather) -> None:
+    theme = CellTheme.from_config(
+        {
+            "uv_extreme": "bold white on magenta",
+            "uv_low": "not a colour",
+            "likely_precip_chance": "50",
+            "unknown": "red",
+        }
+    )
+
+    assert theme.uv_extreme == "bold white on magenta"
+    assert theme.uv_low == CellTheme.uv_low
+    assert theme.likely_precip_chance == 50
+
+    cell_styles = CellStyles(theme)
+    weather.precipitation_probability = 40
+    assert cell_styles.chance_of_precip(weather) == ("40%", None)
+    weather.max_uv_index = 12
+    _, style = cell_styles.uv_index(weather)
+    assert style == Style.parse("bold white on magenta")
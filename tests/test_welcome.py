@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+import requests
+from fake_weather_api import FakeWeatherAPIClient
+from textual.app import App
+from textual.widgets import Input, Label
+
+from weather_uk import config
+from weather_uk.app.screens.welcome import (
+    CHECK_FAILED_MSG,
+    INVALID_KEY_MSG,
+    WelcomeScreen,
+)
+from weather_uk.domain.resilience import CircuitOpenError
+from weather_uk.domain.scheduler import QuotaExceededError
+
+
+class WelcomeApp(App):
+    def __init__(self, weather_api: FakeWeatherAPIClient) -> None:
+        super().__init__()
+        self._user_config = config.UserConfig("")
+        self._weather_api = weather_api
+
+    def on_mount(self) -> None:
+        self.push_screen(WelcomeScreen())
+
+
+def http_error(status_code: int | None) -> requests.exceptions.HTTPError:
+    if status_code is None:
+        return requests.exceptions.HTTPError("No response")
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.exceptions.HTTPError(f"{status_code} Error", response=response)
+
+
+@pytest.mark.parametrize(
+    "error, message",
+    [
+        (http_error(403), INVALID_KEY_MSG),
+        (http_error(503), CHECK_FAILED_MSG),
+        (http_error(None), CHECK_FAILED_MSG),
+        (requests.exceptions.ConnectionError(), CHECK_FAILED_MSG),
+        (
+            QuotaExceededError("Daily limit of 5000 requests reached"),
+            "Error: Daily limit of 5000 requests reached. Please try again tomorrow.",
+        ),
+        (CircuitOpenError("Requests are failing, try again later"), CHECK_FAILED_MSG),
+    ],
+)
+def test_failed_authentication_check(
+    error: Exception, message: str, weather_api: FakeWeatherAPIClient
+) -> None:
+    weather_api.error = error
+
+    async def enter_api_key() -> tuple[str, object]:
+        app = WelcomeApp(weather_api)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            app.screen.query_one(Input).value = "0123"
+            await pilot.press("enter")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            auth_msg = app.screen.query_one("#auth-status", Label)
+            return str(auth_msg.renderable), app.screen
+
+    auth_msg, screen = asyncio.run(enter_api_key())
+
+    assert auth_msg == message
+    assert isinstance(screen, WelcomeScreen)